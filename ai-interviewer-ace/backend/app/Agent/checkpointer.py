@@ -0,0 +1,111 @@
+"""
+Bounded SQLite checkpointer for the interview agent graph
+"""
+import asyncio
+import logging
+import sqlite3
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+# Set up logging
+logger = logging.getLogger("hiregage.agent.checkpoints")
+
+
+class EvictingSqliteSaver(SqliteSaver):
+    """
+    SQLite checkpointer that keeps at most max_threads conversation threads
+
+    Checkpoints live on disk and nothing about threads is held in memory.
+    Writing the first checkpoint of a thread beyond max_threads deletes the
+    coldest threads' checkpoints, chosen by each thread's newest checkpoint
+    inside the same write transaction, so workers sharing the database
+    file (and restarts) agree on recency. The async methods used by
+    graph.astream run the SQLite work in a worker thread.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, max_threads: int = 1000, **kwargs):
+        """
+        Initialize the checkpointer
+
+        Args:
+            conn: SQLite connection, opened with check_same_thread=False
+            max_threads: Threads kept before evicting the least recently used (default: 1000)
+        """
+        super().__init__(conn, **kwargs)
+        self.max_threads = max_threads
+        self.evicted = 0
+
+    @classmethod
+    def from_path(cls, path: str, max_threads: int = 1000) -> "EvictingSqliteSaver":
+        """Open (or create) a checkpoint database file"""
+        return cls(sqlite3.connect(path, check_same_thread=False), max_threads=max_threads)
+
+    def _has_thread(self, thread_id: str) -> bool:
+        with self.cursor(transaction=False) as cur:
+            cur.execute("SELECT 1 FROM checkpoints WHERE thread_id = ? LIMIT 1", (thread_id,))
+            return cur.fetchone() is not None
+
+    def _evict(self, keep: str) -> None:
+        # BEGIN IMMEDIATE takes the write lock first, so no other worker can
+        # use a thread between it being picked as coldest and deleted
+        with self.cursor(transaction=False) as cur:
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.execute("SELECT COUNT(DISTINCT thread_id) FROM checkpoints")
+                excess = cur.fetchone()[0] - self.max_threads
+                cold = []
+                if excess > 0:
+                    # Checkpoint ids are time-ordered, so the newest id orders threads by last use
+                    cur.execute(
+                        "SELECT thread_id FROM checkpoints WHERE thread_id != ? "
+                        "GROUP BY thread_id ORDER BY MAX(checkpoint_id) LIMIT ?",
+                        (keep, excess)
+                    )
+                    cold = [thread_id for (thread_id,) in cur.fetchall()]
+                    for thread_id in cold:
+                        cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                        cur.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+        for thread_id in cold:
+            self.evicted += 1
+            logger.info(f"Evicted agent thread {thread_id}")
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = str(config["configurable"]["thread_id"])
+        created = not self._has_thread(thread_id)
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        # Only a new thread can take the database over the bound
+        if created:
+            self._evict(thread_id)
+        return saved
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        checkpoints = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint in checkpoints:
+            yield checkpoint
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    async def aget_delta_channel_history(self, *, config, channels):
+        return await asyncio.to_thread(lambda: self.get_delta_channel_history(config=config, channels=channels))
+
+    def thread_count(self) -> int:
+        """Number of threads with checkpoints"""
+        with self.cursor(transaction=False) as cur:
+            cur.execute("SELECT COUNT(DISTINCT thread_id) FROM checkpoints")
+            return cur.fetchone()[0]
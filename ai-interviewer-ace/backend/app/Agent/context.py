@@ -0,0 +1,103 @@
+"""
+Context window management for interview threads
+"""
+from typing import List, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+# Ids given to the system prompt and job context that open a thread
+SEED_ID_PREFIX = "seed-"
+
+
+def seed_length(messages: Sequence[BaseMessage]) -> int:
+    """Number of leading messages that make up the thread's prompt and job context"""
+    count = 0
+    for message in messages:
+        if not (isinstance(message, SystemMessage) or (message.id or "").startswith(SEED_ID_PREFIX)):
+            break
+        count += 1
+    return count
+
+
+def split_turns(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """
+    Group conversation messages into turns
+
+    A turn starts at each candidate message and holds the interviewer's
+    replies, tool calls and tool results that follow it, so a tool call is
+    never separated from its result. Messages before the first candidate
+    message form their own turn.
+    """
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def plan_fold(
+    messages: Sequence[BaseMessage],
+    summary: str,
+    keep_turns: int,
+    max_tokens: int
+) -> List[BaseMessage]:
+    """
+    Choose the messages to fold into the running summary
+
+    Nothing is folded until the thread holds twice keep_turns turns or its
+    estimated prompt exceeds max_tokens, so the summary is refreshed once
+    every keep_turns turns rather than on every turn. Folding then keeps
+    the prompt, the summary and the last keep_turns turns, or fewer (but
+    always the latest) if those would still exceed max_tokens.
+
+    Returns:
+        List of messages to remove from the thread, oldest first
+    """
+    seed = seed_length(messages)
+    turns = split_turns(messages[seed:])
+    fixed = count_tokens_approximately(messages[:seed]) + (
+        count_tokens_approximately([SystemMessage(content=summary)]) if summary else 0
+    )
+    sizes = [count_tokens_approximately(turn) for turn in turns]
+    if len(turns) < 2 * keep_turns and fixed + sum(sizes) <= max_tokens:
+        return []
+
+    keep = min(len(turns), keep_turns)
+    while keep > 1 and fixed + sum(sizes[-keep:]) > max_tokens:
+        keep -= 1
+    return [message for turn in turns[:len(turns) - keep] for message in turn]
+
+
+def with_summary(messages: Sequence[BaseMessage], summary: str) -> List[BaseMessage]:
+    """The prompt for the LLM: the thread with its summary after the opening prompt"""
+    if not summary:
+        return list(messages)
+    seed = seed_length(messages)
+    note = SystemMessage(content=f"Summary of the interview so far:\n{summary}")
+    return [*messages[:seed], note, *messages[seed:]]
+
+
+def render_transcript(messages: Sequence[BaseMessage]) -> str:
+    """Plain-text transcript of messages for the summarizer"""
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"Candidate: {message.content}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"Tool result: {message.content}")
+        elif isinstance(message, AIMessage):
+            if message.content:
+                lines.append(f"Interviewer: {message.content}")
+            for call in message.tool_calls:
+                lines.append(f"Interviewer used {call['name']}: {call['args']}")
+    return "\n".join(lines)
+
+
+def fold_request(summary: str, messages: Sequence[BaseMessage], instructions: str) -> Tuple[SystemMessage, HumanMessage]:
+    """Messages asking the LLM to fold messages into the summary"""
+    return (
+        SystemMessage(content=instructions),
+        HumanMessage(content=f"Summary so far:\n{summary or '(none)'}\n\nNew conversation:\n{render_transcript(messages)}"),
+    )
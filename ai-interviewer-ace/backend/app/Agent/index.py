@@ -1,45 +1,114 @@
-from typing import Annotated
+import logging
+import time
+from contextlib import aclosing
+from typing import Annotated, AsyncIterator
 
 from typing import TypedDict
 
 from langgraph.graph import StateGraph, START
 from langgraph.graph.message import add_messages
+from langchain_core.messages import RemoveMessage
 from langchain_ollama import ChatOllama
-from langgraph.checkpoint.memory import MemorySaver
-from .system_prompt import SYSTEM_PROMPT
+from app.config import get_settings
+from app.utils.concurrency import ConcurrencyLimiter
+from app.utils.metrics import LATENCY_BUCKETS_MS, TOKEN_BUCKETS, Histogram
+from .checkpointer import EvictingSqliteSaver
+from .context import SEED_ID_PREFIX, fold_request, plan_fold, with_summary
+from .system_prompt import SUMMARY_PROMPT, SYSTEM_PROMPT
 from .tools import Tools
 from langgraph.prebuilt import ToolNode, tools_condition
 
 
-memory = MemorySaver()
+logger = logging.getLogger("hiregage.agent")
+
+settings = get_settings()
 
 llm = ChatOllama(model="llama3.2:latest")
 
 llm_with_tools = llm.bind_tools(Tools.get_tools())
 
+# Bounds concurrent LLM calls in this worker; the rest queue for a slot
+llm_slots = ConcurrencyLimiter(
+    settings.AGENT_MAX_CONCURRENT_LLM_CALLS,
+    timeout=settings.AGENT_LLM_QUEUE_TIMEOUT_SECONDS,
+    resource="LLM call slots"
+)
+
+# Tokens sent to and generated by the LLM per call, for /system/metrics
+prompt_tokens = Histogram(buckets=TOKEN_BUCKETS)
+completion_tokens = Histogram(buckets=TOKEN_BUCKETS)
+
+# Milliseconds from a streamed turn starting to its first token
+first_token_latency = Histogram(buckets=LATENCY_BUCKETS_MS)
+
+# Older turns folded into thread summaries, for /system/metrics
+context_folds = {"summaries": 0, "folded_messages": 0}
+
+# Job context used when a session does not provide one
+DEFAULT_JOB_CONTEXT = 'Job Title: Software Engineer\nJob Description: We are looking for a software engineer with experience in Python and JavaScript. The candidate should have a strong understanding of algorithms and data structures. The candidate should also have experience with web development frameworks such as Django or Flask.'
+
 
 class State(TypedDict):
     messages: Annotated[list, add_messages] 
+    summary: str
 
 
 graph_builder = StateGraph(State)
 
 
-def chatbot(state: State):
-    return {"messages": [llm_with_tools.invoke(state["messages"])]}
+async def manage_context(state: State):
+    """
+    Keep the thread's context bounded
+
+    The opening prompt and the most recent turns stay verbatim; older turns
+    are folded into a running summary and removed from the thread, so the
+    prompt stays under AGENT_CONTEXT_MAX_TOKENS however long the interview.
+    """
+    summary = state.get("summary", "")
+    folded = plan_fold(
+        state["messages"],
+        summary,
+        keep_turns=settings.AGENT_CONTEXT_KEEP_TURNS,
+        max_tokens=settings.AGENT_CONTEXT_MAX_TOKENS
+    )
+    if not folded:
+        return {}
+    async with llm_slots.slot():
+        response = await llm.ainvoke(fold_request(summary, folded, SUMMARY_PROMPT))
+    context_folds["summaries"] += 1
+    context_folds["folded_messages"] += len(folded)
+    logger.info(f"Folded {len(folded)} messages into the thread summary")
+    return {
+        "messages": [RemoveMessage(id=message.id) for message in folded],
+        "summary": response.content,
+    }
+
+
+async def chatbot(state: State):
+    async with llm_slots.slot():
+        response = await llm_with_tools.ainvoke(with_summary(state["messages"], state.get("summary", "")))
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        prompt_tokens.observe(usage["input_tokens"])
+        completion_tokens.observe(usage["output_tokens"])
+        logger.info(f"LLM call: {usage['input_tokens']} prompt tokens, {usage['output_tokens']} completion tokens")
+    return {"messages": [response]}
 
 tool_node = ToolNode(tools=Tools.get_tools())
 
 
-graph_builder.add_node("chatbot", chatbot)
+graph_builder.add_node("context", manage_context)
 
 
-graph_builder.add_node("tools", tool_node)
+graph_builder.add_node("chatbot", chatbot)
 
 
-config = {"configurable": {"thread_id": "1"}}
+graph_builder.add_node("tools", tool_node)
 
 
+def thread_config(session_id: str) -> dict:
+    """Graph config for an interview session's own conversation thread"""
+    return {"configurable": {"thread_id": session_id}}
 
 
 graph_builder.add_conditional_edges(
@@ -47,30 +116,98 @@ graph_builder.add_conditional_edges(
     tools_condition
 )
 
-graph_builder.add_edge("tools", "chatbot")
-graph_builder.add_edge(START, "chatbot")
+graph_builder.add_edge("tools", "context")
+graph_builder.add_edge("context", "chatbot")
+graph_builder.add_edge(START, "context")
+
+# Compiled on first use, so importing this module opens no checkpoint file
+graph = None
+
+
+def get_graph():
+    """The interview graph, checkpointing threads to AGENT_CHECKPOINT_PATH and keeping the most recently used"""
+    global graph
+    if graph is None:
+        memory = EvictingSqliteSaver.from_path(
+            settings.AGENT_CHECKPOINT_PATH,
+            max_threads=settings.AGENT_MAX_THREADS
+        )
+        graph = graph_builder.compile(checkpointer=memory)
+    return graph
+
+
+def agent_metrics() -> dict:
+    """Token histograms, streamed time to first token, LLM slot queueing and context folds for this process"""
+    return {
+        "prompt_tokens": prompt_tokens.snapshot(),
+        "completion_tokens": completion_tokens.snapshot(),
+        "first_token_ms": first_token_latency.snapshot(),
+        "llm_slots": llm_slots.stats(),
+        "context": dict(context_folds),
+    }
 
-graph = graph_builder.compile(checkpointer=memory)
 
-def stream_graph_updates(user_input: str=''):
-    messages = [{
-        'role':'system',
-        'content': SYSTEM_PROMPT
-    }
-    ,{'role':'assistant',
-        'content': 'Job Title: Software Engineer\nJob Description: We are looking for a software engineer with experience in Python and JavaScript. The candidate should have a strong understanding of algorithms and data structures. The candidate should also have experience with web development frameworks such as Django or Flask.'
-   }]
-    
+def seed_messages(job_title: str = None, job_description: str = None) -> list:
+    """System prompt and job context that open a new thread"""
+    job_context = (
+        f"Job Title: {job_title}\nJob Description: {job_description or ''}"
+        if job_title else DEFAULT_JOB_CONTEXT
+    )
+    return [
+        {'role': 'system', 'content': SYSTEM_PROMPT, 'id': f'{SEED_ID_PREFIX}system'},
+        {'role': 'assistant', 'content': job_context, 'id': f'{SEED_ID_PREFIX}job'},
+    ]
+
+
+async def _turn_messages(config: dict, user_input: str, job_title: str, job_description: str) -> list:
+    # The prompt and job context are checkpointed with the thread, so they
+    # are only sent on its first turn; later turns send just the new message
+    messages = []
+    if not (await get_graph().aget_state(config)).values.get("messages"):
+        messages = seed_messages(job_title, job_description)
     if user_input:
-        messages.append({'role':'user', 'content': user_input})
-
-    for event in graph.stream({"messages": messages},config=config):
-        for value in event.values():
-
-            if not 'tools' in event  and value["messages"]:
-                print("Interviewer:", value["messages"][-1].content)
-                return value["messages"][-1].content
-            else:
-                if 'tools' in event :
-                    print('tool called')
-        
+        messages.append({'role': 'user', 'content': user_input})
+    return messages
+
+
+async def astream_tokens(
+    session_id: str,
+    user_input: str = '',
+    job_title: str = None,
+    job_description: str = None
+) -> AsyncIterator[str]:
+    """
+    Yield the interviewer's reply token by token as the LLM generates it
+
+    Built on LangGraph's "messages" stream mode. Only text from the chatbot
+    node is yielded; tool calls and tool results are not. Closing the
+    iterator early cancels the generation.
+    """
+    config = thread_config(session_id)
+    messages = await _turn_messages(config, user_input, job_title, job_description)
+    started = time.perf_counter()
+    first = True
+    async with aclosing(get_graph().astream({"messages": messages}, config=config, stream_mode="messages")) as stream:
+        async for message, metadata in stream:
+            if metadata.get("langgraph_node") != "chatbot" or not isinstance(message.content, str) or not message.content:
+                continue
+            if first:
+                first_token_latency.observe((time.perf_counter() - started) * 1000)
+                first = False
+            yield message.content
+
+
+async def stream_graph_updates(session_id: str, user_input: str='', job_title: str=None, job_description: str=None):
+    """Run one interview turn and return the interviewer's whole reply"""
+    config = thread_config(session_id)
+    messages = await _turn_messages(config, user_input, job_title, job_description)
+
+    async with aclosing(get_graph().astream({"messages": messages}, config=config)) as events:
+        async for event in events:
+            for node, value in event.items():
+                if node == 'chatbot' and value["messages"]:
+                    reply = value["messages"][-1].content
+                    logger.debug(f"Interviewer reply for session {session_id}: {reply}")
+                    return reply
+                elif node == 'tools':
+                    logger.debug(f"Tool called for session {session_id}")
@@ -32,4 +32,16 @@ STEPS:
 6- END THE INTERVIEW FRIENDLY ONCE YOU THINK YOU HAVE EVALUATED THE INTERVIEWEE SUFFICIENTLY.
 7- GENERATE A SUMMARY OF THE INTERVIEW AND SEND IT TO THE INTERVIEWEE.
 
-'''
\ No newline at end of file
+'''
+
+SUMMARY_PROMPT = '''
+YOU KEEP A RUNNING SUMMARY OF A JOB INTERVIEW FOR THE INTERVIEWER.
+YOU WILL RECEIVE THE SUMMARY SO FAR AND THE PART OF THE CONVERSATION THAT FOLLOWED IT.
+REWRITE THE SUMMARY SO IT ALSO COVERS THE NEW CONVERSATION.
+
+KEEP: QUESTIONS ALREADY ASKED, THE CANDIDATE'S ANSWERS AND CLAIMS, SKILLS AND EXPERIENCE MENTIONED,
+RESULTS OF MCQS AND CODING PROBLEMS, AND WHICH INTERVIEW STEPS ARE DONE.
+DROP GREETINGS, FILLER AND REPETITION.
+
+REPLY WITH THE SUMMARY ONLY, AS SHORT BULLET POINTS, IN AT MOST 200 WORDS.
+'''
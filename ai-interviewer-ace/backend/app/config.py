@@ -34,16 +34,61 @@ class Settings(BaseSettings):
     # Supabase Configuration
     SUPABASE_URL: str = Field(..., description="Supabase project URL")
     SUPABASE_KEY: str = Field(..., description="Supabase API key")
-      # Database Configuration
+    # Database Configuration
     DATABASE_URL: Optional[PostgresDsn] = None
+    DATABASE_ECHO: bool = Field(default=False, description="Log every SQL statement")
+    DATABASE_POOL_SIZE: int = Field(default=5, description="Connections kept open per worker process")
+    DATABASE_MAX_OVERFLOW: int = Field(default=10, description="Extra connections opened under load beyond the pool size")
+    DATABASE_POOL_TIMEOUT_SECONDS: float = Field(default=30.0, description="Wait for a free connection before failing")
+    DATABASE_POOL_PRE_PING: bool = Field(default=True, description="Test connections on checkout and replace dead ones")
+    DATABASE_POOL_RECYCLE_SECONDS: int = Field(default=1800, description="Replace connections older than this (-1 to disable)")
+    ANALYTICS_EXPORT_BATCH_ROWS: int = Field(default=5000, description="Rows read and encoded per batch in analytics exports")
     
     # CORS Configuration
     CORS_ORIGINS: List[str] = Field(default=["http://localhost:5173", "http://localhost:3000", "http://localhost:5175"])
     
+    # Session Store Configuration
+    SESSION_STORE: str = Field(default="memory", description="Where live interview sessions are kept: memory (single worker) or database (shared)")
+    SESSION_TTL_SECONDS: float = Field(default=7200, description="Idle seconds before an interview session expires")
+    SESSION_MAX_COUNT: int = Field(default=10000, description="Most interview sessions kept before evicting the least recently used")
+    SESSION_IDLE_SECONDS: float = Field(default=1800, description="Idle seconds before the reaper archives and evicts a session")
+    SESSION_ENDED_RETENTION_SECONDS: float = Field(default=300, description="Seconds an ended interview is kept before it is archived and evicted")
+    SESSION_REAP_INTERVAL_SECONDS: float = Field(default=60, description="Seconds between reaper passes")
+    SESSION_ARCHIVE_DIR: str = Field(default="sessions", description="Directory evicted sessions are archived to as JSON")
+    
+    # Interview Agent Configuration
+    AGENT_CHECKPOINT_PATH: str = Field(default="checkpoints.sqlite", description="SQLite file the agent's conversation threads are checkpointed to")
+    AGENT_MAX_THREADS: int = Field(default=1000, description="Conversation threads kept before evicting the least recently used")
+    AGENT_MAX_CONCURRENT_LLM_CALLS: int = Field(default=4, description="LLM calls run at once per worker; the rest queue")
+    AGENT_LLM_QUEUE_TIMEOUT_SECONDS: Optional[float] = Field(default=60.0, description="Wait for an LLM slot before failing (unset waits forever)")
+    AGENT_CONTEXT_KEEP_TURNS: int = Field(default=6, description="Most recent conversation turns kept verbatim; older ones are summarized")
+    AGENT_CONTEXT_MAX_TOKENS: int = Field(default=3000, description="Estimated prompt tokens beyond which older turns are summarized")
+    
     # Interview Settings
     MAX_INTERVIEW_DURATION_MINUTES: int = Field(default=30)
     QUESTION_TIMEOUT_SECONDS: int = Field(default=60)
     
+    # Speech Recognition Configuration
+    VOSK_RECOGNIZER_POOL_SIZE: int = Field(default=32, description="Max concurrent recognizers per worker")
+    VOSK_POOL_ACQUIRE_TIMEOUT_SECONDS: float = Field(default=5.0)
+    VOSK_DECODE_MODE: str = Field(default="thread", description="Decode executor: thread or process")
+    VOSK_DECODE_WORKERS: Optional[int] = Field(default=None, description="Decode threads/processes (default: CPU count)")
+    VOSK_MAX_PENDING_CHUNKS: int = Field(default=8, description="Audio chunks buffered per stream before reads pause")
+    VOSK_VAD_ENABLED: bool = Field(default=True, description="Drop silence and endpoint utterances with VAD")
+    VOSK_VAD_THRESHOLD_DB: float = Field(default=12.0, description="VAD margin above the noise floor")
+    VOSK_VAD_END_SILENCE_MS: int = Field(default=600, description="Silence that ends an utterance")
+    SPEECH_PARTIAL_MAX_RATE_HZ: float = Field(default=10.0, description="Max partial results sent per second per session (0 for no limit)")
+    VOSK_BATCH_WORKERS: Optional[int] = Field(default=None, description="Batch transcription processes per job, and the most a request may ask for (default: CPU count)")
+    VOSK_BATCH_MAX_JOBS: int = Field(default=1, description="Batch transcription jobs run at once per worker; further requests are refused")
+    TRANSCRIPTION_BATCH_ROOT: str = Field(default="recordings", description="Directory batch transcription may read from")
+    
+    # Transcript Storage Configuration
+    TRANSCRIPT_STORAGE: str = Field(default="file", description="Where transcripts are kept: file (JSONL logs) or database (requires DATABASE_URL)")
+    TRANSCRIPT_FSYNC_INTERVAL_SECONDS: float = Field(default=0.05, description="Window for batching transcript appends into one fsync")
+    TRANSCRIPT_TAIL_SIZE: int = Field(default=256, description="Recent transcript entries kept in memory per session")
+    TRANSCRIPT_BATCH_MAX_ENTRIES: int = Field(default=500, description="Most transcript entries accepted in one batch save")
+    TRANSCRIPT_VIEW_CACHE_SIZE: int = Field(default=1024, description="Sessions whose consolidated transcript is kept in memory")
+    
     # Optional TTS Configuration
     TTS_API_KEY: Optional[str] = None
     
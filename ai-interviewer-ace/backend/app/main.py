@@ -20,8 +20,11 @@ from app.schemas.schemas import (
     InterviewResponse,
     InterviewSummary,
 )
-from app.routers.interviews import router as interview_router
+from app.routers.interviews import router as interview_router, interview_sessions, session_reaper, _interview_agent
 from app.routers import api_router
+from app.routers.speech import transcription_service
+from app.models.database import init_db
+from app.routers.transcripts import transcript_storage
 from app.middleware import (
     RequestLoggingMiddleware,
     validation_exception_handler,
@@ -37,18 +40,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger("hiregage")
 
-active_sessions: Dict[str, Dict[str, Any]] = {}
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("Starting HireGage API Server...")
     # Load models, initialize services, etc.
+    await init_db()
+    session_reaper.start()
     yield
     # Shutdown 
     print("Shutting down HireGage API Server...")
     # Cleanup resources, close connections
+    if transcription_service is not None:
+        transcription_service.shutdown()
+    await transcript_storage.close()
+    await session_reaper.stop()
+    await interview_sessions.close()
 
 
 app = FastAPI(
@@ -113,13 +120,15 @@ async def start_interview(request: JobTitleRequest):
         # Initialize the interview
         initial_message = await interview_agent.initialize_interview()
         
-        # Store the agent in active sessions
-        active_sessions[session_id] = {
-            "agent": interview_agent,
+        # Store the session in the shared session store
+        await interview_sessions.set(session_id, {
             "start_time": time.time(),
             "job_title": request.job_title,
+            "company_name": request.company_name,
+            "job_description": request.job_description,
+            "interview_duration": request.interview_duration,
             "transcript": []
-        }
+        })
         
         return InterviewResponse(
             session_id=session_id,
@@ -139,7 +148,13 @@ async def process_candidate_response(
     response: CandidateResponse
 ):
     """Process candidate's response and get the agent's next question."""
-    if session_id not in active_sessions:
+    # Add candidate's response to transcript; appends from other workers are kept
+    interview_session = await interview_sessions.append(session_id, "transcript", {
+        "role": "candidate",
+        "content": response.text,
+        "timestamp": time.time()
+    })
+    if interview_session is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Interview session not found"
@@ -147,15 +162,7 @@ async def process_candidate_response(
     
     try:
         # Get the interview agent
-        interview_session = active_sessions[session_id]
-        interview_agent = interview_session["agent"]
-        
-        # Add candidate's response to transcript
-        interview_session["transcript"].append({
-            "role": "candidate",
-            "content": response.text,
-            "timestamp": time.time()
-        })
+        interview_agent = _interview_agent(interview_session)
         
         # If this is just an interim transcription update (not final), don't process it
         if not response.is_final:
@@ -165,7 +172,7 @@ async def process_candidate_response(
         agent_response = await interview_agent.process_candidate_response(response.text)
         
         # Add agent's response to transcript
-        interview_session["transcript"].append({
+        await interview_sessions.append(session_id, "transcript", {
             "role": "agent",
             "content": agent_response,
             "timestamp": time.time()
@@ -183,16 +190,16 @@ async def process_candidate_response(
 @app.post("/api/interview/{session_id}/end", response_model=InterviewSummary)
 async def end_interview(session_id: str):
     """End the interview and generate summary and evaluation."""
-    if session_id not in active_sessions:
+    interview_session = await interview_sessions.get(session_id)
+    if interview_session is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Interview session not found"
         )
     
     try:
-        # Get the interview session
-        interview_session = active_sessions[session_id]
-        interview_agent = interview_session["agent"]
+        # Get the interview agent
+        interview_agent = _interview_agent(interview_session)
         
         # Generate summary and evaluation
         summary, evaluation, feedback = await interview_agent.generate_interview_summary()
@@ -207,8 +214,9 @@ async def end_interview(session_id: str):
             feedback=feedback
         )
         
-        # Clean up the session (optional, can keep for history)
-        # del active_sessions[session_id]
+        # Keep the session briefly for history; the reaper archives and evicts it
+        ended_at = time.time()
+        await interview_sessions.modify(session_id, lambda data: data.update(ended_at=ended_at))
         
         return result
         
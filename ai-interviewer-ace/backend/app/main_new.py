@@ -10,6 +10,10 @@ from contextlib import asynccontextmanager
 
 from app.config import get_settings
 from app.routers import api_router
+from app.routers.interviews import interview_sessions, session_reaper
+from app.routers.speech import transcription_service
+from app.models.database import init_db
+from app.routers.transcripts import transcript_storage
 from app.middleware import (
     RequestLoggingMiddleware,
     validation_exception_handler,
@@ -34,10 +38,17 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting HireGage API Server...")
     # Load models, initialize services, etc.
+    await init_db()
+    session_reaper.start()
     yield
     # Shutdown 
     logger.info("Shutting down HireGage API Server...")
     # Cleanup resources, close connections
+    if transcription_service is not None:
+        transcription_service.shutdown()
+    await transcript_storage.close()
+    await session_reaper.stop()
+    await interview_sessions.close()
 
 
 # Initialize FastAPI application
@@ -1,31 +1,37 @@
 """
 Database connection setup for the HireGage application
 """
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config import get_settings
+from app.models.models import Base
+from app.utils.db_pool import InstrumentedAsyncPool
 
 settings = get_settings()
 
 # Check if we have a Database URL configured
 if settings.DATABASE_URL:
     SQLALCHEMY_DATABASE_URL = str(settings.DATABASE_URL)
-    # Create async engine
+    # Create async engine; the pool records checkout waits for /system/metrics
     engine = create_async_engine(
-        SQLALCHEMY_DATABASE_URL, 
-        echo=settings.DEBUG,
-        future=True
+        SQLALCHEMY_DATABASE_URL,
+        echo=settings.DATABASE_ECHO,
+        future=True,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS
     )
-    
+
     # Create session factory
-    SessionLocal = sessionmaker(
-        autocommit=False,
+    SessionLocal = async_sessionmaker(
+        engine,
         autoflush=False,
-        bind=engine,
-        class_=AsyncSession
+        expire_on_commit=False
     )
 else:
     # For development without database, create a mock engine/session
@@ -33,12 +39,22 @@ else:
     SessionLocal = None
 
 
-async def get_db():
+async def init_db(bind: Optional[AsyncEngine] = None) -> None:
+    """Create any missing tables and indexes"""
+    bind = bind or engine
+    if bind is None:
+        return
+    async with bind.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def get_db() -> AsyncIterator[Optional[AsyncSession]]:
     """Get database session dependency"""
     if SessionLocal is None:
-        # Return None if database not configured
-        return None
-        
+        # Yield None if database not configured
+        yield None
+        return
+
     db = SessionLocal()
     try:
         yield db
@@ -2,9 +2,8 @@
 Base database models for the HireGage application
 """
 from typing import Any, Dict, List, Optional
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, Text, JSON
+from sqlalchemy.orm import declarative_base, relationship
 import datetime
 
 # Create a base class for all models
@@ -22,8 +21,13 @@ class Interview(Base):
     completed = Column(Boolean, default=False)
     duration_minutes = Column(Integer, default=15)
     
-    # Relationship with messages
-    messages = relationship("Message", back_populates="interview", cascade="all, delete-orphan")
+    # Relationship with messages, in the order they were exchanged
+    messages = relationship(
+        "Message",
+        back_populates="interview",
+        cascade="all, delete-orphan",
+        order_by="(Message.timestamp, Message.id)"
+    )
     
     # Relationship with evaluation
     evaluation = relationship("Evaluation", back_populates="interview", uselist=False, cascade="all, delete-orphan")
@@ -32,6 +36,10 @@ class Interview(Base):
 class Message(Base):
     """Model for storing interview messages/exchanges"""
     __tablename__ = "messages"
+    __table_args__ = (
+        # Serves per-interview lookups in time order and time-range queries
+        Index("ix_messages_interview_id_timestamp", "interview_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     interview_id = Column(String, ForeignKey("interviews.id", ondelete="CASCADE"), nullable=False)
@@ -56,3 +64,15 @@ class Evaluation(Base):
     
     # Relationship with interview
     interview = relationship("Interview", back_populates="evaluation")
+
+
+class InterviewSession(Base):
+    """Model for live interview session state shared between workers"""
+    __tablename__ = "interview_sessions"
+    
+    id = Column(String, primary_key=True)
+    data = Column(JSON, nullable=False)
+    # Incremented on every change to data, for compare-and-set updates
+    version = Column(Integer, nullable=False, default=0)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
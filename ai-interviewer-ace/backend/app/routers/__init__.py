@@ -7,6 +7,7 @@ from .interviews import router as interviews_router
 from .system import router as system_router
 from .transcripts import router as transcripts_router
 from .speech import router as speech_router
+from .analytics import router as analytics_router
 
 # Create a main router to include all routers
 api_router = APIRouter()
@@ -16,3 +17,4 @@ api_router.include_router(interviews_router)
 api_router.include_router(system_router)
 api_router.include_router(transcripts_router)
 api_router.include_router(speech_router)
+api_router.include_router(analytics_router)
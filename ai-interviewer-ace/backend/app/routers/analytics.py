@@ -0,0 +1,54 @@
+"""
+API router for analytics exports
+"""
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+import logging
+
+from app.config import get_settings
+from app.models.database import SessionLocal
+from app.services.analytics_export import FORMATS, MEDIA_TYPES, TABLES, AnalyticsExporter
+from app.utils.errors import ValidationError
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["analytics"],
+)
+
+# Setup logging
+logger = logging.getLogger("hiregage.analytics")
+
+
+@router.get("/export/{table}")
+async def export_table(
+    table: str,
+    format: str = Query("parquet", pattern="^(parquet|arrow)$", description="parquet file or Arrow IPC stream")
+):
+    """
+    Export a table for analytics in a columnar format.
+    
+    - `interviews`: one row per interview with its evaluation summary and feedback
+    - `messages`: every interview message
+    - `scores`: evaluation scores flattened to (interview_id, metric, score, value)
+    - Streams the file as it is encoded, reading the database in bounded batches
+    """
+    if table not in TABLES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown export table: {table} (expected one of {', '.join(TABLES)})"
+        )
+    if SessionLocal is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analytics export requires a configured database"
+        )
+    try:
+        exporter = AnalyticsExporter(SessionLocal, batch_rows=get_settings().ANALYTICS_EXPORT_BATCH_ROWS)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=e.message)
+    
+    return StreamingResponse(
+        exporter.stream(table, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}{FORMATS[format]}"'}
+    )
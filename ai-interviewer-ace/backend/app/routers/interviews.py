@@ -1,14 +1,23 @@
 """
 API router for interview endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Body,WebSocket
-from typing import Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import re
 import uuid
 import time
 
 from app.utils.tts import text_to_opus_google
 
-from app.Agent.index import stream_graph_updates
+from app.Agent.index import astream_tokens
+from app.config import get_settings
+from app.models.database import SessionLocal
+from app.services.session_reaper import SessionArchive, SessionReaper
+from app.services.session_store import create_session_store
 from app.schemas import (
     JobTitleRequest, 
     InterviewResponse, 
@@ -18,14 +27,62 @@ from app.schemas import (
 )
 from app.utils.errors import AIServiceError
 
+# Set up logging
+logger = logging.getLogger("hiregage.interview")
+
 router = APIRouter(
     prefix="/interview",
     tags=["interview"],
     responses={404: {"description": "Not found"}},
 )
 
-# Store active interview sessions
-active_sessions: Dict[str, Dict[str, Any]] = {}
+# Sessions leaving the store are archived to disk
+settings = get_settings()
+session_archive = SessionArchive(settings.SESSION_ARCHIVE_DIR)
+
+# Live interview sessions, shared between workers with SESSION_STORE=database;
+# those evicted when the store is full are archived too
+interview_sessions = create_session_store(
+    settings.SESSION_STORE,
+    ttl_seconds=settings.SESSION_TTL_SECONDS,
+    max_sessions=settings.SESSION_MAX_COUNT,
+    session_factory=SessionLocal,
+    persist=session_archive.save
+)
+
+# Idle and ended sessions are archived and evicted in the background
+session_reaper = SessionReaper(
+    interview_sessions,
+    session_archive.save,
+    idle_seconds=settings.SESSION_IDLE_SECONDS,
+    ended_seconds=settings.SESSION_ENDED_RETENTION_SECONDS,
+    interval=settings.SESSION_REAP_INTERVAL_SECONDS
+)
+
+
+# A sentence ends at ., ! or ? followed by whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _complete_sentences(text: str) -> Tuple[List[str], str]:
+    """Split text into its complete sentences and the unfinished remainder"""
+    parts = _SENTENCE_END.split(text)
+    return [part for part in parts[:-1] if part.strip()], parts[-1]
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _interview_agent(interview_session: Dict[str, Any]):
+    """Build the interview agent for a stored session"""
+    return InterviewAgent(
+        job_title=interview_session["job_title"],
+        company_name=interview_session.get("company_name"),
+        job_description=interview_session.get("job_description"),
+        interview_duration=interview_session.get("interview_duration")
+    )
 
 
 @router.post("/start", response_model=InterviewResponse)
@@ -52,13 +109,15 @@ async def start_interview(request: JobTitleRequest):
         # Initialize the interview
         initial_message = await interview_agent.initialize_interview()
         
-        # Store the agent in active sessions
-        active_sessions[session_id] = {
-            "agent": interview_agent,
+        # Store the session; only serializable state is kept, so any worker can serve it
+        await interview_sessions.set(session_id, {
             "start_time": time.time(),
             "job_title": request.job_title,
+            "company_name": request.company_name,
+            "job_description": request.job_description,
+            "interview_duration": request.interview_duration,
             "transcript": []
-        }
+        })
         
         return InterviewResponse(
             session_id=session_id,
@@ -72,7 +131,8 @@ async def start_interview(request: JobTitleRequest):
 @router.post("/{session_id}/respond")
 async def process_candidate_response(
     session_id: str,
-    response: CandidateResponse
+    response: CandidateResponse,
+    request: Request
 ):
     """
     Process candidate's response and get the agent's next question.
@@ -80,34 +140,50 @@ async def process_candidate_response(
     - Takes candidate's response (can be partial/interim or final)
     - If final, processes it and generates agent's next question
     - Updates interview transcript
+    
+    With `Accept: text/event-stream`, a final response is answered with
+    server-sent events: a `token` event ({"text"}) for each piece of the
+    question as it is generated, then `done` with the full text (or
+    `error` with a message).
     """
-    if session_id not in active_sessions:
+    # Add candidate's response to transcript; appends from other workers are kept
+    interview_session = await interview_sessions.append(session_id, "transcript", {
+        "role": "candidate",
+        "content": response.text,
+        "timestamp": time.time()
+    })
+    if interview_session is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Interview session not found"
         )
     
     try:
-        # Get the interview agent
-        interview_session = active_sessions[session_id]
-        interview_agent = interview_session["agent"]
-        
-        # Add candidate's response to transcript
-        interview_session["transcript"].append({
-            "role": "candidate",
-            "content": response.text,
-            "timestamp": time.time()
-        })
-        
         # If this is just an interim transcription update (not final), don't process it
         if not response.is_final:
             return {"status": "received"}
         
+        if "text/event-stream" in request.headers.get("accept", ""):
+            # The candidate's answer is already saved, so a client leaving mid-stream loses only the reply
+            return StreamingResponse(
+                _stream_reply(
+                    session_id,
+                    response.text,
+                    job_title=interview_session.get("job_title"),
+                    job_description=interview_session.get("job_description")
+                ),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        
+        # Get the interview agent
+        interview_agent = _interview_agent(interview_session)
+        
         # Get agent's response to candidate
         agent_response = await interview_agent.process_candidate_response(response.text)
         
         # Add agent's response to transcript
-        interview_session["transcript"].append({
+        await interview_sessions.append(session_id, "transcript", {
             "role": "agent",
             "content": agent_response,
             "timestamp": time.time()
@@ -119,6 +195,33 @@ async def process_candidate_response(
         raise AIServiceError(f"Failed to process response: {str(e)}", e)
 
 
+async def _stream_reply(
+    session_id: str,
+    text: str,
+    job_title: Optional[str] = None,
+    job_description: Optional[str] = None
+) -> AsyncIterator[str]:
+    """Stream the agent's reply as server-sent events, then append it to the transcript"""
+    tokens = []
+    try:
+        async for token in astream_tokens(session_id, text, job_title=job_title, job_description=job_description):
+            tokens.append(token)
+            yield _sse("token", {"text": token})
+    except Exception as e:
+        logger.error(f"Failed to stream reply for session {session_id}: {str(e)}")
+        yield _sse("error", {"message": f"Failed to process response: {str(e)}"})
+        return
+    
+    agent_response = "".join(tokens)
+    # Appended to the current session, keeping updates saved while the reply streamed
+    await interview_sessions.append(session_id, "transcript", {
+        "role": "agent",
+        "content": agent_response,
+        "timestamp": time.time()
+    })
+    yield _sse("done", {"text": agent_response})
+
+
 @router.post("/{session_id}/end", response_model=InterviewSummary)
 async def end_interview(session_id: str):
     """
@@ -129,16 +232,16 @@ async def end_interview(session_id: str):
     - Creates evaluation of candidate's performance
     - Provides overall feedback
     """
-    if session_id not in active_sessions:
+    interview_session = await interview_sessions.get(session_id)
+    if interview_session is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Interview session not found"
         )
     
     try:
-        # Get the interview session
-        interview_session = active_sessions[session_id]
-        interview_agent = interview_session["agent"]
+        # Get the interview agent
+        interview_agent = _interview_agent(interview_session)
         
         # Generate summary and evaluation
         summary, evaluation, feedback = await interview_agent.generate_interview_summary()
@@ -153,8 +256,9 @@ async def end_interview(session_id: str):
             feedback=feedback
         )
         
-        # Clean up the session (optional, can keep for history)
-        # del active_sessions[session_id]
+        # Keep the session briefly for history; the reaper archives and evicts it
+        ended_at = time.time()
+        await interview_sessions.modify(session_id, lambda data: data.update(ended_at=ended_at))
         
         return result
         
@@ -162,12 +266,75 @@ async def end_interview(session_id: str):
         raise AIServiceError(f"Failed to end interview: {str(e)}", e)
 
 @router.websocket("/ws/{session_id}")
-async def interview(websocket: WebSocket):
+async def interview(websocket: WebSocket, session_id: str):
+    """
+    Spoken interview over a WebSocket
+    
+    Each turn, the interviewer's reply is sent as {"type": "token", "text"}
+    messages while it is generated, then {"type": "done", "text"} with the
+    full reply. Each sentence is synthesized as soon as it is complete and
+    sent as an Ogg Opus binary message, so speech starts before the reply
+    is finished. The candidate answers with a text message. Both sides are
+    appended to the session transcript; a turn that fails is reported as
+    {"type": "error", "message"} and the socket waits for the next answer.
+    """
     await websocket.accept()
+    interview_session = await interview_sessions.get(session_id) or {}
+    sentences: asyncio.Queue = asyncio.Queue()
+    
+    async def speak():
+        # Synthesize and send sentences in order, alongside the token stream
+        while True:
+            sentence = await sentences.get()
+            try:
+                audio = await asyncio.to_thread(text_to_opus_google, sentence)
+            except Exception as e:
+                logger.error(f"Speech synthesis failed for session {session_id}: {str(e)}")
+                continue
+            await websocket.send_bytes(audio)
+    
+    speaker = asyncio.create_task(speak())
     user_input = ""
-    while True:
-        data = stream_graph_updates(user_input)
-        audio_response = text_to_opus_google(data)
-        await websocket.send_bytes(audio_response)
-        time.sleep(60)
-        user_input = await websocket.receive_text()
\ No newline at end of file
+    try:
+        while True:
+            reply, pending = [], ""
+            try:
+                if user_input:
+                    # Appended like /respond, keeping updates from other workers
+                    await interview_sessions.append(session_id, "transcript", {
+                        "role": "candidate",
+                        "content": user_input,
+                        "timestamp": time.time()
+                    })
+                async for token in astream_tokens(
+                    session_id,
+                    user_input,
+                    job_title=interview_session.get("job_title"),
+                    job_description=interview_session.get("job_description")
+                ):
+                    reply.append(token)
+                    await websocket.send_json({"type": "token", "text": token})
+                    complete, pending = _complete_sentences(pending + token)
+                    for sentence in complete:
+                        sentences.put_nowait(sentence)
+                if pending.strip():
+                    sentences.put_nowait(pending)
+                agent_response = "".join(reply)
+                await interview_sessions.append(session_id, "transcript", {
+                    "role": "agent",
+                    "content": agent_response,
+                    "timestamp": time.time()
+                })
+                await websocket.send_json({"type": "done", "text": agent_response})
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.error(f"Interview turn failed for session {session_id}: {str(e)}")
+                await websocket.send_json({"type": "error", "message": f"Failed to process response: {str(e)}"})
+            user_input = await websocket.receive_text()
+    except WebSocketDisconnect:
+        logger.info(f"Interview WebSocket disconnected for session {session_id}")
+    except Exception as e:
+        logger.error(f"Error in interview WebSocket for session {session_id}: {str(e)}")
+    finally:
+        speaker.cancel()
@@ -1,17 +1,25 @@
 """
 API router for speech recognition and transcription WebSocket endpoints
 """
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, BackgroundTasks
-from typing import Dict, Any, List
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, BackgroundTasks, HTTPException, status
+from fastapi.responses import StreamingResponse
 import asyncio
 import logging
-import uuid
 import json
 import os
-from datetime import datetime
+import time
 from pathlib import Path
+from typing import Optional
 
+from app.config import get_settings
+from app.schemas import BatchTranscriptionRequest
+from app.services.batch_transcription import BatchTranscriber, collect_wav_files
 from app.services.transcription import VoskTranscriptionService
+from app.services.word_timeline import word_timelines
+from app.utils.concurrency import ConcurrencyLimiter
+from app.utils.errors import CapacityError, ValidationError
+from app.utils.framing import FrameDecoder, PartialEmitter, ResultKind, encode_result_frame, parse_audio_frame
+from app.utils.opus import OpusStreamDecoder
 
 # Initialize router
 router = APIRouter(
@@ -27,40 +35,119 @@ TEMP_AUDIO_DIR = os.environ.get("TEMP_AUDIO_DIR", "temp_audio")
 Path(TEMP_AUDIO_DIR).mkdir(exist_ok=True)
 
 # Create transcription service instance
+settings = get_settings()
 try:
     # The model needs to be downloaded from https://alphacephei.com/vosk/models
     # and extracted to the models directory
-    transcription_service = VoskTranscriptionService()
+    transcription_service = VoskTranscriptionService(
+        pool_size=settings.VOSK_RECOGNIZER_POOL_SIZE,
+        acquire_timeout=settings.VOSK_POOL_ACQUIRE_TIMEOUT_SECONDS,
+        decode_mode=settings.VOSK_DECODE_MODE,
+        decode_workers=settings.VOSK_DECODE_WORKERS,
+        max_pending_chunks=settings.VOSK_MAX_PENDING_CHUNKS,
+        vad_enabled=settings.VOSK_VAD_ENABLED,
+        vad_options={
+            "threshold_db": settings.VOSK_VAD_THRESHOLD_DB,
+            "end_silence_ms": settings.VOSK_VAD_END_SILENCE_MS,
+        }
+    )
     logger.info("Transcription service initialized")
 except FileNotFoundError as e:
     logger.error(f"Error initializing transcription service: {str(e)}")
     transcription_service = None
 
-# Track active transcription sessions
-active_sessions: Dict[str, Dict[str, Any]] = {}
+# Batch jobs running at once; each starts up to VOSK_BATCH_WORKERS model-loading processes
+batch_jobs = ConcurrencyLimiter(settings.VOSK_BATCH_MAX_JOBS, timeout=0, resource="batch transcription jobs")
+
+# WebSocket wire protocols for /speech/ws
+SPEECH_PROTOCOLS = ("json", "binary")
+
+# Audio encodings for the json protocol
+SPEECH_CODECS = ("pcm16", "opus")
 
 
 @router.websocket("/ws/{session_id}")
-async def speech_recognition_websocket(websocket: WebSocket, session_id: str):
+async def speech_recognition_websocket(
+    websocket: WebSocket,
+    session_id: str,
+    protocol: str = "json",
+    codec: str = "pcm16"
+):
     """
     WebSocket endpoint for real-time speech recognition.
     
     Client sends audio chunks and receives transcription results.
+    
+    - protocol=json (default): bare binary audio chunks in, JSON text frames out.
+      With codec=opus the chunks are an Ogg or WebM Opus stream, as produced
+      by MediaRecorder, decoded incrementally; otherwise they are 16-bit PCM.
+    - protocol=binary: framed audio in, compact binary result frames out
+      (see app.utils.framing for the header layout and codecs)
+    
+    Partial results are coalesced: unchanged partials are suppressed, at
+    most SPEECH_PARTIAL_MAX_RATE_HZ are sent per second (the latest one
+    held back is sent when the rate window ends), and each carries
+    only the suffix that changed (`offset` characters of the previous
+    partial are kept). Final results are always sent immediately.
     """
     if transcription_service is None:
         await websocket.close(code=1013, reason="Transcription service not available")
         return
+    if protocol not in SPEECH_PROTOCOLS:
+        await websocket.close(code=1008, reason=f"Unsupported protocol: {protocol}")
+        return
+    if codec not in SPEECH_CODECS:
+        await websocket.close(code=1008, reason=f"Unsupported codec: {codec}")
+        return
+    try:
+        opus = OpusStreamDecoder(transcription_service.sample_rate) if codec == "opus" else None
+    except ValidationError as e:
+        await websocket.close(code=1011, reason=e.message)
+        return
     
     await websocket.accept()
-    logger.info(f"WebSocket connection established for session {session_id}")
-    
-    # Create unique transcription ID for this connection
-    transcription_id = str(uuid.uuid4())
-    active_sessions[transcription_id] = {
-        "session_id": session_id,
-        "start_time": datetime.now().isoformat(),
-        "transcriptions": []
-    }
+    logger.info(f"WebSocket connection established for session {session_id} ({protocol} protocol)")
+    
+    # Word timings are kept per session across reconnects, relative to its first stream
+    timeline = await word_timelines.open(session_id)
+    stream_base = time.time() - timeline.origin
+    
+    binary = protocol == "binary"
+    frames = FrameDecoder(transcription_service.sample_rate)
+    partials = PartialEmitter(settings.SPEECH_PARTIAL_MAX_RATE_HZ)
+    result_seq = 0
+    # Results are sent from the receive loop and from the partial flusher
+    send_lock = asyncio.Lock()
+    flusher: Optional[asyncio.Task] = None
+    
+    async def send_result(kind: ResultKind, text: str, offset: int = 0) -> None:
+        nonlocal result_seq
+        async with send_lock:
+            if binary:
+                await websocket.send_bytes(encode_result_frame(kind, result_seq, frames.last_timestamp_ms, text, offset))
+            elif kind == ResultKind.ERROR:
+                await websocket.send_json({"type": "error", "message": text})
+            elif kind == ResultKind.PARTIAL:
+                await websocket.send_json({
+                    "type": "transcription",
+                    "text": text,
+                    "offset": offset,
+                    "is_final": False
+                })
+            else:
+                await websocket.send_json({
+                    "type": "transcription",
+                    "text": text,
+                    "is_final": True
+                })
+            result_seq += 1
+    
+    async def flush_partial(delay: float) -> None:
+        # Send the partial held back by the rate limit once its window ends
+        await asyncio.sleep(delay)
+        update = partials.flush()
+        if update is not None:
+            await send_result(ResultKind.PARTIAL, update.text, update.offset)
     
     try:
         # Process audio chunks
@@ -70,52 +157,135 @@ async def speech_recognition_websocket(websocket: WebSocket, session_id: str):
                 data = await websocket.receive_bytes()
                 if not data:
                     break
-                yield data
+                if not binary:
+                    pcm = opus.feed(data) if opus is not None else data
+                    if pcm:
+                        yield pcm
+                    continue
+                
+                frame = parse_audio_frame(data)
+                if not frames.accept(frame):
+                    continue
+                if len(frame.payload):
+                    pcm = frames.decode(frame)
+                    if len(pcm):
+                        yield pcm
+                if frame.end_of_stream:
+                    break
+            
+            tail = opus.flush() if opus is not None else frames.flush()
+            if tail:
+                yield tail
         
         # Process and send transcription results
         async for result in transcription_service.transcribe_stream(audio_generator()):
             # Store partial/final results
             if "text" in result and result["text"]:
-                active_sessions[transcription_id]["transcriptions"].append({
-                    "text": result["text"],
-                    "is_final": True,
-                    "timestamp": datetime.now().isoformat()
-                })
-                await websocket.send_json({
-                    "type": "transcription",
-                    "text": result["text"],
-                    "is_final": True
-                })
+                timeline.add_utterance(result.get("result", []), stream_base)
+                partials.reset()
+                await send_result(ResultKind.FINAL, result["text"])
             elif "partial" in result and result["partial"]:
-                await websocket.send_json({
-                    "type": "transcription",
-                    "text": result["partial"],
-                    "is_final": False
-                })
+                update = partials.update(result["partial"])
+                if update is not None:
+                    await send_result(ResultKind.PARTIAL, update.text, update.offset)
+                elif partials.pending_delay() is not None and (flusher is None or flusher.done()):
+                    flusher = asyncio.create_task(flush_partial(partials.pending_delay()))
     
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for session {session_id}")
+    except CapacityError as e:
+        logger.warning(f"Rejecting session {session_id}: {e.message}")
+        try:
+            await websocket.close(code=1013, reason="Transcription capacity exhausted")
+        except:
+            pass
     except Exception as e:
         logger.error(f"Error in WebSocket: {str(e)}")
         try:
-            await websocket.send_json({
-                "type": "error",
-                "message": str(e)
-            })
+            await send_result(ResultKind.ERROR, str(e))
         except:
             pass
     finally:
-        # Clean up session data if needed
-        if transcription_id in active_sessions:
-            # Could save final transcription to database here
-            del active_sessions[transcription_id]
-        
+        if flusher is not None:
+            flusher.cancel()
+        await word_timelines.close(session_id)
+        logger.debug(f"Partial stats for session {session_id}: {partials.stats()}")
+        if binary:
+            logger.debug(f"Frame stats for session {session_id}: {frames.stats()}")
         try:
             await websocket.close()
         except:
             pass
 
 
+def _resolve_batch_path(root: Path, relative_path: str) -> Path:
+    """Resolve a client-supplied path, refusing anything outside the batch root"""
+    path = (root / relative_path).resolve()
+    if not path.is_relative_to(root):
+        raise ValueError(f"Path escapes the batch root: {relative_path}")
+    return path
+
+
+@router.post("/batch")
+async def batch_transcribe(request: BatchTranscriptionRequest):
+    """
+    Transcribe archived WAV recordings in bulk.
+    
+    - Accepts a list of files and/or a directory under the batch root
+    - Shards files across worker processes that each load the model once;
+      `workers` is capped at VOSK_BATCH_WORKERS, and requests beyond
+      VOSK_BATCH_MAX_JOBS running jobs are refused with 503
+    - Streams one NDJSON record per file as it completes, then a summary
+      with throughput as a real-time factor
+    """
+    root = Path(settings.TRANSCRIPTION_BATCH_ROOT).resolve()
+    inputs = list(request.paths)
+    if request.directory:
+        inputs.append(request.directory)
+    
+    try:
+        files = collect_wav_files(
+            [_resolve_batch_path(root, entry) for entry in inputs],
+            recursive=request.recursive
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    
+    if not files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No WAV files to transcribe"
+        )
+    
+    # Refuse early while every job slot is taken; the slot itself is taken
+    # inside the stream, so a client that never reads the body holds none
+    if batch_jobs.active >= batch_jobs.limit:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"All {batch_jobs.limit} {batch_jobs.resource} are in use"
+        )
+    
+    max_workers = settings.VOSK_BATCH_WORKERS or os.cpu_count() or 1
+    try:
+        transcriber = BatchTranscriber(workers=min(request.workers or max_workers, max_workers))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    
+    async def stream_results():
+        try:
+            async with batch_jobs.slot():
+                with transcriber:
+                    async for record in transcriber.run_async(files):
+                        yield json.dumps(record) + "\n"
+        except CapacityError as e:
+            # Another job took the last slot after the check above
+            yield json.dumps({"type": "error", "error": e.message}) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
 @router.post("/download-model")
 async def download_model(
     background_tasks: BackgroundTasks,
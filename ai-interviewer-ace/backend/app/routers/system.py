@@ -2,11 +2,16 @@
 API router for health and system endpoints
 """
 from fastapi import APIRouter, Depends
+import os
 import time
 import platform
 import sys
 
 from app.config import get_settings
+from app.Agent.index import agent_metrics
+from app.models.database import engine
+from app.routers.interviews import interview_sessions, session_reaper
+from app.utils.db_pool import pool_stats
 
 router = APIRouter(
     prefix="/system",
@@ -51,3 +56,38 @@ async def system_info():
         "platform": platform.platform(),
         "debug_mode": settings.DEBUG,
     }
+
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Runtime metrics for this worker process
+    
+    Returns database connection pool occupancy, checkout wait histogram
+    (milliseconds), overflow events and timeouts. Each uvicorn worker has
+    its own pool, so the database sees up to `workers` times
+    `pool_size + max_overflow` connections. Also returns the interview
+    session count against its limit, their total and largest size in
+    bytes, what the idle-session reaper has evicted, histograms of the
+    agent's prompt and completion tokens per LLM call, and its streamed
+    time to first token (milliseconds).
+    """
+    settings = get_settings()
+    workers = int(os.environ.get("HIREGAGE_WORKERS", "1"))
+    database = pool_stats(engine)
+    return {
+        "pid": os.getpid(),
+        "workers": workers,
+        "database": database,
+        "database_max_connections": (
+            workers * (settings.DATABASE_POOL_SIZE + settings.DATABASE_MAX_OVERFLOW)
+            if database is not None else None
+        ),
+        "sessions": {
+            **await interview_sessions.stats(),
+            "store": settings.SESSION_STORE,
+            "max_sessions": interview_sessions.max_sessions,
+            "reaper": session_reaper.stats(),
+        },
+        "agent": agent_metrics(),
+    }
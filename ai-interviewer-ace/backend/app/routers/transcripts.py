@@ -1,13 +1,24 @@
 """
 API router for transcript endpoints
 """
-from fastapi import APIRouter, Body, HTTPException, status
-from typing import Dict, Any, List
+from fastapi import APIRouter, Body, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Dict, Any, List, Optional
+from contextlib import aclosing
+import asyncio
 import json
 import os
 from datetime import datetime
 import logging
-from pathlib import Path
+
+from app.config import get_settings
+from app.models.database import SessionLocal
+from app.services.interview_repository import DatabaseTranscriptStorage, InterviewRepository, parse_timestamp
+from app.services.transcript_log import TranscriptLog
+from app.services.transcript_storage import TranscriptStorage
+from app.services.transcript_view import ConsolidatedTranscriptCache
+from app.services.word_timeline import word_timelines
+from app.utils.errors import ValidationError
 
 router = APIRouter(
     prefix="/transcript",
@@ -24,6 +35,64 @@ TRANSCRIPT_DIR = os.environ.get("TRANSCRIPT_DIR", "transcripts")
 # Ensure transcript directory exists
 os.makedirs(TRANSCRIPT_DIR, exist_ok=True)
 
+# Transcript storage: Message rows in the database, or append-only JSONL
+# logs (which read legacy <session_id>.json files too)
+settings = get_settings()
+transcript_storage: TranscriptStorage
+if settings.TRANSCRIPT_STORAGE == "database":
+    if SessionLocal is None:
+        raise RuntimeError("TRANSCRIPT_STORAGE=database requires DATABASE_URL")
+    transcript_storage = DatabaseTranscriptStorage(InterviewRepository(SessionLocal))
+else:
+    transcript_storage = TranscriptLog(
+        TRANSCRIPT_DIR,
+        fsync_interval=settings.TRANSCRIPT_FSYNC_INTERVAL_SECONDS,
+        tail_size=settings.TRANSCRIPT_TAIL_SIZE
+    )
+
+# Consolidated transcripts, kept current as entries are saved and checked
+# against storage for saves made by other workers
+consolidated_views = ConsolidatedTranscriptCache(
+    lambda session_id: transcript_storage.read(session_id),
+    max_sessions=settings.TRANSCRIPT_VIEW_CACHE_SIZE,
+    count=lambda session_id: transcript_storage.count(session_id)
+)
+
+
+def _transcript_entry(data: Any) -> Dict[str, Any]:
+    """Build a transcript entry from client data, raising ValueError if it is incomplete or malformed"""
+    if not isinstance(data, dict):
+        raise ValueError("Transcript entry must be an object")
+    text = data.get("text")
+    speaker = data.get("speaker")
+    if not text or not speaker:
+        raise ValueError("Missing required fields: text and speaker")
+    timestamp = data.get("timestamp")
+    if timestamp is None:
+        timestamp = datetime.now().isoformat()
+    elif not isinstance(timestamp, str):
+        # Consolidated views order entries by comparing timestamp strings
+        raise ValueError("timestamp must be a string")
+    else:
+        # Stored in one form whatever the storage, so they compare in time order
+        try:
+            timestamp = parse_timestamp(timestamp).isoformat()
+        except ValidationError:
+            raise ValueError(f"timestamp is not ISO 8601: {timestamp!r}")
+    return {
+        "text": text,
+        "speaker": speaker,
+        "timestamp": timestamp
+    }
+
+
+async def _save_entries(session_id: str, entries: List[Dict[str, Any]]) -> None:
+    """Commit validated entries in one write and update the session's consolidated view"""
+    with consolidated_views.saving(session_id):
+        await transcript_storage.append_many(session_id, entries)
+        for entry in entries:
+            consolidated_views.add(session_id, entry)
+
 
 @router.post("/{session_id}/save", status_code=status.HTTP_201_CREATED)
 async def save_transcript(
@@ -31,53 +100,27 @@ async def save_transcript(
     data: Dict[str, Any] = Body(...)
 ):
     """
-    Save a transcript entry to a JSON file.
+    Save a transcript entry to the session's transcript log.
     
     - Accepts transcript text and metadata
-    - Appends to an existing session file or creates a new one
-    - Returns success status
+    - Appends one line to the session's JSONL log; concurrent saves are safe
+    - Returns success status once the entry is durable
     """
     try:
-        text = data.get("text")
-        speaker = data.get("speaker")
-        timestamp = data.get("timestamp", datetime.now().isoformat())
-        
-        if not text or not speaker:
+        try:
+            transcript_entry = _transcript_entry(data)
+        except ValueError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Missing required fields: text and speaker"
+                detail=str(e)
             )
-            
-        # Create session-specific transcript file
-        file_path = Path(TRANSCRIPT_DIR) / f"{session_id}.json"
-        
-        # Prepare the transcript entry
-        transcript_entry = {
-            "text": text,
-            "speaker": speaker,
-            "timestamp": timestamp
-        }
-        
-        # Read existing transcript or create new list
-        try:
-            if file_path.exists():
-                with open(file_path, "r") as f:
-                    transcript_data = json.load(f)
-            else:
-                transcript_data = []
-        except json.JSONDecodeError:
-            # Handle case where file exists but is not valid JSON
-            transcript_data = []
-            
-        # Append new entry
-        transcript_data.append(transcript_entry)
         
-        # Write back to file
-        with open(file_path, "w") as f:
-            json.dump(transcript_data, f, indent=2)
+        await _save_entries(session_id, [transcript_entry])
             
         return {"status": "success", "message": "Transcript saved"}
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error saving transcript: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -86,24 +129,159 @@ async def save_transcript(
         )
 
 
-@router.get("/{session_id}", response_model=List[Dict[str, Any]])
-async def get_transcripts(session_id: str):
+@router.post("/{session_id}/save/batch", status_code=status.HTTP_201_CREATED)
+async def save_transcript_batch(
+    session_id: str,
+    data: List[Any] = Body(...)
+):
     """
-    Get all transcripts for a session.
+    Save several transcript entries to the session's transcript log at once.
     
-    - Retrieves the complete transcript history for a session
-    - Returns chronologically ordered transcript entries
+    - Accepts a list of entries, each shaped like a single save
+    - Validates every entry first; if any is invalid, nothing is saved
+    - Commits all entries with one write and one fsync, in list order
     """
     try:
-        file_path = Path(TRANSCRIPT_DIR) / f"{session_id}.json"
+        if not data:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No transcript entries to save"
+            )
+        if len(data) > settings.TRANSCRIPT_BATCH_MAX_ENTRIES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {settings.TRANSCRIPT_BATCH_MAX_ENTRIES} entries per batch"
+            )
         
-        if not file_path.exists():
-            return []
+        entries = []
+        for index, item in enumerate(data):
+            try:
+                entries.append(_transcript_entry(item))
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Entry {index}: {e}"
+                )
+        
+        await _save_entries(session_id, entries)
+        
+        return {"status": "success", "message": f"Saved {len(entries)} transcript entries", "count": len(entries)}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error saving transcript batch: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save transcripts: {str(e)}"
+        )
+
+
+@router.websocket("/ws/{session_id}")
+async def transcript_websocket(websocket: WebSocket, session_id: str):
+    """
+    WebSocket channel for saving transcript entries without a request per entry.
+    
+    - Each message is a JSON entry, or {"id": ..., "entries": [...]}
+    - Messages that arrive while a commit is in flight are committed
+      together with one write
+    - Each message is acknowledged with {"type": "saved", "id", "count"} once
+      durable, or {"type": "error", "id", "message"} if it is invalid (an
+      invalid message saves nothing and does not affect the others)
+    """
+    await websocket.accept()
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def receive():
+        try:
+            while True:
+                queue.put_nowait(await websocket.receive_json())
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            logger.warning(f"Closing transcript socket for session {session_id}: {str(e)}")
+        finally:
+            queue.put_nowait(None)
+    
+    receiver = asyncio.create_task(receive())
+    try:
+        closed = False
+        while not closed:
+            messages = [await queue.get()]
+            while not queue.empty():
+                messages.append(queue.get_nowait())
+            if messages[-1] is None:
+                messages.pop()
+                closed = True
             
-        with open(file_path, "r") as f:
-            transcript_data = json.load(f)
+            entries, acks = [], []
+            for message in messages:
+                message_id = message.get("id") if isinstance(message, dict) else None
+                items = message.get("entries") if isinstance(message, dict) and "entries" in message else [message]
+                try:
+                    if not isinstance(items, list) or not items:
+                        raise ValueError("entries must be a non-empty list")
+                    batch = [_transcript_entry(item) for item in items]
+                except ValueError as e:
+                    acks.append({"type": "error", "id": message_id, "message": str(e)})
+                    continue
+                entries.extend(batch)
+                acks.append({"type": "saved", "id": message_id, "count": len(batch)})
             
-        return transcript_data
+            if entries:
+                await _save_entries(session_id, entries)
+            if not closed:
+                for ack in acks:
+                    await websocket.send_json(ack)
+    
+    except WebSocketDisconnect:
+        logger.info(f"Transcript socket disconnected for session {session_id}")
+    except Exception as e:
+        logger.error(f"Error in transcript socket: {str(e)}", exc_info=True)
+        try:
+            await websocket.send_json({"type": "error", "message": str(e)})
+        except:
+            pass
+    finally:
+        receiver.cancel()
+        try:
+            await websocket.close()
+        except:
+            pass
+
+
+@router.get("/{session_id}", response_model=List[Dict[str, Any]])
+async def get_transcripts(
+    session_id: str,
+    since: int = Query(0, ge=0, description="Cursor from a previous page's X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, description="Most entries to return (default: all)"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json list or streamed ndjson")
+):
+    """
+    Get transcripts for a session.
+    
+    - Returns entries in save order, starting at the `since` cursor
+    - `limit` pages the result; the `X-Next-Cursor` response header is the
+      `since` value for the next page (poll with it to get only new entries)
+    - `format=ndjson` streams one entry per line straight from storage
+      without building the whole list
+    """
+    if format == "ndjson":
+        async def stream_entries():
+            count = 0
+            async with aclosing(transcript_storage.iter_entries(session_id, since)) as entries:
+                async for entry in entries:
+                    if limit is not None and count >= limit:
+                        break
+                    count += 1
+                    yield json.dumps(entry) + "\n"
+        
+        return StreamingResponse(stream_entries(), media_type="application/x-ndjson")
+    
+    try:
+        entries, cursor = await transcript_storage.read_range(session_id, since, limit)
+        # Entries come straight from storage, so skip response model validation
+        return JSONResponse(entries, headers={"X-Next-Cursor": str(cursor)})
     
     except Exception as e:
         logger.error(f"Error fetching transcripts: {str(e)}", exc_info=True)
@@ -118,80 +296,15 @@ async def get_consolidated_transcript(session_id: str):
     """
     Get a consolidated transcript for a session in a format suitable for model input.
     
-    - Retrieves all transcript entries for a session
     - Groups responses by questions
     - Only includes interviewee responses (non-AI speaker)
     - Returns all answers grouped by questions for the model
+    - Served from a view updated as entries are saved; the full transcript
+      is only read the first time a session is requested, or again when
+      another worker has saved entries to it
     """
     try:
-        file_path = Path(TRANSCRIPT_DIR) / f"{session_id}.json"
-        
-        if not file_path.exists():
-            return {"final_answer": "", "raw_segments": [], "answers_by_question": []}
-            
-        with open(file_path, "r") as f:
-            transcript_data = json.load(f)
-        
-        # Filter user and AI responses
-        user_segments = [entry for entry in transcript_data 
-                        if entry.get("speaker", "").lower() != "ai" 
-                        and entry.get("text")]
-        
-        ai_segments = [entry for entry in transcript_data
-                      if entry.get("speaker", "").lower() == "ai"
-                      and entry.get("text")]
-        
-        # Group answers by questions
-        answers_by_question = []
-        
-        # First, capture the most recent answer
-        final_answer = user_segments[-1]["text"] if user_segments else ""
-        
-        # Then build the Q&A pairs
-        current_question = None
-        current_answers = []
-        
-        # Process all transcript entries chronologically
-        all_segments = sorted(transcript_data, key=lambda x: x.get("timestamp", ""))
-        
-        for entry in all_segments:
-            speaker = entry.get("speaker", "").lower()
-            text = entry.get("text", "")
-            
-            if not text:
-                continue
-                
-            if speaker == "ai":
-                # When we encounter an AI message, it's a new question
-                # Save previous Q&A pair if it exists
-                if current_question and current_answers:
-                    answers_by_question.append({
-                        "question": current_question,
-                        "answer": " ".join(current_answers)
-                    })
-                
-                # Start a new question
-                current_question = text
-                current_answers = []
-            else:
-                # User response - add to current answer set
-                if current_question:  # Only add if we have a question
-                    current_answers.append(text)
-        
-        # Don't forget the last Q&A pair
-        if current_question and current_answers:
-            answers_by_question.append({
-                "question": current_question,
-                "answer": " ".join(current_answers)
-            })
-        
-        # Also include all raw segments for context or analysis
-        return {
-            "final_answer": final_answer,
-            "raw_segments": user_segments,
-            "complete_transcript": " ".join([segment["text"] for segment in user_segments]),
-            "answers_by_question": answers_by_question
-        }
+        return await consolidated_views.get(session_id)
     
     except Exception as e:
         logger.error(f"Error consolidating transcripts: {str(e)}", exc_info=True)
@@ -199,3 +312,39 @@ async def get_consolidated_transcript(session_id: str):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to consolidate transcripts: {str(e)}"
         )
+
+
+@router.get("/{session_id}/words", response_model=Dict[str, Any])
+async def get_word_timeline(
+    session_id: str,
+    min_pause: float = 0.5,
+    low_confidence: float = 0.6
+):
+    """
+    Get word-level timings and confidences recognized for a session.
+    
+    - Returns parallel arrays (words, start, end, conf, utterance) with times
+      in seconds since the session's first audio stream started (`origin`)
+    - Includes speaking rate, pauses of at least `min_pause` seconds and
+      spans of words below `low_confidence`
+    """
+    try:
+        timeline = await word_timelines.get(session_id)
+    except Exception as e:
+        logger.error(f"Error fetching word timeline: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch word timeline: {str(e)}"
+        )
+    
+    if timeline is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No recognized words for session {session_id}"
+        )
+    
+    return {
+        "session_id": session_id,
+        "columns": timeline.to_dict(),
+        "summary": timeline.summary(min_pause, low_confidence)
+    }
@@ -8,5 +8,6 @@ from .schemas import (
     Message,
     InterviewResponse,
     EvaluationScore,
-    InterviewSummary
+    InterviewSummary,
+    BatchTranscriptionRequest
 )
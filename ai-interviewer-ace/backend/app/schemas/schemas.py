@@ -62,3 +62,11 @@ class InterviewSummary(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class BatchTranscriptionRequest(BaseModel):
+    """Schema for a batch transcription job"""
+    paths: List[str] = Field(default_factory=list, description="WAV files relative to the batch root")
+    directory: Optional[str] = Field(None, description="Directory of WAV files relative to the batch root")
+    recursive: bool = Field(False, description="Whether to search the directory recursively")
+    workers: Optional[int] = Field(None, ge=1, description="Number of worker processes, capped at VOSK_BATCH_WORKERS")
@@ -0,0 +1,247 @@
+"""
+Columnar export of interviews, messages and evaluation scores for analytics
+"""
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.models import Evaluation, Interview, Message
+from app.utils.errors import ValidationError
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+# Set up logging
+logger = logging.getLogger("hiregage.analytics")
+
+# Exportable tables and output formats
+TABLES = ("interviews", "messages", "scores")
+FORMATS = {"parquet": ".parquet", "arrow": ".arrows"}
+MEDIA_TYPES = {"parquet": "application/vnd.apache.parquet", "arrow": "application/vnd.apache.arrow.stream"}
+
+
+def _schemas() -> Dict[str, "pa.Schema"]:
+    return {
+        "interviews": pa.schema([
+            ("id", pa.string()),
+            ("job_title", pa.string()),
+            ("company_name", pa.string()),
+            ("created_at", pa.timestamp("us")),
+            ("completed", pa.bool_()),
+            ("duration_minutes", pa.int32()),
+            ("evaluated_at", pa.timestamp("us")),
+            ("summary_json", pa.string()),
+            ("feedback", pa.string()),
+        ]),
+        "messages": pa.schema([
+            ("id", pa.int64()),
+            ("interview_id", pa.string()),
+            ("role", pa.string()),
+            ("content", pa.string()),
+            ("timestamp", pa.timestamp("us")),
+        ]),
+        "scores": pa.schema([
+            ("interview_id", pa.string()),
+            ("metric", pa.string()),
+            ("score", pa.float64()),
+            ("value", pa.string()),
+        ]),
+    }
+
+
+def flatten_scores(scores: Any, prefix: str = "") -> Iterator[Tuple[str, Optional[float], Optional[str]]]:
+    """
+    Flatten an evaluation's scores JSON into (metric, score, value) rows
+
+    Nested objects become dotted metric names. Numbers go in score; any
+    other value is kept as JSON text in value.
+    """
+    if isinstance(scores, dict):
+        for key, item in scores.items():
+            yield from flatten_scores(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(scores, (int, float)) and not isinstance(scores, bool):
+        yield prefix, float(scores), None
+    elif scores is not None:
+        yield prefix, None, scores if isinstance(scores, str) else json.dumps(scores)
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back in chunks"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class AnalyticsExporter:
+    """
+    Streams interview data out of the database as Parquet or Arrow IPC
+
+    Rows are read with keyset-paginated queries of batch_rows rows and each
+    page is written as one record batch (Parquet row group), so memory use
+    is bounded by the batch size rather than the table size. Scores are
+    flattened into a long (interview_id, metric, score, value) table so
+    dashboards can aggregate them without parsing JSON. Requires pyarrow
+    (`pip install pyarrow`).
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, batch_rows: int = 5000):
+        """
+        Initialize the exporter
+
+        Args:
+            session_factory: Factory for AsyncSession objects
+            batch_rows: Rows fetched and written per batch (default: 5000)
+
+        Raises:
+            ValidationError: If pyarrow is not installed
+        """
+        if pa is None:
+            raise ValidationError("Analytics export requires pyarrow (pip install pyarrow)")
+        self.session_factory = session_factory
+        self.batch_rows = batch_rows
+        self.schemas = _schemas()
+
+    async def _pages(self, query, key) -> AsyncIterator[List[Any]]:
+        # Keyset pagination: each page starts after the last key of the previous one
+        last = None
+        while True:
+            page_query = query if last is None else query.where(key > last)
+            async with self.session_factory() as session:
+                rows = (await session.execute(page_query.order_by(key).limit(self.batch_rows))).all()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < self.batch_rows:
+                return
+            last = rows[-1][0]
+
+    async def batches(self, table: str) -> AsyncIterator["pa.RecordBatch"]:
+        """
+        Yield a table's rows as record batches of at most batch_rows rows
+
+        Raises:
+            ValidationError: If the table is unknown
+        """
+        if table not in TABLES:
+            raise ValidationError(f"Unknown export table: {table}")
+        schema = self.schemas[table]
+
+        if table == "interviews":
+            query = select(
+                Interview.id, Interview.job_title, Interview.company_name, Interview.created_at,
+                Interview.completed, Interview.duration_minutes, Evaluation.created_at,
+                Evaluation.summary, Evaluation.feedback
+            ).outerjoin(Evaluation, Evaluation.interview_id == Interview.id)
+            async for rows in self._pages(query, Interview.id):
+                columns = list(zip(*rows))
+                columns[7] = [None if s is None else json.dumps(s) for s in columns[7]]
+                yield pa.RecordBatch.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+                )
+
+        elif table == "messages":
+            query = select(Message.id, Message.interview_id, Message.role, Message.content, Message.timestamp)
+            async for rows in self._pages(query, Message.id):
+                yield pa.RecordBatch.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(zip(*rows), schema)], schema=schema
+                )
+
+        else:
+            query = select(Evaluation.id, Evaluation.interview_id, Evaluation.scores)
+            async for rows in self._pages(query, Evaluation.id):
+                flat = [
+                    (interview_id, metric, score, value)
+                    for _, interview_id, scores in rows
+                    for metric, score, value in flatten_scores(scores)
+                ]
+                if flat:
+                    yield pa.RecordBatch.from_arrays(
+                        [pa.array(column, type=field.type) for column, field in zip(zip(*flat), schema)], schema=schema
+                    )
+
+    def _writer(self, sink, table: str, fmt: str):
+        schema = self.schemas[table]
+        if fmt == "parquet":
+            return pq.ParquetWriter(sink, schema, compression="zstd")
+        if fmt == "arrow":
+            return pa.ipc.new_stream(sink, schema)
+        raise ValidationError(f"Unknown export format: {fmt}")
+
+    async def stream(self, table: str, fmt: str = "parquet") -> AsyncIterator[bytes]:
+        """
+        Yield an encoded export of a table as it is produced
+
+        Each batch is encoded in a worker thread and its bytes are yielded
+        before the next page is read.
+        """
+        if table not in TABLES:
+            raise ValidationError(f"Unknown export table: {table}")
+        sink = _ChunkSink()
+        writer = self._writer(sink, table, fmt)
+        try:
+            async for batch in self.batches(table):
+                await asyncio.to_thread(writer.write_batch, batch)
+                data = sink.take()
+                if data:
+                    yield data
+        finally:
+            writer.close()
+        yield sink.take()
+
+    async def export_to(self, directory: str, fmt: str = "parquet") -> Dict[str, Dict[str, Any]]:
+        """
+        Write every table to `<directory>/<table><ext>`
+
+        Returns:
+            Dict mapping each table to its path and size in bytes
+        """
+        if fmt not in FORMATS:
+            raise ValidationError(f"Unknown export format: {fmt}")
+        output = Path(directory)
+        output.mkdir(parents=True, exist_ok=True)
+        results = {}
+        for table in TABLES:
+            path = output / f"{table}{FORMATS[fmt]}"
+            f = await asyncio.to_thread(open, path, "wb")
+            try:
+                async for data in self.stream(table, fmt):
+                    await asyncio.to_thread(f.write, data)
+            finally:
+                await asyncio.to_thread(f.close)
+            results[table] = {"path": str(path), "bytes": path.stat().st_size}
+            logger.info(f"Exported {table} to {path} ({results[table]['bytes']} bytes)")
+        return results
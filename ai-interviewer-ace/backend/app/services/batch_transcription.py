@@ -0,0 +1,200 @@
+"""
+Batch transcription of archived WAV recordings across a process pool
+"""
+import os
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Iterable, Iterator, List, Optional
+
+from app.services import transcription
+from app.services.transcription import resolve_model_dir
+from app.utils.audio import WavReader
+
+# Set up logging
+logger = logging.getLogger("hiregage.transcription.batch")
+
+
+def collect_wav_files(inputs: Iterable[str], recursive: bool = False) -> List[Path]:
+    """
+    Expand a list of files and directories into WAV file paths
+
+    Args:
+        inputs: WAV file paths and/or directories containing WAV files
+        recursive: Whether to search directories recursively
+
+    Returns:
+        List[Path]: Sorted, de-duplicated WAV file paths
+    """
+    pattern = "**/*.wav" if recursive else "*.wav"
+    files = set()
+    for entry in inputs:
+        path = Path(entry)
+        if path.is_dir():
+            files.update(p for p in path.glob(pattern) if p.is_file())
+        elif path.is_file():
+            files.add(path)
+        else:
+            raise FileNotFoundError(f"Audio path not found: {entry}")
+    return sorted(files)
+
+
+def audio_duration(audio_file_path: str, sample_rate: int = 16000) -> float:
+    """
+    Get the duration of an audio file in seconds
+
+    Files without a RIFF header are treated as raw 16-bit mono PCM
+    at sample_rate.
+    """
+    with WavReader(audio_file_path, raw_sample_rate=sample_rate) as reader:
+        return reader.info.duration
+
+
+def _transcribe_one(audio_file_path: str, sample_rate: int) -> Dict[str, Any]:
+    """Transcribe one file inside a batch worker process"""
+    started = time.perf_counter()
+    result = transcription._worker_transcribe_file(audio_file_path)
+    decode_seconds = time.perf_counter() - started
+    audio_seconds = audio_duration(audio_file_path, sample_rate)
+
+    return {
+        "type": "result",
+        "file": audio_file_path,
+        "text": result.get("text", ""),
+        "result": result.get("result", []),
+        "audio_seconds": round(audio_seconds, 3),
+        "decode_seconds": round(decode_seconds, 3),
+        "rtf": round(decode_seconds / audio_seconds, 4) if audio_seconds else None,
+    }
+
+
+class BatchTranscriber:
+    """
+    Fans WAV files out across worker processes
+
+    Each worker loads the Vosk model once in its initializer and then
+    transcribes files one at a time. Results are yielded as soon as each
+    file completes, followed by a summary record reporting throughput as
+    a real-time factor (processing seconds per second of audio).
+    """
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        sample_rate: int = 16000,
+        workers: Optional[int] = None
+    ):
+        """
+        Initialize the batch transcriber
+
+        Args:
+            model_path: Path to the Vosk model directory (optional)
+            sample_rate: Audio sample rate in Hz (default: 16000)
+            workers: Number of worker processes (default: CPU count)
+        """
+        self.model_dir = resolve_model_dir(model_path)
+        self.sample_rate = sample_rate
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "BatchTranscriber":
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=transcription._init_decode_worker,
+            initargs=(str(self.model_dir), self.sample_rate, 1)
+        )
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _submit(self, paths: Iterable[Path]) -> Dict[Future, str]:
+        if self._executor is None:
+            raise RuntimeError("BatchTranscriber must be used as a context manager")
+        return {
+            self._executor.submit(_transcribe_one, str(path), self.sample_rate): str(path)
+            for path in paths
+        }
+
+    def _outcome(self, future: Future, path: str, summary: "BatchSummary") -> Dict[str, Any]:
+        try:
+            record = future.result()
+        except Exception as e:
+            logger.error(f"Error transcribing file {path}: {str(e)}")
+            record = {"type": "error", "file": path, "error": str(e)}
+        summary.add(record)
+        return record
+
+    def run(self, paths: Iterable[Path]) -> Iterator[Dict[str, Any]]:
+        """
+        Transcribe files, yielding per-file results as they complete
+
+        Args:
+            paths: WAV files to transcribe
+
+        Yields:
+            dict: One record per file, then a final summary record
+        """
+        summary = BatchSummary(self.workers)
+        futures = self._submit(paths)
+        for future in as_completed(futures):
+            yield self._outcome(future, futures[future], summary)
+        yield summary.to_dict()
+
+    async def run_async(self, paths: Iterable[Path]) -> AsyncGenerator[Dict[str, Any], None]:
+        """Async variant of run() that never blocks the event loop"""
+        summary = BatchSummary(self.workers)
+        futures = self._submit(paths)
+        pending = {asyncio.wrap_future(future): future for future in futures}
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in done:
+                future = pending.pop(waiter)
+                yield self._outcome(future, futures[future], summary)
+        yield summary.to_dict()
+
+
+class BatchSummary:
+    """Aggregate throughput counters for a batch run"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.started = time.perf_counter()
+        self.files = 0
+        self.failed = 0
+        self.audio_seconds = 0.0
+        self.decode_seconds = 0.0
+
+    def add(self, record: Dict[str, Any]) -> None:
+        if record["type"] == "error":
+            self.failed += 1
+            return
+        self.files += 1
+        self.audio_seconds += record["audio_seconds"]
+        self.decode_seconds += record["decode_seconds"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        wall_seconds = time.perf_counter() - self.started
+        audio = self.audio_seconds
+        return {
+            "type": "summary",
+            "files": self.files,
+            "failed": self.failed,
+            "workers": self.workers,
+            "audio_seconds": round(audio, 3),
+            "wall_seconds": round(wall_seconds, 3),
+            # Wall-clock seconds per audio second across the whole pool
+            "rtf": round(wall_seconds / audio, 4) if audio else None,
+            # Decode seconds per audio second for a single worker
+            "worker_rtf": round(self.decode_seconds / audio, 4) if audio else None,
+        }
@@ -0,0 +1,278 @@
+"""
+Database repository for interviews, their messages and evaluations
+"""
+import asyncio
+import datetime
+import logging
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from app.models.models import Evaluation, Interview, Message
+from app.services.transcript_storage import TranscriptStorage
+from app.utils.errors import DatabaseError, ValidationError
+
+# Set up logging
+logger = logging.getLogger("hiregage.repository")
+
+# Rows fetched per query when streaming a transcript
+_PAGE_SIZE = 500
+
+
+class InterviewRepository:
+    """
+    Data access for interviews on the async session factory
+
+    Each method runs in its own transaction. Messages are written with a
+    single multi-row INSERT, and read through the (interview_id, timestamp)
+    index. Interviews are returned with their messages and evaluation
+    eager-loaded with one extra query per relationship, so listing many
+    interviews costs three queries rather than one per interview.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        """
+        Initialize the repository
+
+        Args:
+            session_factory: Factory for AsyncSession objects, with expire_on_commit
+                disabled so returned objects stay usable (app.models.database.SessionLocal)
+        """
+        self.session_factory = session_factory
+
+    @asynccontextmanager
+    async def _transaction(self) -> AsyncIterator[AsyncSession]:
+        async with self.session_factory() as session:
+            try:
+                async with session.begin():
+                    yield session
+            except SQLAlchemyError as e:
+                logger.error(f"Database operation failed: {str(e)}")
+                raise DatabaseError(str(e), e)
+
+    @staticmethod
+    def _with_relations(query):
+        return query.options(selectinload(Interview.messages), selectinload(Interview.evaluation))
+
+    async def create_interview(
+        self,
+        interview_id: str,
+        job_title: str,
+        company_name: Optional[str] = None,
+        job_description: Optional[str] = None,
+        duration_minutes: int = 15
+    ) -> Interview:
+        """Create an interview record"""
+        interview = Interview(
+            id=interview_id,
+            job_title=job_title,
+            company_name=company_name,
+            job_description=job_description,
+            duration_minutes=duration_minutes
+        )
+        async with self._transaction() as session:
+            session.add(interview)
+        return interview
+
+    async def ensure_interview(self, interview_id: str) -> None:
+        """Create a placeholder interview record if none exists"""
+        async with self._transaction() as session:
+            if await session.get(Interview, interview_id) is None:
+                try:
+                    async with session.begin_nested():
+                        session.add(Interview(id=interview_id, job_title=""))
+                except IntegrityError:
+                    # A concurrent first save created it after the lookup
+                    pass
+
+    async def get_interview(self, interview_id: str) -> Optional[Interview]:
+        """Get an interview with its messages and evaluation loaded"""
+        async with self._transaction() as session:
+            result = await session.execute(
+                self._with_relations(select(Interview).where(Interview.id == interview_id))
+            )
+            return result.scalar_one_or_none()
+
+    async def list_interviews(self, limit: int = 50, offset: int = 0) -> List[Interview]:
+        """Get the most recent interviews with their messages and evaluations loaded"""
+        async with self._transaction() as session:
+            result = await session.execute(
+                self._with_relations(
+                    select(Interview).order_by(Interview.created_at.desc()).limit(limit).offset(offset)
+                )
+            )
+            return list(result.scalars())
+
+    async def add_messages(self, interview_id: str, messages: List[Dict[str, Any]]) -> None:
+        """
+        Insert messages for an interview in one statement
+
+        Args:
+            interview_id: Interview the messages belong to
+            messages: Dicts with role, content and (optionally) timestamp
+        """
+        if not messages:
+            return
+        rows = [{"interview_id": interview_id, **message} for message in messages]
+        async with self._transaction() as session:
+            await session.execute(insert(Message), rows)
+
+    async def get_messages(
+        self,
+        interview_id: str,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        order_by_id: bool = False
+    ) -> List[Message]:
+        """
+        Get an interview's messages, optionally within [start, end)
+
+        Messages are ordered by timestamp, or by insertion order when
+        order_by_id is set. after_id skips messages up to and including
+        that id, for keyset paging.
+        """
+        query = select(Message).where(Message.interview_id == interview_id)
+        if start is not None:
+            query = query.where(Message.timestamp >= start)
+        if end is not None:
+            query = query.where(Message.timestamp < end)
+        if after_id is not None:
+            query = query.where(Message.id > after_id)
+        query = query.order_by(Message.id) if order_by_id else query.order_by(Message.timestamp, Message.id)
+        if limit is not None:
+            query = query.limit(limit)
+        async with self._transaction() as session:
+            return list((await session.execute(query)).scalars())
+
+    async def count_messages(self, interview_id: str) -> int:
+        """Number of messages stored for an interview"""
+        query = select(func.count()).select_from(Message).where(Message.interview_id == interview_id)
+        async with self._transaction() as session:
+            return (await session.execute(query)).scalar_one()
+
+    async def save_evaluation(
+        self,
+        interview_id: str,
+        summary: Optional[Dict[str, Any]] = None,
+        scores: Optional[Dict[str, Any]] = None,
+        feedback: Optional[str] = None
+    ) -> Evaluation:
+        """Create or replace an interview's evaluation and mark it completed"""
+        async with self._transaction() as session:
+            interview = (await session.execute(
+                select(Interview).options(selectinload(Interview.evaluation)).where(Interview.id == interview_id)
+            )).scalar_one_or_none()
+            if interview is None:
+                raise ValidationError(f"Unknown interview: {interview_id}")
+            evaluation = interview.evaluation or Evaluation(interview_id=interview_id)
+            evaluation.summary = summary
+            evaluation.scores = scores
+            evaluation.feedback = feedback
+            interview.evaluation = evaluation
+            interview.completed = True
+        return evaluation
+
+
+def parse_timestamp(value: Any) -> datetime.datetime:
+    """Parse an entry's ISO 8601 timestamp, converting aware times to naive UTC"""
+    try:
+        timestamp = datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"Timestamp is not ISO 8601: {value!r}")
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def _to_entry(message: Message) -> Dict[str, Any]:
+    return {"text": message.content, "speaker": message.role, "timestamp": message.timestamp.isoformat()}
+
+
+class DatabaseTranscriptStorage(TranscriptStorage):
+    """
+    Transcript entries stored as Message rows
+
+    An entry's speaker is stored as the message role and its text as the
+    content. Positions are message ids, so cursors stay valid as entries
+    are added. A session without an interview record gets a placeholder
+    one on its first save.
+    """
+
+    def __init__(self, repository: InterviewRepository):
+        """
+        Initialize the storage
+
+        Args:
+            repository: Repository the messages are written through
+        """
+        self.repository = repository
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._known: Set[str] = set()
+
+    def _lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
+    async def append(self, session_id: str, entry: Dict[str, Any]) -> None:
+        """Insert an entry as a message"""
+        await self.append_many(session_id, [entry])
+
+    async def append_many(self, session_id: str, entries: List[Dict[str, Any]]) -> None:
+        """Insert entries as messages with one statement"""
+        rows = [
+            {"role": entry["speaker"], "content": entry["text"], "timestamp": parse_timestamp(entry["timestamp"])}
+            for entry in entries
+        ]
+        async with self._lock(session_id):
+            if session_id not in self._known:
+                await self.repository.ensure_interview(session_id)
+                self._known.add(session_id)
+            await self.repository.add_messages(session_id, rows)
+
+    async def read(self, session_id: str) -> List[Dict[str, Any]]:
+        """Get every entry for a session in save order"""
+        return [entry async for entry in self.iter_entries(session_id)]
+
+    async def count(self, session_id: str) -> int:
+        """Number of messages stored for a session"""
+        return await self.repository.count_messages(session_id)
+
+    async def read_range(
+        self,
+        session_id: str,
+        since: int = 0,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get up to limit entries with message ids of at least since
+
+        Returns:
+            Tuple of the entries and the cursor to pass as since for the next page
+        """
+        messages = await self.repository.get_messages(
+            session_id, after_id=since - 1, limit=limit, order_by_id=True
+        )
+        cursor = messages[-1].id + 1 if messages else since
+        return [_to_entry(message) for message in messages], cursor
+
+    async def iter_entries(self, session_id: str, since: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Yield entries from since onwards, fetching them a page at a time"""
+        while True:
+            entries, cursor = await self.read_range(session_id, since, _PAGE_SIZE)
+            for entry in entries:
+                yield entry
+            if len(entries) < _PAGE_SIZE:
+                return
+            since = cursor
+
+    async def close(self) -> None:
+        """Nothing is buffered; every append is committed before it returns"""
@@ -0,0 +1,157 @@
+"""
+Background eviction of idle and ended interview sessions
+"""
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.services.session_store import SessionStore
+
+# Set up logging
+logger = logging.getLogger("hiregage.sessions.reaper")
+
+
+class SessionReaper:
+    """
+    Archives and evicts interview sessions that are no longer in use
+
+    A session is reaped once it has been idle for idle_seconds, or for
+    ended_seconds after the interview was ended (its data has an
+    "ended_at" time). Each is handed to persist before it is removed; if
+    persisting fails the session is kept and retried on the next pass. A
+    session used again while it was being persisted is not removed, so
+    persist must be safe to repeat. When the store does not survive a
+    restart, stop() persists every remaining session.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        persist: Callable[[str, Dict[str, Any]], Awaitable[None]],
+        idle_seconds: float = 1800,
+        ended_seconds: float = 300,
+        interval: float = 60
+    ):
+        """
+        Initialize the reaper
+
+        Args:
+            store: Store the sessions live in
+            persist: Coroutine function saving a session before eviction
+            idle_seconds: Idle seconds before a session is reaped (default: 1800)
+            ended_seconds: Idle seconds before an ended session is reaped (default: 300)
+            interval: Seconds between passes (default: 60)
+        """
+        self.store = store
+        self.persist = persist
+        self.idle_seconds = idle_seconds
+        self.ended_seconds = ended_seconds
+        self.interval = interval
+        self.reaped = 0
+        self.persist_failures = 0
+        self.last_run: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def reap(self) -> int:
+        """
+        Archive and evict every session due for reaping
+
+        Returns:
+            int: Number of sessions evicted
+        """
+        reaped = 0
+        candidates = await self.store.idle(min(self.idle_seconds, self.ended_seconds))
+        for session_id, data, idle in candidates:
+            limit = self.ended_seconds if data.get("ended_at") else self.idle_seconds
+            if idle < limit:
+                continue
+            try:
+                await self.persist(session_id, data)
+            except Exception as e:
+                self.persist_failures += 1
+                logger.error(f"Failed to persist session {session_id}, keeping it: {str(e)}")
+                continue
+            if await self.store.evict(session_id, limit):
+                reaped += 1
+        self.reaped += reaped
+        self.last_run = time.time()
+        if reaped:
+            logger.info(f"Reaped {reaped} idle or ended sessions")
+        return reaped
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"Session reaper pass failed: {str(e)}")
+
+    def start(self) -> None:
+        """Start reaping in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop reaping, persisting remaining sessions if the store is not persistent"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if not self.store.persistent:
+            for session_id, data, _ in await self.store.idle(0, limit=self.store.max_sessions):
+                try:
+                    await self.persist(session_id, data)
+                except Exception as e:
+                    logger.error(f"Failed to persist session {session_id} at shutdown: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the sessions reaped, failed persists and the last pass time"""
+        return {
+            "reaped": self.reaped,
+            "persist_failures": self.persist_failures,
+            "last_run": self.last_run,
+        }
+
+
+class SessionArchive:
+    """
+    Evicted sessions saved as `<directory>/<session_id>.json`
+
+    Each save replaces the session's file atomically, so saving a session
+    again after it changed is safe.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize the archive
+
+        Args:
+            directory: Directory the session files are written to
+        """
+        self.directory = Path(directory)
+
+    def _write(self, session_id: str, data: Dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{session_id}.json"
+        # A temporary file per save, so concurrent saves of a session do not share one
+        fd, temporary = tempfile.mkstemp(dir=self.directory, prefix=f".{session_id}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"session_id": session_id, **data}, f)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    async def save(self, session_id: str, data: Dict[str, Any]) -> None:
+        """Write a session's data"""
+        await asyncio.to_thread(self._write, session_id, data)
@@ -0,0 +1,510 @@
+"""
+Session stores for live interview state
+"""
+import datetime
+import logging
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Text, cast, delete, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.models import InterviewSession
+from app.utils.errors import DatabaseError
+
+# Set up logging
+logger = logging.getLogger("hiregage.sessions")
+
+
+class SessionStore(ABC):
+    """
+    Where interview session state is kept between requests
+
+    Sessions expire ttl_seconds after they were last read or written, and
+    the store holds at most max_sessions; beyond that the least recently
+    used sessions are evicted. Values are JSON-serializable dicts. A
+    session is replaced with set(); changes to part of a live session,
+    such as adding to its transcript, go through modify() or append() so
+    that workers updating the same session do not overwrite each other.
+    Sessions evicted to stay within max_sessions are handed to persist,
+    when given, like the ones a SessionReaper removes.
+    """
+
+    # Whether sessions survive a restart of this process
+    persistent = False
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_sessions: int,
+        persist: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.persist = persist
+
+    async def _persist_evicted(self, session_id: str, data: Dict[str, Any]) -> bool:
+        # Save a session evicted for capacity, reporting whether it was saved
+        if self.persist is None:
+            return True
+        try:
+            await self.persist(session_id, data)
+        except Exception as e:
+            logger.error(f"Failed to persist evicted session {session_id}: {str(e)}")
+            return False
+        return True
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get a live session, extending its lifetime (None if unknown or expired)"""
+
+    @abstractmethod
+    async def set(self, session_id: str, data: Dict[str, Any]) -> None:
+        """Create or replace a session"""
+
+    @abstractmethod
+    async def modify(
+        self,
+        session_id: str,
+        change: Callable[[Dict[str, Any]], None]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Change a live session atomically, extending its lifetime
+
+        change edits the session's data in place. It runs again on fresh
+        data if another worker changed the session first, so it must depend
+        only on its argument.
+
+        Returns:
+            The changed data (None if the session is unknown or expired)
+        """
+
+    async def append(self, session_id: str, key: str, item: Any) -> Optional[Dict[str, Any]]:
+        """Atomically add an item to the list under key in a live session (None if unknown or expired)"""
+        return await self.modify(session_id, lambda data: data.setdefault(key, []).append(item))
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        """Remove a session"""
+
+    @abstractmethod
+    async def count(self) -> int:
+        """Number of live sessions"""
+
+    @abstractmethod
+    async def idle(self, idle_seconds: float, limit: int = 1000) -> List[Tuple[str, Dict[str, Any], float]]:
+        """
+        Get sessions unused for at least idle_seconds, longest idle first
+
+        Returns:
+            List of (session_id, data, seconds idle) tuples
+        """
+
+    @abstractmethod
+    async def evict(self, session_id: str, idle_seconds: float) -> bool:
+        """Remove a session only if it is still unused for at least idle_seconds"""
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, Any]:
+        """Get the live session count and their total and largest size in bytes"""
+
+    async def close(self) -> None:
+        """Release resources"""
+
+
+def _footprint(value: Any) -> int:
+    """Approximate memory used by a JSON-like value, in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_footprint(key) + _footprint(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_footprint(item) for item in value)
+    return size
+
+
+class MemorySessionStore(SessionStore):
+    """
+    In-process LRU session store with TTL, for development and single-worker use
+
+    Sessions are not shared between worker processes and do not survive a
+    restart. Each session's size is measured when it is written, so stats()
+    reports the memory the sessions hold; append() adds the size of the
+    item rather than measuring the whole session again. A session evicted
+    for capacity is removed even if persisting it fails, so memory stays
+    bounded.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 7200,
+        max_sessions: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+        persist: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+    ):
+        """
+        Initialize the store
+
+        Args:
+            ttl_seconds: Idle seconds before a session expires (default: 7200)
+            max_sessions: Sessions kept before evicting the least recently used (default: 10000)
+            clock: Time source in seconds (default: time.monotonic)
+            persist: Coroutine function saving a session evicted for capacity (default: none)
+        """
+        super().__init__(ttl_seconds, max_sessions, persist)
+        self.clock = clock
+        # Session id -> (expiry, data, size in bytes), in last-used order
+        self._sessions: "OrderedDict[str, Tuple[float, Dict[str, Any], int]]" = OrderedDict()
+        self._bytes = 0
+
+    def _remove(self, session_id: str) -> None:
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _expire(self, now: float) -> None:
+        # Entries are in last-used order, so expired ones are at the front
+        while self._sessions:
+            session_id, (expires, _, _) = next(iter(self._sessions.items()))
+            if expires > now:
+                break
+            self._remove(session_id)
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = self.clock()
+        self._expire(now)
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        self._sessions[session_id] = (now + self.ttl_seconds, entry[1], entry[2])
+        self._sessions.move_to_end(session_id)
+        return entry[1]
+
+    async def set(self, session_id: str, data: Dict[str, Any]) -> None:
+        now = self.clock()
+        self._expire(now)
+        self._remove(session_id)
+        size = _footprint(data)
+        self._sessions[session_id] = (now + self.ttl_seconds, data, size)
+        self._bytes += size
+        evicted = []
+        while len(self._sessions) > self.max_sessions:
+            evicted_id, (_, evicted_data, _) = next(iter(self._sessions.items()))
+            self._remove(evicted_id)
+            evicted.append((evicted_id, evicted_data))
+            logger.info(f"Evicted session {evicted_id} (store full)")
+        for evicted_id, evicted_data in evicted:
+            await self._persist_evicted(evicted_id, evicted_data)
+
+    async def modify(
+        self,
+        session_id: str,
+        change: Callable[[Dict[str, Any]], None]
+    ) -> Optional[Dict[str, Any]]:
+        # Nothing awaits between reading and changing, so this is atomic in-process
+        data = await self.get(session_id)
+        if data is None:
+            return None
+        change(data)
+        expires, _, size = self._sessions[session_id]
+        changed_size = _footprint(data)
+        self._sessions[session_id] = (expires, data, changed_size)
+        self._bytes += changed_size - size
+        return data
+
+    async def append(self, session_id: str, key: str, item: Any) -> Optional[Dict[str, Any]]:
+        data = await self.get(session_id)
+        if data is None:
+            return None
+        items = data.get(key)
+        if not isinstance(items, list):
+            return await self.modify(session_id, lambda data: data.setdefault(key, []).append(item))
+        # The list may reallocate, so count its growth as well as the item
+        before = sys.getsizeof(items)
+        items.append(item)
+        grown = sys.getsizeof(items) - before + _footprint(item)
+        expires, _, size = self._sessions[session_id]
+        self._sessions[session_id] = (expires, data, size + grown)
+        self._bytes += grown
+        return data
+
+    async def delete(self, session_id: str) -> None:
+        self._remove(session_id)
+
+    async def count(self) -> int:
+        self._expire(self.clock())
+        return len(self._sessions)
+
+    async def idle(self, idle_seconds: float, limit: int = 1000) -> List[Tuple[str, Dict[str, Any], float]]:
+        now = self.clock()
+        self._expire(now)
+        sessions = []
+        for session_id, (expires, data, _) in self._sessions.items():
+            idle = now - (expires - self.ttl_seconds)
+            if idle < idle_seconds or len(sessions) >= limit:
+                break
+            sessions.append((session_id, data, idle))
+        return sessions
+
+    async def evict(self, session_id: str, idle_seconds: float) -> bool:
+        entry = self._sessions.get(session_id)
+        if entry is None or self.clock() - (entry[0] - self.ttl_seconds) < idle_seconds:
+            return False
+        self._remove(session_id)
+        return True
+
+    async def stats(self) -> Dict[str, Any]:
+        self._expire(self.clock())
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self._bytes,
+            "max_session_bytes": max((size for _, _, size in self._sessions.values()), default=0),
+        }
+
+
+class DatabaseSessionStore(SessionStore):
+    """
+    Session store in the interview_sessions table, shared by every worker
+
+    Any worker can serve any session, and sessions survive restarts. Reads
+    extend the expiry with a single UPDATE ... RETURNING. Each change to a
+    session's data bumps its version, and modify() writes only if the
+    version it read is unchanged, retrying up to max_retries times on
+    fresh data otherwise. Expired sessions
+    are purged, and the oldest evicted beyond max_sessions, at most once
+    per purge_interval seconds when sessions are created; an evicted
+    session is persisted first, and kept until a later purge if that
+    fails or it is used meanwhile. Works on
+    PostgreSQL and, for tests and local runs, SQLite. Sizes in stats() are
+    those of the stored JSON.
+    """
+
+    persistent = True
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        ttl_seconds: float = 7200,
+        max_sessions: int = 10000,
+        purge_interval: float = 60.0,
+        max_retries: int = 10,
+        clock: Callable[[], float] = time.time,
+        persist: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+    ):
+        """
+        Initialize the store
+
+        Args:
+            session_factory: Factory for AsyncSession objects
+            ttl_seconds: Idle seconds before a session expires (default: 7200)
+            max_sessions: Sessions kept before evicting the least recently used (default: 10000)
+            purge_interval: Minimum seconds between purges (default: 60)
+            max_retries: Attempts at a modify() that keeps losing to other writers (default: 10)
+            clock: Unix time source (default: time.time)
+            persist: Coroutine function saving a session evicted for capacity (default: none)
+        """
+        super().__init__(ttl_seconds, max_sessions, persist)
+        self.session_factory = session_factory
+        self.purge_interval = purge_interval
+        self.max_retries = max_retries
+        self.clock = clock
+        self._last_purge = float("-inf")
+
+    def _now(self) -> datetime.datetime:
+        return datetime.datetime.utcfromtimestamp(self.clock())
+
+    def _expiry(self, now: datetime.datetime) -> datetime.datetime:
+        return now + datetime.timedelta(seconds=self.ttl_seconds)
+
+    def _idle_cutoff(self, now: datetime.datetime, idle_seconds: float) -> datetime.datetime:
+        # A session unused for idle_seconds expires at or before this time
+        return now + datetime.timedelta(seconds=self.ttl_seconds - idle_seconds)
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = self._now()
+        try:
+            async with self.session_factory() as session, session.begin():
+                result = await session.execute(
+                    update(InterviewSession)
+                    .where(InterviewSession.id == session_id, InterviewSession.expires_at > now)
+                    .values(expires_at=self._expiry(now))
+                    .returning(InterviewSession.data)
+                )
+                return result.scalar_one_or_none()
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e), e)
+
+    async def set(self, session_id: str, data: Dict[str, Any]) -> None:
+        expires_at = self._expiry(self._now())
+        try:
+            async with self.session_factory() as session, session.begin():
+                replaced = await session.execute(
+                    update(InterviewSession)
+                    .where(InterviewSession.id == session_id)
+                    .values(data=data, expires_at=expires_at, version=InterviewSession.version + 1)
+                )
+                if not replaced.rowcount:
+                    session.add(InterviewSession(id=session_id, data=data, expires_at=expires_at))
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e), e)
+        if self.clock() - self._last_purge >= self.purge_interval:
+            self._last_purge = self.clock()
+            await self.purge()
+
+    async def modify(
+        self,
+        session_id: str,
+        change: Callable[[Dict[str, Any]], None]
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            async with self.session_factory() as session:
+                for _ in range(self.max_retries):
+                    now = self._now()
+                    row = (await session.execute(
+                        select(InterviewSession.data, InterviewSession.version)
+                        .where(InterviewSession.id == session_id, InterviewSession.expires_at > now)
+                    )).one_or_none()
+                    if row is None:
+                        await session.rollback()
+                        return None
+                    data, version = row
+                    change(data)
+                    # Compare-and-set: no row matches if another worker wrote first
+                    written = await session.execute(
+                        update(InterviewSession)
+                        .where(InterviewSession.id == session_id, InterviewSession.version == version)
+                        .values(data=data, version=version + 1, expires_at=self._expiry(now))
+                    )
+                    await session.commit()
+                    if written.rowcount:
+                        return data
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e), e)
+        raise DatabaseError(f"Session {session_id} changed concurrently {self.max_retries} times")
+
+    async def purge(self) -> int:
+        """Delete expired sessions and evict the oldest beyond max_sessions"""
+        now = self._now()
+        try:
+            async with self.session_factory() as session, session.begin():
+                expired = await session.execute(delete(InterviewSession).where(InterviewSession.expires_at <= now))
+                removed = expired.rowcount or 0
+                excess = (await session.execute(select(func.count()).select_from(InterviewSession))).scalar_one() - self.max_sessions
+                oldest = (await session.execute(
+                    select(InterviewSession.id, InterviewSession.data, InterviewSession.expires_at)
+                    .order_by(InterviewSession.expires_at)
+                    .limit(excess)
+                )).all() if excess > 0 else []
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e), e)
+
+        # Persist outside the transaction; the expiry check skips sessions used meanwhile
+        persisted = [
+            (session_id, expires_at) for session_id, data, expires_at in oldest
+            if await self._persist_evicted(session_id, data)
+        ]
+        if persisted:
+            try:
+                async with self.session_factory() as session, session.begin():
+                    for session_id, expires_at in persisted:
+                        evicted = await session.execute(
+                            delete(InterviewSession)
+                            .where(InterviewSession.id == session_id, InterviewSession.expires_at == expires_at)
+                        )
+                        removed += evicted.rowcount or 0
+            except SQLAlchemyError as e:
+                raise DatabaseError(str(e), e)
+        if removed:
+            logger.info(f"Purged {removed} sessions")
+        return removed
+
+    async def delete(self, session_id: str) -> None:
+        try:
+            async with self.session_factory() as session, session.begin():
+                await session.execute(delete(InterviewSession).where(InterviewSession.id == session_id))
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e), e)
+
+    async def count(self) -> int:
+        try:
+            async with self.session_factory() as session:
+                return (await session.execute(
+                    select(func.count()).select_from(InterviewSession).where(InterviewSession.expires_at > self._now())
+                )).scalar_one()
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e), e)
+
+    async def idle(self, idle_seconds: float, limit: int = 1000) -> List[Tuple[str, Dict[str, Any], float]]:
+        now = self._now()
+        try:
+            async with self.session_factory() as session:
+                rows = (await session.execute(
+                    select(InterviewSession.id, InterviewSession.data, InterviewSession.expires_at)
+                    .where(InterviewSession.expires_at <= self._idle_cutoff(now, idle_seconds))
+                    .order_by(InterviewSession.expires_at)
+                    .limit(limit)
+                )).all()
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e), e)
+        return [
+            (session_id, data, self.ttl_seconds - (expires_at - now).total_seconds())
+            for session_id, data, expires_at in rows
+        ]
+
+    async def evict(self, session_id: str, idle_seconds: float) -> bool:
+        now = self._now()
+        try:
+            async with self.session_factory() as session, session.begin():
+                result = await session.execute(
+                    delete(InterviewSession).where(
+                        InterviewSession.id == session_id,
+                        InterviewSession.expires_at <= self._idle_cutoff(now, idle_seconds)
+                    )
+                )
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e), e)
+        return bool(result.rowcount)
+
+    async def stats(self) -> Dict[str, Any]:
+        size = func.length(cast(InterviewSession.data, Text))
+        try:
+            async with self.session_factory() as session:
+                sessions, total, largest = (await session.execute(
+                    select(func.count(), func.sum(size), func.max(size))
+                    .where(InterviewSession.expires_at > self._now())
+                )).one()
+        except SQLAlchemyError as e:
+            raise DatabaseError(str(e), e)
+        return {"sessions": sessions, "bytes": total or 0, "max_session_bytes": largest or 0}
+
+
+def create_session_store(
+    backend: str,
+    ttl_seconds: float,
+    max_sessions: int,
+    session_factory: Optional[async_sessionmaker] = None,
+    persist: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+) -> SessionStore:
+    """
+    Create the configured session store
+
+    Args:
+        backend: "memory" or "database"
+        ttl_seconds: Idle seconds before a session expires
+        max_sessions: Most sessions kept
+        session_factory: Required for the database backend
+        persist: Coroutine function saving a session evicted for capacity
+
+    Raises:
+        ValueError: If the backend is unknown or lacks a database
+    """
+    if backend == "memory":
+        return MemorySessionStore(ttl_seconds, max_sessions, persist=persist)
+    if backend == "database":
+        if session_factory is None:
+            raise ValueError("SESSION_STORE=database requires DATABASE_URL")
+        return DatabaseSessionStore(session_factory, ttl_seconds, max_sessions, persist=persist)
+    raise ValueError(f"Unknown session store: {backend}")
@@ -0,0 +1,349 @@
+"""
+Append-only JSONL transcript log with batched fsync
+"""
+import os
+import json
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from contextlib import aclosing
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+
+from app.services.transcript_storage import TranscriptStorage
+
+# Set up logging
+logger = logging.getLogger("hiregage.transcript.log")
+
+# Lines parsed per worker-thread call when scanning a log file
+_SCAN_CHUNK = 512
+
+
+class _SessionLog:
+    """Log file, write lock and in-memory tail for one session"""
+
+    def __init__(self, path: Path, tail_size: int):
+        self.path = path
+        self.fd: Optional[int] = None
+        self.count: Optional[int] = None
+        # Bytes this process has appended since opening the file
+        self.size = 0
+        self.tail: deque = deque(maxlen=tail_size)
+        self.lock = asyncio.Lock()
+        self.sync: Optional[asyncio.Future] = None
+
+    @property
+    def in_memory(self) -> bool:
+        """Whether the tail holds every entry in the log"""
+        return self.count is not None and self.count <= self.tail.maxlen
+
+    @property
+    def idle(self) -> bool:
+        """Whether no write or fsync is outstanding"""
+        return self.sync is None and not self.lock.locked()
+
+    def write(self, lines: bytes) -> None:
+        """Append lines, opening the file on first use (runs off the loop)"""
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self.count = 0
+        # The tail mirrors the file only while this process wrote all of it;
+        # once the file holds other lines (an earlier run, another worker),
+        # positions and reads come from the file
+        if self.count is not None and os.fstat(self.fd).st_size != self.size:
+            self.count = None
+        view = memoryview(lines)
+        while view:
+            view = view[os.write(self.fd, view):]
+
+    def file_size(self) -> Optional[int]:
+        """Current size of the file on disk, None if it is not open (runs off the loop)"""
+        fd = self.fd
+        try:
+            return os.fstat(fd).st_size if fd is not None else None
+        except OSError:
+            return None
+
+    def close(self) -> None:
+        """Flush and close the file (runs off the loop)"""
+        if self.fd is not None:
+            os.fsync(self.fd)
+            os.close(self.fd)
+            self.fd = None
+
+
+class TranscriptLog(TranscriptStorage):
+    """
+    Per-session transcript logs stored as line-delimited JSON
+
+    Each entry is appended to `<session_id>.jsonl` with a single O_APPEND
+    write, so saves cost the same at any transcript length. Writes for a
+    session are serialized by a per-session lock and, like every other
+    file operation here, run in a worker thread so the event loop never
+    waits on the disk. Durability is batched: appends arriving within
+    fsync_interval of each other share one fsync, and each append returns
+    once its entry is on disk.
+
+    Sessions written before the log existed kept their transcript in
+    `<session_id>.json`; reads return those entries ahead of logged ones.
+    An entry's position is its index in the legacy file, or the legacy
+    entry count plus its line number in the log.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fsync_interval: float = 0.05,
+        tail_size: int = 256,
+        max_open: int = 256
+    ):
+        """
+        Initialize the transcript log
+
+        Args:
+            directory: Directory holding the transcript files
+            fsync_interval: Seconds to collect appends into one fsync (default: 0.05)
+            tail_size: Recent entries kept in memory per session (default: 256)
+            max_open: Session log files kept open at once (default: 256)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync_interval = fsync_interval
+        self.tail_size = tail_size
+        self.max_open = max_open
+        self._logs: "OrderedDict[str, _SessionLog]" = OrderedDict()
+
+    def log_path(self, session_id: str) -> Path:
+        """Path of a session's JSONL log"""
+        return self.directory / f"{session_id}.jsonl"
+
+    def legacy_path(self, session_id: str) -> Path:
+        """Path of a session's pre-log JSON transcript"""
+        return self.directory / f"{session_id}.json"
+
+    def _log(self, session_id: str) -> _SessionLog:
+        log = self._logs.get(session_id)
+        if log is None:
+            log = self._logs[session_id] = _SessionLog(self.log_path(session_id), self.tail_size)
+        else:
+            self._logs.move_to_end(session_id)
+        return log
+
+    async def _evict(self) -> None:
+        # Close the least recently used logs that have nothing outstanding
+        for session_id in list(self._logs):
+            if len(self._logs) <= self.max_open:
+                break
+            log = self._logs.get(session_id)
+            if log is not None and log.idle:
+                del self._logs[session_id]
+                await asyncio.to_thread(log.close)
+
+    async def append(self, session_id: str, entry: Dict[str, Any]) -> None:
+        """
+        Append an entry to a session's log
+
+        Returns once the entry has been fsynced.
+        """
+        await self.append_many(session_id, [entry])
+
+    async def append_many(self, session_id: str, entries: List[Dict[str, Any]]) -> None:
+        """
+        Append several entries to a session's log with a single write
+
+        Returns once the entries have been fsynced.
+        """
+        if not entries:
+            return
+        lines = b"".join(
+            (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8") for entry in entries
+        )
+        log = self._log(session_id)
+        async with log.lock:
+            await asyncio.to_thread(log.write, lines)
+            log.tail.extend(entries)
+            log.size += len(lines)
+            if log.count is not None:
+                log.count += len(entries)
+            sync = self._sync(log)
+        await asyncio.shield(sync)
+        if len(self._logs) > self.max_open:
+            await self._evict()
+
+    def _sync(self, log: _SessionLog) -> asyncio.Future:
+        # Join the batch waiting for the next fsync, or start one
+        if log.sync is None:
+            loop = asyncio.get_running_loop()
+            log.sync = loop.create_future()
+            loop.call_later(self.fsync_interval, lambda: asyncio.ensure_future(self._fsync(log)))
+        return log.sync
+
+    async def _fsync(self, log: _SessionLog) -> None:
+        # Appends from here on belong to the next batch
+        sync, log.sync = log.sync, None
+        if sync is None:
+            return
+        try:
+            if log.fd is not None:
+                await asyncio.to_thread(os.fsync, log.fd)
+        except Exception as e:
+            sync.set_exception(e)
+        else:
+            sync.set_result(None)
+
+    async def read(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Get every entry for a session, oldest first
+
+        Logged entries are served from memory when the tail holds the whole
+        log and the file is still exactly what this process wrote (other
+        workers may append to it too); otherwise the file is parsed off the
+        loop. A torn final line from an interrupted write is skipped.
+        """
+        log = self._logs.get(session_id)
+        if log is not None and log.in_memory:
+            tail, size = list(log.tail), log.size
+            if await asyncio.to_thread(log.file_size) == size:
+                return await asyncio.to_thread(self._read_legacy, session_id) + tail
+        return await asyncio.to_thread(self._read_files, session_id)
+
+    def _read_files(self, session_id: str) -> List[Dict[str, Any]]:
+        entries = self._read_legacy(session_id)
+        path = self.log_path(session_id)
+        if path.exists():
+            with open(path, "rb") as f:
+                for number, line in enumerate(f, 1):
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping unreadable line {number} in {path}")
+        return entries
+
+    def _read_legacy(self, session_id: str) -> List[Dict[str, Any]]:
+        path = self.legacy_path(session_id)
+        if not path.exists():
+            return []
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring unreadable legacy transcript {path}")
+            return []
+        return data if isinstance(data, list) else []
+
+    async def count(self, session_id: str) -> int:
+        """Number of entries saved for a session, counting log lines without parsing them"""
+        legacy = await asyncio.to_thread(self._read_legacy, session_id)
+        log = self._logs.get(session_id)
+        if log is not None and log.count is not None:
+            count, size = log.count, log.size
+            if await asyncio.to_thread(log.file_size) == size:
+                return len(legacy) + count
+        return len(legacy) + await asyncio.to_thread(self._count_lines, session_id)
+
+    def _count_lines(self, session_id: str) -> int:
+        # Complete lines only, like _scan: a line without its newline is still being written
+        try:
+            with open(self.log_path(session_id), "rb") as f:
+                return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 16), b""))
+        except FileNotFoundError:
+            return 0
+
+    async def read_range(
+        self,
+        session_id: str,
+        since: int = 0,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get up to limit entries starting at position since
+
+        Returns:
+            Tuple of the entries and the cursor to pass as since for the next page
+        """
+        entries: List[Dict[str, Any]] = []
+        cursor = since
+        if limit == 0:
+            return entries, cursor
+        async with aclosing(self._scan(session_id, since)) as scan:
+            async for position, entry in scan:
+                entries.append(entry)
+                cursor = position + 1
+                if limit is not None and len(entries) >= limit:
+                    break
+        return entries, cursor
+
+    async def iter_entries(self, session_id: str, since: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Yield entries from position since onwards, reading the log in chunks"""
+        async with aclosing(self._scan(session_id, since)) as scan:
+            async for _, entry in scan:
+                yield entry
+
+    async def _scan(self, session_id: str, since: int) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        # Yield (position, entry) pairs from since onwards
+        legacy = await asyncio.to_thread(self._read_legacy, session_id)
+        for position in range(since, len(legacy)):
+            yield position, legacy[position]
+        start = max(since - len(legacy), 0)
+
+        # New entries of a log only this process has written are still in the tail
+        log = self._logs.get(session_id)
+        if log is not None and log.count is not None and start >= log.count - len(log.tail):
+            count, tail, size = log.count, list(log.tail), log.size
+            if await asyncio.to_thread(log.file_size) == size:
+                first = count - len(tail)
+                for index in range(start - first, len(tail)):
+                    yield len(legacy) + first + index, tail[index]
+                return
+
+        f = await asyncio.to_thread(self._open_log, session_id)
+        if f is None:
+            return
+        try:
+            line, done = 0, False
+            while not done:
+                chunk, line, done = await asyncio.to_thread(self._read_lines, f, line, start)
+                for number, entry in chunk:
+                    yield len(legacy) + number, entry
+        finally:
+            f.close()
+
+    def _open_log(self, session_id: str) -> Optional[BinaryIO]:
+        try:
+            return open(self.log_path(session_id), "rb")
+        except FileNotFoundError:
+            return None
+
+    def _read_lines(self, f: BinaryIO, line: int, start: int) -> Tuple[List[Tuple[int, Dict[str, Any]]], int, bool]:
+        # Parse up to _SCAN_CHUNK entries at or after line number start;
+        # lines before it are skipped without being parsed
+        entries = []
+        while len(entries) < _SCAN_CHUNK:
+            raw = f.readline()
+            # A line without its newline is still being written (or was torn)
+            if not raw.endswith(b"\n"):
+                return entries, line, True
+            line += 1
+            if line <= start:
+                continue
+            try:
+                entries.append((line - 1, json.loads(raw)))
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable line {line} in {f.name}")
+        return entries, line, False
+
+    def tail(self, session_id: str) -> List[Dict[str, Any]]:
+        """Get the most recent entries appended in this process"""
+        log = self._logs.get(session_id)
+        return list(log.tail) if log is not None else []
+
+    async def close(self) -> None:
+        """Flush and close every open log"""
+        while self._logs:
+            _, log = self._logs.popitem(last=False)
+            async with log.lock:
+                await asyncio.to_thread(log.close)
+            # The batch waiting for an fsync is covered by the one in close()
+            if log.sync is not None and not log.sync.done():
+                log.sync.set_result(None)
+            log.sync = None
@@ -0,0 +1,62 @@
+"""
+Async storage interface for interview transcripts
+"""
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+class TranscriptStorage(ABC):
+    """
+    Where transcript entries are kept
+
+    Implementations must not block the event loop: file or database work
+    runs off the loop or through native async I/O. Appends for one session
+    are applied in the order they were made.
+
+    Entries have integer positions that only grow as entries are appended.
+    Cursors handed to clients are positions, so a client can resume reading
+    after the last entry it saw.
+    """
+
+    @abstractmethod
+    async def append(self, session_id: str, entry: Dict[str, Any]) -> None:
+        """Durably add an entry to the end of a session's transcript"""
+
+    async def append_many(self, session_id: str, entries: List[Dict[str, Any]]) -> None:
+        """Durably add several entries, in order (implementations should commit them together)"""
+        for entry in entries:
+            await self.append(session_id, entry)
+
+    @abstractmethod
+    async def read(self, session_id: str) -> List[Dict[str, Any]]:
+        """Get every entry for a session, oldest first (empty if unknown)"""
+
+    async def count(self, session_id: str) -> int:
+        """Number of entries saved for a session, by any process (implementations should not read them all)"""
+        return len(await self.read(session_id))
+
+    async def read_range(
+        self,
+        session_id: str,
+        since: int = 0,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get up to limit entries starting at position since
+
+        Returns:
+            Tuple of the entries and the cursor to pass as since for the next page
+        """
+        entries = (await self.read(session_id))[since:]
+        if limit is not None:
+            entries = entries[:limit]
+        return entries, since + len(entries)
+
+    async def iter_entries(self, session_id: str, since: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Yield entries from position since onwards (implementations should not load them all at once)"""
+        for entry in (await self.read(session_id))[since:]:
+            yield entry
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Flush pending writes and release resources"""
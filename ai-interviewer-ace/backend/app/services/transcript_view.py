@@ -0,0 +1,227 @@
+"""
+Consolidated transcript views maintained as entries are saved
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+# Set up logging
+logger = logging.getLogger("hiregage.transcript.view")
+
+
+def _is_ai(entry: Dict[str, Any]) -> bool:
+    return (entry.get("speaker") or "").lower() == "ai"
+
+
+class ConsolidatedTranscript:
+    """
+    Consolidated transcript of one session, updated one entry at a time
+
+    Candidate segments and the final answer follow save order. Questions
+    and answers are paired in timestamp order: each AI entry opens a new
+    question and candidate entries after it form its answer. While entries
+    arrive in timestamp order, each is folded in with O(1) work; an entry
+    older than the newest one seen cannot be, and add() returns False so
+    the caller can rebuild from the full transcript.
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        """
+        Initialize the view
+
+        Args:
+            entries: Entries already saved, in save order
+        """
+        self.entries = 0
+        self.user_segments: List[Dict[str, Any]] = []
+        self.answers_by_question: List[Dict[str, str]] = []
+        self._texts: List[str] = []
+        self._complete: Optional[str] = ""
+        self._question: Optional[str] = None
+        self._answers: List[str] = []
+        self._pair: Optional[Dict[str, str]] = None
+        self._last_timestamp = ""
+
+        entries = list(entries)
+        for entry in entries:
+            self._add_segment(entry)
+        # Stable sort, so entries with equal timestamps keep save order
+        for entry in sorted(entries, key=lambda x: x.get("timestamp", "")):
+            self._add_pair(entry)
+
+    def add(self, entry: Dict[str, Any]) -> bool:
+        """
+        Fold a newly saved entry into the view
+
+        Returns:
+            bool: False if the entry is older than one already seen and the
+                view must be rebuilt
+        """
+        if entry.get("timestamp", "") < self._last_timestamp:
+            return False
+        self._add_segment(entry)
+        self._add_pair(entry)
+        return True
+
+    def _add_segment(self, entry: Dict[str, Any]) -> None:
+        self.entries += 1
+        if entry.get("text") and not _is_ai(entry):
+            self.user_segments.append(entry)
+            self._texts.append(entry["text"])
+            self._complete = None
+
+    def _add_pair(self, entry: Dict[str, Any]) -> None:
+        self._last_timestamp = max(self._last_timestamp, entry.get("timestamp", ""))
+        text = entry.get("text", "")
+        if not text:
+            return
+        if _is_ai(entry):
+            # An AI message starts a new question; the previous pair is complete
+            self._question = text
+            self._answers = []
+            self._pair = None
+        elif self._question:
+            self._answers.append(text)
+            if self._pair is None:
+                self._pair = {"question": self._question, "answer": text}
+                self.answers_by_question.append(self._pair)
+            else:
+                self._pair["answer"] = " ".join(self._answers)
+
+    @property
+    def final_answer(self) -> str:
+        """The candidate's most recent segment"""
+        return self.user_segments[-1]["text"] if self.user_segments else ""
+
+    @property
+    def complete_transcript(self) -> str:
+        """Every candidate segment joined into one string"""
+        if self._complete is None:
+            self._complete = " ".join(self._texts)
+        return self._complete
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the consolidated transcript response
+
+        The lists are shared with the view, not copied; callers must not
+        modify them.
+        """
+        if not self.entries:
+            return {"final_answer": "", "raw_segments": [], "answers_by_question": []}
+        return {
+            "final_answer": self.final_answer,
+            "raw_segments": self.user_segments,
+            "complete_transcript": self.complete_transcript,
+            "answers_by_question": self.answers_by_question,
+        }
+
+
+class ConsolidatedTranscriptCache:
+    """
+    Consolidated views for recently used sessions
+
+    A session's view is built from its full transcript the first time it
+    is requested, then kept current by add() as entries are saved, so a
+    polling client costs O(1) per request. Saves wrap their write and
+    add() calls in saving(): a build that overlaps a save may or may not
+    have read its entries, so it is served but not cached. Concurrent
+    requests for a view that is being built share the build. Least
+    recently used views are dropped beyond max_sessions and rebuilt on
+    demand.
+
+    add() only sees saves made in this process. Given count, a cached view
+    is checked against the number of entries in storage before it is
+    served and rebuilt if other workers have saved to the session.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[str], Awaitable[List[Dict[str, Any]]]],
+        max_sessions: int = 1024,
+        count: Optional[Callable[[str], Awaitable[int]]] = None
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            load: Coroutine function returning a session's saved entries
+            max_sessions: Views kept in memory at once (default: 1024)
+            count: Coroutine function returning how many entries a session has
+                in storage (default: trust views kept current by add())
+        """
+        self.load = load
+        self.max_sessions = max_sessions
+        self.count = count
+        self._views: "OrderedDict[str, ConsolidatedTranscript]" = OrderedDict()
+        self._building: Dict[str, asyncio.Future] = {}
+        self._saving: Dict[str, int] = {}
+        self._stale: Set[str] = set()
+
+    @contextmanager
+    def saving(self, session_id: str) -> Iterator[None]:
+        """Mark a save of the session's entries as in progress, from its write to its add() calls"""
+        self._saving[session_id] = self._saving.get(session_id, 0) + 1
+        if session_id in self._building:
+            self._stale.add(session_id)
+        try:
+            yield
+        finally:
+            remaining = self._saving[session_id] - 1
+            if remaining:
+                self._saving[session_id] = remaining
+            else:
+                del self._saving[session_id]
+
+    def add(self, session_id: str, entry: Dict[str, Any]) -> None:
+        """Apply a saved entry to the session's view, if one is cached"""
+        view = self._views.get(session_id)
+        if view is not None:
+            if not view.add(entry):
+                logger.debug(f"Out-of-order entry for session {session_id}, dropping its view")
+                del self._views[session_id]
+        elif session_id in self._building:
+            # The entry may have been saved after the build read the transcript
+            self._stale.add(session_id)
+
+    async def get(self, session_id: str) -> Dict[str, Any]:
+        """Get the session's consolidated transcript"""
+        view = self._views.get(session_id)
+        if view is not None and self.count is not None and session_id not in self._saving:
+            saved = await self.count(session_id)
+            view = self._views.get(session_id)
+            # A save that started meanwhile may be counted but not yet added
+            if view is not None and view.entries != saved and session_id not in self._saving:
+                logger.debug(f"Session {session_id} has entries saved elsewhere, dropping its view")
+                del self._views[session_id]
+                view = None
+        if view is not None:
+            self._views.move_to_end(session_id)
+            return view.to_dict()
+
+        building = self._building.get(session_id)
+        if building is None:
+            building = self._building[session_id] = asyncio.ensure_future(self._build(session_id))
+        view = await asyncio.shield(building)
+        return view.to_dict()
+
+    async def _build(self, session_id: str) -> ConsolidatedTranscript:
+        try:
+            view = ConsolidatedTranscript(await self.load(session_id))
+        finally:
+            del self._building[session_id]
+        if session_id in self._stale or session_id in self._saving:
+            # Serve this build once, but do not cache a view that may miss an
+            # entry or have one that add() is about to apply again
+            self._stale.discard(session_id)
+        else:
+            self._views[session_id] = view
+            while len(self._views) > self.max_sessions:
+                self._views.popitem(last=False)
+        return view
+
+    def discard(self, session_id: str) -> None:
+        """Drop a session's view"""
+        self._views.pop(session_id, None)
@@ -5,10 +5,24 @@ import os
 import json
 import asyncio
 import logging
+import threading
+import uuid
+import bisect
+import multiprocessing
 import numpy as np
-from typing import AsyncGenerator, Optional
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Callable, Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 from vosk import Model, KaldiRecognizer, SetLogLevel
+from vosk.vosk_cffi import ffi
+
+from app.utils.audio import WavReader
+from app.utils.dsp import ScratchBuffer, float_to_int16
+from app.utils.errors import CapacityError
 
 # Set up logging
 logger = logging.getLogger("hiregage.transcription")
@@ -20,103 +34,804 @@ SetLogLevel(-1)
 DEFAULT_MODEL_DIR = os.environ.get("VOSK_MODEL_DIR", "models/vosk-model-en-us-0.22")
 MODELS_DIR = Path("models")
 
-class VoskTranscriptionService:
-    """Vosk-based speech transcription service"""
+# Supported decode executor modes
+DECODE_MODES = ("thread", "process")
+
+# Marks the end of an audio stream in the decode queue
+_END_OF_STREAM = object()
+
+
+def resolve_model_dir(model_path: Optional[str] = None) -> Path:
+    """
+    Resolve and validate the Vosk model directory
+    
+    Args:
+        model_path: Path to the Vosk model directory (default: VOSK_MODEL_DIR)
+        
+    Returns:
+        Path: The model directory
+        
+    Raises:
+        FileNotFoundError: If the model directory does not exist
+    """
+    model_path = model_path or DEFAULT_MODEL_DIR
+    
+    # Ensure models directory exists
+    MODELS_DIR.mkdir(exist_ok=True)
+        
+    # Check if model exists
+    model_dir = Path(model_path)
+    if not model_dir.exists() or not model_dir.is_dir():
+        raise FileNotFoundError(f"Vosk model not found at {model_path}. "
+                                f"Please download a model from https://alphacephei.com/vosk/models "
+                                f"and extract it to the {MODELS_DIR} directory.")
+    return model_dir
+
+
+@lru_cache()
+def load_model(model_path: str) -> Model:
+    """
+    Load a Vosk model once per process
+    
+    The model is read-only once loaded, so every service and recognizer
+    in the process shares the same instance.
+    
+    Args:
+        model_path: Path to the Vosk model directory
+        
+    Returns:
+        Model: The loaded Vosk model
+    """
+    logger.info(f"Loading Vosk model from {model_path}")
+    return Model(model_path)
+
+
+class RecognizerPool:
+    """Bounded pool of KaldiRecognizers built on a shared model"""
     
-    def __init__(self, model_path: Optional[str] = None, sample_rate: int = 16000):
+    def __init__(
+        self,
+        model: Optional[Model],
+        sample_rate: int = 16000,
+        max_size: int = 32,
+        factory: Optional[Callable[[], KaldiRecognizer]] = None
+    ):
         """
-        Initialize the Vosk transcription service
+        Initialize the recognizer pool
         
         Args:
-            model_path: Path to the Vosk model directory (optional)
+            model: Loaded Vosk model shared by all recognizers
             sample_rate: Audio sample rate in Hz (default: 16000)
+            max_size: Maximum number of recognizers leased at once
+            factory: Optional callable building a new recognizer
         """
+        self.model = model
         self.sample_rate = sample_rate
+        self.max_size = max_size
+        self._factory = factory or self._create_recognizer
+        self._idle: List[KaldiRecognizer] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._created = 0
+        self._leased = 0
+
+    def _create_recognizer(self) -> KaldiRecognizer:
+        recognizer = KaldiRecognizer(self.model, self.sample_rate)
+        recognizer.SetWords(True)  # Enable word timestamps
+        return recognizer
+
+    def acquire(self, timeout: Optional[float] = None) -> KaldiRecognizer:
+        """
+        Lease a recognizer, reusing an idle one when available
         
-        # Use provided model path or default
-        if model_path:
-            self.model_path = model_path
+        Args:
+            timeout: Seconds to wait for a free slot (None waits forever)
+            
+        Returns:
+            KaldiRecognizer: A recognizer with clean decoder state
+            
+        Raises:
+            CapacityError: If no recognizer is free within the timeout
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise CapacityError(
+                f"All {self.max_size} recognizers are in use",
+                resource="recognizer_pool"
+            )
+        
+        try:
+            with self._lock:
+                recognizer = self._idle.pop() if self._idle else None
+            if recognizer is None:
+                recognizer = self._factory()
+                with self._lock:
+                    self._created += 1
+        except Exception:
+            self._slots.release()
+            raise
+        
+        with self._lock:
+            self._leased += 1
+        return recognizer
+
+    def release(self, recognizer: KaldiRecognizer) -> None:
+        """
+        Return a leased recognizer to the pool
+        
+        The recognizer is reset so the next session starts from a clean
+        decoder state. Recognizers that fail to reset are discarded.
+        """
+        try:
+            recognizer.Reset()
+        except Exception as e:
+            logger.warning(f"Discarding recognizer that failed to reset: {str(e)}")
+            recognizer = None
+        
+        with self._lock:
+            if recognizer is not None:
+                self._idle.append(recognizer)
+            self._leased -= 1
+        self._slots.release()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[KaldiRecognizer]:
+        """Context manager leasing a recognizer for the duration of the block"""
+        recognizer = self.acquire(timeout)
+        try:
+            yield recognizer
+        finally:
+            self.release(recognizer)
+
+    def stats(self) -> Dict[str, int]:
+        """Get pool usage counters"""
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "leased": self._leased,
+            }
+
+
+def as_waveform(audio_chunk):
+    """
+    Adapt a bytes-like audio chunk for KaldiRecognizer.AcceptWaveform
+    
+    The binding only takes bytes or a C buffer, so memoryviews and arrays
+    are wrapped in place rather than copied into a new bytes object.
+    """
+    if isinstance(audio_chunk, bytes):
+        return audio_chunk
+    return ffi.from_buffer(audio_chunk)
+
+
+def accept_waveform(recognizer: KaldiRecognizer, audio_chunk) -> dict:
+    """
+    Process an audio chunk and return any recognized text
+    
+    Args:
+        recognizer: Recognizer leased for the current session
+        audio_chunk: Raw audio (mono, 16-bit PCM) as bytes or any buffer
+        
+    Returns:
+        dict: Recognition result with text and confidence
+    """
+    if recognizer.AcceptWaveform(as_waveform(audio_chunk)):
+        result_json = recognizer.Result()
+        return json.loads(result_json)
+    else:
+        # Return partial result
+        partial_json = recognizer.PartialResult()
+        return json.loads(partial_json)
+
+
+def final_result(recognizer: KaldiRecognizer) -> dict:
+    """Get the final recognition result"""
+    result_json = recognizer.FinalResult()
+    return json.loads(result_json)
+
+
+def decode_file(recognizer: KaldiRecognizer, audio_file_path: str, sample_rate: int = 16000) -> dict:
+    """
+    Decode an entire audio file with the given recognizer
+    
+    The WAV header is parsed and the payload is memory-mapped, then
+    downmixed and resampled to the recognizer's rate in large blocks.
+    Headerless files are treated as raw 16-bit mono PCM at sample_rate.
+    
+    Args:
+        recognizer: Recognizer leased for this file
+        audio_file_path: Path to audio file (WAV format)
+        sample_rate: Sample rate the recognizer expects
+        
+    Returns:
+        dict: Complete transcription result
+    """
+    with WavReader(audio_file_path, raw_sample_rate=sample_rate) as reader:
+        for block in reader.iter_pcm16(sample_rate):
+            recognizer.AcceptWaveform(as_waveform(block))
+    
+    return final_result(recognizer)
+
+
+# Decode worker process state. Each worker loads the model once in its
+# initializer and keeps the recognizers of the sessions pinned to it.
+
+_worker_pool: Optional[RecognizerPool] = None
+_worker_sessions: Dict[str, KaldiRecognizer] = {}
+
+
+def _init_decode_worker(model_path: str, sample_rate: int, pool_size: int) -> None:
+    global _worker_pool
+    _worker_pool = RecognizerPool(load_model(model_path), sample_rate, max_size=pool_size)
+
+
+def _worker_open(session_key: str) -> None:
+    _worker_sessions[session_key] = _worker_pool.acquire()
+
+
+def _worker_accept(session_key: str, audio_chunk: bytes) -> dict:
+    return accept_waveform(_worker_sessions[session_key], audio_chunk)
+
+
+def _worker_final(session_key: str) -> dict:
+    return final_result(_worker_sessions[session_key])
+
+
+def _worker_close(session_key: str) -> None:
+    recognizer = _worker_sessions.pop(session_key, None)
+    if recognizer is not None:
+        _worker_pool.release(recognizer)
+
+
+def _worker_transcribe_file(audio_file_path: str) -> dict:
+    with _worker_pool.lease() as recognizer:
+        return decode_file(recognizer, audio_file_path, _worker_pool.sample_rate)
+
+
+class DecodeSession:
+    """Handle to the recognizer decoding one audio stream"""
+    
+    def __init__(
+        self,
+        executor: "DecodeExecutor",
+        recognizer: Optional[KaldiRecognizer] = None,
+        session_key: Optional[str] = None,
+        shard: Optional[int] = None
+    ):
+        self.executor = executor
+        self.recognizer = recognizer
+        self.session_key = session_key
+        self.shard = shard
+        self._inflight: Optional[Future] = None
+        self._closed = False
+
+    def _submit(self, thread_fn: Callable, worker_fn: Callable, *args: Any) -> Future:
+        if self.recognizer is not None:
+            future = self.executor._threads.submit(thread_fn, self.recognizer, *args)
         else:
-            self.model_path = DEFAULT_MODEL_DIR
+            # Buffer views cannot be pickled across the process boundary
+            args = tuple(bytes(arg) if isinstance(arg, memoryview) else arg for arg in args)
+            future = self.executor._shards[self.shard].submit(worker_fn, self.session_key, *args)
+        self._inflight = future
+        return future
+
+    async def accept(self, audio_chunk) -> dict:
+        """Decode one audio chunk off the event loop"""
+        return await asyncio.wrap_future(self._submit(accept_waveform, _worker_accept, audio_chunk))
+
+    async def finish(self) -> dict:
+        """Flush the decoder and get the final recognition result"""
+        return await asyncio.wrap_future(self._submit(final_result, _worker_final))
+
+    def close(self) -> None:
+        """
+        Release the session's recognizer
         
-        # Ensure models directory exists
-        MODELS_DIR.mkdir(exist_ok=True)
+        A chunk may still be decoding if the consuming task was cancelled,
+        so release is deferred until the in-flight call completes.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        
+        if self.recognizer is not None:
+            pool, recognizer = self.executor.pool, self.recognizer
+            inflight = self._inflight
+            if inflight is not None and not inflight.done():
+                inflight.add_done_callback(lambda _: pool.release(recognizer))
+            else:
+                pool.release(recognizer)
+        else:
+            # Worker processes run tasks in FIFO order, so this lands after any in-flight chunk
+            shard = self.shard
+            future = self.executor._shards[shard].submit(_worker_close, self.session_key)
+            future.add_done_callback(lambda _: self.executor._release_shard(shard))
+
+
+class DecodeExecutor:
+    """
+    Runs Kaldi decoding off the event loop
+    
+    In "thread" mode recognizers are leased from a RecognizerPool and
+    decoded on a thread pool (vosk releases the GIL while Kaldi runs).
+    In "process" mode every worker process loads the model once and owns
+    the recognizers of the sessions pinned to it. Either way a session
+    decodes one chunk at a time, so its chunks are processed in order.
+    """
+    
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        sample_rate: int = 16000,
+        mode: str = "thread",
+        workers: Optional[int] = None,
+        pool_size: int = 32,
+        pool: Optional[RecognizerPool] = None
+    ):
+        """
+        Initialize the decode executor
+        
+        Args:
+            model_path: Path to the Vosk model directory
+            sample_rate: Audio sample rate in Hz (default: 16000)
+            mode: "thread" or "process" (default: "thread")
+            workers: Number of decode threads/processes (default: CPU count)
+            pool_size: Maximum number of concurrent sessions (default: 32)
+            pool: Optional pre-built recognizer pool for "thread" mode
+        """
+        if mode not in DECODE_MODES:
+            raise ValueError(f"Unknown decode mode {mode!r}, expected one of {DECODE_MODES}")
+        
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.pool: Optional[RecognizerPool] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._shards: List[ProcessPoolExecutor] = []
+        self._shard_load: List[int] = []
+        self._lock = threading.Lock()
+        self._shard_freed = threading.Condition(self._lock)
+        
+        if mode == "thread":
+            self.pool = pool or RecognizerPool(load_model(model_path), sample_rate, max_size=pool_size)
+            self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vosk-decode")
+        else:
+            # One single-process executor per shard gives each session worker affinity
+            self.shard_capacity = max(1, -(-pool_size // self.workers))
+            context = multiprocessing.get_context("spawn")
+            self._shards = [
+                ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=context,
+                    initializer=_init_decode_worker,
+                    initargs=(model_path, sample_rate, self.shard_capacity)
+                )
+                for _ in range(self.workers)
+            ]
+            self._shard_load = [0] * self.workers
+
+    def _reserve_shard(self, timeout: Optional[float] = None) -> int:
+        # Waits like RecognizerPool.acquire: up to timeout seconds (None waits forever)
+        with self._shard_freed:
+            if not self._shard_freed.wait_for(lambda: min(self._shard_load) < self.shard_capacity, timeout):
+                raise CapacityError(
+                    f"All {self.shard_capacity * len(self._shards)} decode slots are in use",
+                    resource="decode_executor"
+                )
+            shard = min(range(len(self._shards)), key=self._shard_load.__getitem__)
+            self._shard_load[shard] += 1
+            return shard
+
+    def _release_shard(self, shard: int) -> None:
+        with self._shard_freed:
+            self._shard_load[shard] -= 1
+            self._shard_freed.notify()
+
+    async def open_session(self, acquire_timeout: Optional[float] = None) -> DecodeSession:
+        """
+        Reserve a recognizer for a new audio stream
+        
+        Args:
+            acquire_timeout: Seconds to wait for a free recognizer
             
-        # Check if model exists
-        model_dir = Path(self.model_path)
-        if not model_dir.exists() or not model_dir.is_dir():
-            raise FileNotFoundError(f"Vosk model not found at {self.model_path}. "
-                                    f"Please download a model from https://alphacephei.com/vosk/models "
-                                    f"and extract it to the {MODELS_DIR} directory.")
+        Raises:
+            CapacityError: If no recognizer is available
+        """
+        loop = asyncio.get_running_loop()
         
-        logger.info(f"Loading Vosk model from {self.model_path}")
+        if self.pool is not None:
+            # Wait on the default executor so a full pool never starves decode threads
+            recognizer = await loop.run_in_executor(None, self.pool.acquire, acquire_timeout)
+            return DecodeSession(self, recognizer=recognizer)
         
-        # Load the model and create recognizer
-        self.model = Model(str(model_dir))
-        self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
-        self.recognizer.SetWords(True)  # Enable word timestamps
+        # Wait on the default executor, as for the recognizer pool
+        shard = await loop.run_in_executor(None, self._reserve_shard, acquire_timeout)
+        session_key = uuid.uuid4().hex
+        try:
+            await loop.run_in_executor(self._shards[shard], _worker_open, session_key)
+        except BaseException:
+            self._release_shard(shard)
+            raise
+        return DecodeSession(self, session_key=session_key, shard=shard)
+
+    def transcribe_file(self, audio_file_path: str, acquire_timeout: Optional[float] = None) -> dict:
+        """Decode a file on the executor and wait for the result"""
+        if self.pool is not None:
+            with self.pool.lease(acquire_timeout) as recognizer:
+                return self._threads.submit(
+                    decode_file, recognizer, audio_file_path, self.pool.sample_rate
+                ).result()
         
-        logger.info("Vosk transcription service initialized")
+        shard = self._reserve_shard(acquire_timeout)
+        try:
+            return self._shards[shard].submit(_worker_transcribe_file, audio_file_path).result()
+        finally:
+            self._release_shard(shard)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get executor configuration and load counters"""
+        stats: Dict[str, Any] = {"mode": self.mode, "workers": self.workers}
+        if self.pool is not None:
+            stats["pool"] = self.pool.stats()
+        else:
+            with self._lock:
+                stats["shard_capacity"] = self.shard_capacity
+                stats["shard_load"] = list(self._shard_load)
+        return stats
+
+    def shutdown(self) -> None:
+        """Stop decode workers"""
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+        for shard in self._shards:
+            shard.shutdown(wait=False, cancel_futures=True)
+
+
+class StreamTimeMap:
+    """
+    Maps recognizer time back to stream time
+    
+    The recognizer only sees audio that passed the VAD, so its word
+    timestamps drift ahead of the stream by the silence dropped so far.
+    Each breakpoint records where, in fed audio, a new stream offset
+    starts applying.
+    """
+    
+    def __init__(self):
+        self._fed = array("d", [0.0])
+        self._offset = array("d", [0.0])
+
+    def add(self, fed_seconds: float, stream_seconds: float) -> None:
+        """Record that fed audio at fed_seconds came from stream_seconds"""
+        offset = stream_seconds - fed_seconds
+        if offset != self._offset[-1]:
+            self._fed.append(fed_seconds)
+            self._offset.append(offset)
+
+    def to_stream(self, fed_seconds: float) -> float:
+        """Convert a recognizer timestamp to seconds since the stream started"""
+        index = bisect.bisect_right(self._fed, fed_seconds) - 1
+        return fed_seconds + self._offset[max(index, 0)]
 
-    def reset(self):
-        """Reset the recognizer to start a new transcription"""
-        self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
-        self.recognizer.SetWords(True)
+    def remap_words(self, result: dict) -> dict:
+        """Rewrite the word timings of a recognition result in place"""
+        for word in result.get("result", ()):
+            word["start"] = round(self.to_stream(word["start"]), 3)
+            word["end"] = round(self.to_stream(word["end"]), 3)
+        return result
 
-    def accept_waveform(self, audio_chunk: bytes) -> dict:
+
+class EnergyVAD:
+    """
+    Energy-based voice activity detector for 16-bit mono PCM
+    
+    Frame energies are computed for a whole chunk at once and compared
+    against a noise floor adapted from the unvoiced frames. Silence is dropped before it reaches
+    the recognizer, except for a short pre-roll ahead of speech and a
+    hangover after it, and an utterance boundary is reported once the
+    silence after speech exceeds end_silence_ms.
+    """
+    
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        threshold_db: float = 12.0,
+        min_speech_db: float = -50.0,
+        preroll_ms: int = 300,
+        end_silence_ms: int = 600,
+        noise_adapt: float = 0.05
+    ):
         """
-        Process an audio chunk and return any recognized text
+        Initialize the detector
+        
+        Args:
+            sample_rate: Audio sample rate in Hz (default: 16000)
+            frame_ms: Analysis frame length in milliseconds (default: 20)
+            threshold_db: Margin above the noise floor counted as speech (default: 12.0)
+            min_speech_db: Absolute level in dBFS below which frames are never speech (default: -50.0)
+            preroll_ms: Silence kept ahead of speech onsets (default: 300)
+            end_silence_ms: Silence after speech that ends an utterance (default: 600)
+            noise_adapt: Rate at which the noise floor rises per chunk of silence (default: 0.05)
+        """
+        self.frame_samples = max(1, sample_rate * frame_ms // 1000)
+        self.frame_seconds = self.frame_samples / float(sample_rate)
+        self.frame_bytes = self.frame_samples * 2
+        self.threshold_db = threshold_db
+        self.min_speech_db = min_speech_db
+        self.end_silence_frames = max(1, end_silence_ms // frame_ms)
+        self.noise_adapt = noise_adapt
+        self.noise_db: Optional[float] = None
+        
+        self._preroll: deque = deque(maxlen=max(0, preroll_ms // frame_ms))
+        self._remainder = b""
+        self._samples = ScratchBuffer(np.float32)
+        self._power = ScratchBuffer(np.float32)
+        self._in_speech = False
+        self._silence_run = 0
+        
+        self.frames_total = 0
+        self.frames_dropped = 0
+        self.time_map = StreamTimeMap()
+
+    @property
+    def in_speech(self) -> bool:
+        """Whether the detector is currently inside an utterance"""
+        return self._in_speech
+
+    def frame_levels(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Get the level of each frame in dBFS
+        
+        The returned array is reused by the next call.
+        """
+        count = frames.shape[0]
+        samples = self._samples.get(frames.size).reshape(count, self.frame_samples)
+        np.copyto(samples, frames, casting="unsafe")
+        power = self._power.get(count)
+        np.einsum("ij,ij->i", samples, samples, out=power)
+        power *= np.float32(1.0 / (self.frame_samples * 32768.0 ** 2))
+        power += np.float32(1e-12)
+        np.log10(power, out=power)
+        power *= np.float32(10.0)
+        return power
+
+    def _update_noise_floor(self, levels: np.ndarray) -> None:
+        # Track the quiet end of each chunk: fall immediately, rise slowly
+        if not levels.size:
+            return
+        quiet = float(np.percentile(levels, 10))
+        if self.noise_db is None or quiet < self.noise_db:
+            self.noise_db = quiet
+        else:
+            self.noise_db += self.noise_adapt * (quiet - self.noise_db)
+
+    def process(self, audio_chunk: bytes) -> List[Tuple[Any, bool]]:
+        """
+        Filter one chunk of audio
         
         Args:
             audio_chunk: Raw audio bytes (mono, 16-bit PCM)
             
         Returns:
-            dict: Recognition result with text and confidence
+            List of (audio, end_of_utterance) segments. The audio should be
+            fed to the recognizer in order; when end_of_utterance is set the
+            utterance is complete after that audio. Audio is bytes-like:
+            contiguous runs are zero-copy memoryviews of the chunk.
         """
-        if self.recognizer.AcceptWaveform(audio_chunk):
-            result_json = self.recognizer.Result()
-            return json.loads(result_json)
-        else:
-            # Return partial result
-            partial_json = self.recognizer.PartialResult()
-            return json.loads(partial_json)
+        data = self._remainder + audio_chunk if self._remainder else audio_chunk
+        count = len(data) // self.frame_bytes
+        self._remainder = bytes(data[count * self.frame_bytes:])
+        data = memoryview(data)
+        if not count:
+            return []
+        
+        frames = np.frombuffer(data, dtype="<i2", count=count * self.frame_samples)
+        levels = self.frame_levels(frames.reshape(count, self.frame_samples))
+        if self.noise_db is None:
+            self._update_noise_floor(levels)
+        voiced = levels > max(self.noise_db + self.threshold_db, self.min_speech_db)
+        # Only silence moves the floor, so sustained speech cannot raise it to speech level
+        self._update_noise_floor(levels[~voiced])
+        
+        segments: List[Tuple[Any, bool]] = []
+        pending: List[Any] = []
+        fed = 0
+        size = self.frame_bytes
+        
+        # Walk runs of voiced/unvoiced frames rather than individual frames
+        edges = np.flatnonzero(voiced[1:] != voiced[:-1]) + 1
+        for start, stop in zip(np.r_[0, edges], np.r_[edges, count]):
+            start, stop = int(start), int(stop)
+            if voiced[start]:
+                if not self._in_speech:
+                    self._in_speech = True
+                    # The pre-roll frames immediately precede the onset in the stream
+                    fed_frames = self.frames_total - self.frames_dropped + fed
+                    stream_frames = self.frames_total + start - len(self._preroll)
+                    self.time_map.add(fed_frames * self.frame_seconds, stream_frames * self.frame_seconds)
+                    pending.extend(self._preroll)
+                    fed += len(self._preroll)
+                    self._preroll.clear()
+                self._silence_run = 0
+                pending.append(data[start * size:stop * size])
+                fed += stop - start
+            elif self._in_speech:
+                hangover = self.end_silence_frames - self._silence_run
+                if stop - start < hangover:
+                    pending.append(data[start * size:stop * size])
+                    fed += stop - start
+                    self._silence_run += stop - start
+                    continue
+                # Enough trailing silence: feed the hangover and close the utterance
+                cut = start + hangover
+                pending.append(data[start * size:cut * size])
+                fed += hangover
+                segments.append((_merge(pending), True))
+                pending = []
+                self._in_speech = False
+                self._silence_run = 0
+                self._keep_preroll(data, max(cut, stop - self._preroll.maxlen), stop)
+            else:
+                self._keep_preroll(data, max(start, stop - self._preroll.maxlen), stop)
+        
+        if pending:
+            segments.append((_merge(pending), False))
+        
+        self.frames_total += count
+        self.frames_dropped += count - fed
+        return segments
+
+    def _keep_preroll(self, data: memoryview, start: int, stop: int) -> None:
+        # Copied out, since the chunk buffer may be reused by the caller
+        size = self.frame_bytes
+        self._preroll.extend(bytes(data[i * size:(i + 1) * size]) for i in range(start, stop))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get frame counters for the stream"""
+        return {
+            "frames_total": self.frames_total,
+            "frames_dropped": self.frames_dropped,
+            "dropped_ratio": round(self.frames_dropped / self.frames_total, 4) if self.frames_total else 0.0,
+        }
+
+
+def _merge(pieces: List[Any]):
+    """Join audio pieces, passing a single contiguous piece through uncopied"""
+    return pieces[0] if len(pieces) == 1 else b"".join(pieces)
+
+
+async def _pump_audio(audio_stream: AsyncGenerator[bytes, None], queue: asyncio.Queue) -> None:
+    """Read an audio stream into a bounded queue, forwarding errors to the consumer"""
+    try:
+        async for audio_chunk in audio_stream:
+            await queue.put(audio_chunk)
+    except Exception as e:
+        await queue.put(e)
+    else:
+        await queue.put(_END_OF_STREAM)
+
+
+class VoskTranscriptionService:
+    """Vosk-based speech transcription service"""
     
-    def get_final_result(self) -> dict:
-        """Get the final recognition result"""
-        result_json = self.recognizer.FinalResult()
-        return json.loads(result_json)
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        sample_rate: int = 16000,
+        pool_size: int = 32,
+        acquire_timeout: Optional[float] = 5.0,
+        decode_mode: str = "thread",
+        decode_workers: Optional[int] = None,
+        max_pending_chunks: int = 8,
+        vad_enabled: bool = True,
+        vad_options: Optional[Dict[str, Any]] = None,
+        executor: Optional[DecodeExecutor] = None
+    ):
+        """
+        Initialize the Vosk transcription service
+        
+        Args:
+            model_path: Path to the Vosk model directory (optional)
+            sample_rate: Audio sample rate in Hz (default: 16000)
+            pool_size: Maximum number of concurrent recognizers (default: 32)
+            acquire_timeout: Seconds to wait for a free recognizer (default: 5.0)
+            decode_mode: Decode executor mode, "thread" or "process" (default: "thread")
+            decode_workers: Number of decode threads/processes (default: CPU count)
+            max_pending_chunks: Audio chunks buffered per stream before reads pause (default: 8)
+            vad_enabled: Whether to drop silence and endpoint streams with EnergyVAD (default: True)
+            vad_options: Optional keyword arguments for EnergyVAD
+            executor: Optional pre-built decode executor
+        """
+        self.sample_rate = sample_rate
+        self.acquire_timeout = acquire_timeout
+        self.max_pending_chunks = max_pending_chunks
+        self.vad_enabled = vad_enabled
+        self.vad_options = vad_options or {}
+        
+        # Use provided model path or default
+        if model_path:
+            self.model_path = model_path
+        else:
+            self.model_path = DEFAULT_MODEL_DIR
+        
+        if executor is None:
+            model_dir = resolve_model_dir(self.model_path)
+            
+            # The model is loaded once per process; recognizers are leased per session
+            executor = DecodeExecutor(
+                str(model_dir),
+                self.sample_rate,
+                mode=decode_mode,
+                workers=decode_workers,
+                pool_size=pool_size
+            )
+        
+        self.executor = executor
+        self.pool = executor.pool
+        
+        logger.info(f"Vosk transcription service initialized ({executor.mode} decode, {executor.workers} workers)")
 
     async def transcribe_stream(self, audio_stream: AsyncGenerator[bytes, None]) -> AsyncGenerator[dict, None]:
         """
         Transcribe an audio stream in real-time
         
+        Audio is read ahead into a bounded queue while earlier chunks decode;
+        once the queue is full the stream is not read until the decoder
+        catches up, which pushes backpressure onto the client.
+        
+        When VAD is enabled, silence is dropped before decoding and the end
+        of each utterance is detected by the VAD, which flushes a final
+        result without waiting for Kaldi's own endpointer. Word timestamps
+        in results are remapped so they count from the start of the stream,
+        including the dropped silence.
+        
         Args:
             audio_stream: Async generator yielding audio chunks
             
         Yields:
             dict: Recognition results as they become available
         """
-        self.reset()  # Start fresh
+        # Lease a dedicated recognizer so concurrent sessions never share decoder state
+        session = await self.executor.open_session(self.acquire_timeout)
+        vad = EnergyVAD(self.sample_rate, **self.vad_options) if self.vad_enabled else None
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending_chunks)
+        reader = asyncio.create_task(_pump_audio(audio_stream, queue))
         
         try:
-            async for audio_chunk in audio_stream:
-                result = self.accept_waveform(audio_chunk)
-                
-                # Only yield if we have actual text
-                if result.get("text") or result.get("partial"):
-                    yield result
+            while True:
+                audio_chunk = await queue.get()
+                if audio_chunk is _END_OF_STREAM:
+                    break
+                if isinstance(audio_chunk, Exception):
+                    raise audio_chunk
                 
-                # Small delay to prevent overwhelming the CPU
-                await asyncio.sleep(0.01)
+                segments = vad.process(audio_chunk) if vad else [(audio_chunk, False)]
+                for audio, end_of_utterance in segments:
+                    result = await session.accept(audio)
+                    
+                    # Only yield if we have actual text
+                    if result.get("text") or result.get("partial"):
+                        yield vad.time_map.remap_words(result) if vad else result
+                    
+                    if end_of_utterance:
+                        final = await session.finish()
+                        if final.get("text"):
+                            yield vad.time_map.remap_words(final)
                 
             # Get final result after stream ends
-            final_result = self.get_final_result()
-            if final_result.get("text"):
-                yield final_result
+            final = await session.finish()
+            if final.get("text"):
+                yield vad.time_map.remap_words(final) if vad else final
                 
         except Exception as e:
             logger.error(f"Error in transcribe_stream: {str(e)}")
             raise
+        finally:
+            reader.cancel()
+            session.close()
+            if vad is not None:
+                logger.debug(f"VAD stats: {vad.stats()}")
 
     def transcribe_file(self, audio_file_path: str) -> dict:
         """
@@ -128,24 +843,17 @@ class VoskTranscriptionService:
         Returns:
             dict: Complete transcription result
         """
-        self.reset()
-        
         try:
-            with open(audio_file_path, "rb") as f:
-                # Process file in chunks to avoid memory issues
-                chunk_size = 4000  # bytes
-                while True:
-                    data = f.read(chunk_size)
-                    if not data:
-                        break
-                    self.recognizer.AcceptWaveform(data)
-                    
-            return self.get_final_result()
+            return self.executor.transcribe_file(audio_file_path, self.acquire_timeout)
             
         except Exception as e:
             logger.error(f"Error transcribing file {audio_file_path}: {str(e)}")
             raise
 
+    def shutdown(self) -> None:
+        """Stop the decode executor"""
+        self.executor.shutdown()
+
 
 # Helper functions for audio processing
 
@@ -153,12 +861,15 @@ def convert_to_pcm(audio_data: np.ndarray) -> bytes:
     """
     Convert numpy audio data to PCM bytes for Vosk
     
+    Out-of-range samples are clipped rather than wrapped around. Streaming
+    callers should use app.utils.dsp.float_to_int16 with reused buffers.
+    
     Args:
         audio_data: Audio data as numpy array (-1.0 to 1.0 float)
         
     Returns:
         bytes: Audio data as 16-bit PCM
     """
-    # Scale to int16 range and convert to bytes
-    audio_int16 = (audio_data * 32767).astype(np.int16)
-    return audio_int16.tobytes()
+    samples = np.asarray(audio_data, dtype=np.float32)
+    out = np.empty(len(samples), dtype=np.int16)
+    return float_to_int16(samples, out, np.empty_like(samples)).tobytes()
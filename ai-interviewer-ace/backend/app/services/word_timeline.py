@@ -0,0 +1,237 @@
+"""
+Per-session word timings and confidences from the recognizer
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import numpy as np
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Set up logging
+logger = logging.getLogger("hiregage.transcription.words")
+
+
+class WordTimeline:
+    """
+    Columnar store of recognized words for one session
+
+    Words are kept as parallel arrays (text, start, end, confidence and
+    utterance index) instead of a dict per word, so a long interview costs
+    a few bytes per word and the numeric columns can be analysed with
+    NumPy without copying. Times are seconds since `origin`, the Unix time
+    the session's first audio stream started.
+    """
+
+    def __init__(self, origin: Optional[float] = None):
+        """
+        Initialize an empty timeline
+
+        Args:
+            origin: Unix time that timestamps count from (default: now)
+        """
+        self.origin = time.time() if origin is None else origin
+        self.words: List[str] = []
+        self.start = array("d")
+        self.end = array("d")
+        self.conf = array("f")
+        self.utterance = array("I")
+        self.utterances = 0
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add_utterance(self, words: List[Dict[str, Any]], base: float = 0.0) -> None:
+        """
+        Append the words of one final recognition result
+
+        Args:
+            words: Vosk `result` entries with word, start, end and conf
+            base: Seconds between the origin and the start of the stream the
+                word times are relative to
+        """
+        if not words:
+            return
+        index = self.utterances
+        for word in words:
+            self.words.append(word["word"])
+            self.start.append(base + word["start"])
+            self.end.append(base + word["end"])
+            self.conf.append(word.get("conf", 1.0))
+            self.utterance.append(index)
+        self.utterances += 1
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Get zero-copy NumPy views of the numeric columns"""
+        return {
+            "start": np.frombuffer(self.start, dtype=np.float64) if self.start else np.empty(0),
+            "end": np.frombuffer(self.end, dtype=np.float64) if self.end else np.empty(0),
+            "conf": np.frombuffer(self.conf, dtype=np.float32) if self.conf else np.empty(0, dtype=np.float32),
+        }
+
+    def pauses(self, min_gap: float = 0.5) -> List[Dict[str, float]]:
+        """
+        Find silences between consecutive words
+
+        Args:
+            min_gap: Shortest gap in seconds reported as a pause
+
+        Returns:
+            List of {"start", "end", "duration"} for each pause
+        """
+        cols = self.columns()
+        if len(self) < 2:
+            return []
+        gaps = cols["start"][1:] - cols["end"][:-1]
+        return [
+            {"start": round(float(cols["end"][i]), 3), "end": round(float(cols["start"][i + 1]), 3),
+             "duration": round(float(gaps[i]), 3)}
+            for i in np.flatnonzero(gaps >= min_gap)
+        ]
+
+    def speaking_rate(self, min_gap: float = 0.5) -> Optional[float]:
+        """
+        Get the speaking rate in words per minute
+
+        Pauses of at least min_gap seconds are excluded from the speaking time.
+        """
+        if not len(self):
+            return None
+        cols = self.columns()
+        span = float(cols["end"][-1] - cols["start"][0])
+        gaps = cols["start"][1:] - cols["end"][:-1]
+        speaking = span - float(gaps[gaps >= min_gap].sum())
+        return round(len(self) * 60.0 / speaking, 1) if speaking > 0 else None
+
+    def low_confidence_spans(self, threshold: float = 0.6) -> List[Dict[str, Any]]:
+        """
+        Find runs of consecutive words recognized with low confidence
+
+        Args:
+            threshold: Confidence below which a word is considered unreliable
+
+        Returns:
+            List of {"start", "end", "text", "min_conf"} for each run
+        """
+        cols = self.columns()
+        low = cols["conf"] < threshold
+        if not low.any():
+            return []
+        edges = np.flatnonzero(np.diff(np.r_[0, low.astype(np.int8), 0]))
+        return [
+            {
+                "start": round(float(cols["start"][first]), 3),
+                "end": round(float(cols["end"][stop - 1]), 3),
+                "text": " ".join(self.words[first:stop]),
+                "min_conf": round(float(cols["conf"][first:stop].min()), 3),
+            }
+            for first, stop in zip(edges[::2], edges[1::2])
+        ]
+
+    def summary(self, min_pause: float = 0.5, low_confidence: float = 0.6) -> Dict[str, Any]:
+        """Get speaking-rate, pause and confidence metrics"""
+        cols = self.columns()
+        pauses = self.pauses(min_pause)
+        return {
+            "words": len(self),
+            "utterances": self.utterances,
+            "speaking_rate_wpm": self.speaking_rate(min_pause),
+            "pause_count": len(pauses),
+            "pause_seconds": round(sum(p["duration"] for p in pauses), 3),
+            "mean_confidence": round(float(cols["conf"].mean()), 3) if len(self) else None,
+            "low_confidence_spans": self.low_confidence_spans(low_confidence),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize as columns (times rounded to milliseconds)"""
+        return {
+            "origin": self.origin,
+            "words": list(self.words),
+            "start": [round(t, 3) for t in self.start],
+            "end": [round(t, 3) for t in self.end],
+            "conf": [round(c, 3) for c in self.conf],
+            "utterance": list(self.utterance),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WordTimeline":
+        """Rebuild a timeline serialized with to_dict()"""
+        timeline = cls(origin=data.get("origin"))
+        timeline.words = list(data.get("words", []))
+        timeline.start = array("d", data.get("start", []))
+        timeline.end = array("d", data.get("end", []))
+        timeline.conf = array("f", data.get("conf", []))
+        timeline.utterance = array("I", data.get("utterance", []))
+        timeline.utterances = timeline.utterance[-1] + 1 if timeline.utterance else 0
+        return timeline
+
+
+class WordTimelineStore:
+    """
+    Word timelines for live sessions, persisted when their streams end
+
+    A session may reconnect, or stream from several sockets at once; each
+    stream opens the session's timeline and the file is written when the
+    last stream closes. Finished sessions are loaded from disk on demand.
+    File work runs in a worker thread to keep the event loop free.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize the store
+
+        Args:
+            directory: Directory holding `<session_id>.words.json` files
+        """
+        self.directory = Path(directory)
+        self._live: Dict[str, WordTimeline] = {}
+        self._streams: Dict[str, int] = {}
+
+    def _path(self, session_id: str) -> Path:
+        return self.directory / f"{session_id}.words.json"
+
+    def _load(self, session_id: str) -> Optional[WordTimeline]:
+        path = self._path(session_id)
+        if not path.exists():
+            return None
+        with open(path, "r") as f:
+            return WordTimeline.from_dict(json.load(f))
+
+    def _save(self, session_id: str, data: Dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._path(session_id), "w") as f:
+            json.dump(data, f)
+
+    async def open(self, session_id: str) -> WordTimeline:
+        """Get the session's timeline for a new audio stream"""
+        self._streams[session_id] = self._streams.get(session_id, 0) + 1
+        timeline = self._live.get(session_id)
+        if timeline is None:
+            loaded = await asyncio.to_thread(self._load, session_id)
+            # Another stream may have opened the session while the file loaded
+            timeline = self._live.setdefault(session_id, loaded or WordTimeline())
+        return timeline
+
+    async def close(self, session_id: str) -> None:
+        """Release a stream, writing the timeline once no streams remain"""
+        remaining = self._streams.get(session_id, 0) - 1
+        if remaining > 0:
+            self._streams[session_id] = remaining
+            return
+        self._streams.pop(session_id, None)
+        timeline = self._live.pop(session_id, None)
+        if timeline is not None and len(timeline):
+            await asyncio.to_thread(self._save, session_id, timeline.to_dict())
+
+    async def get(self, session_id: str) -> Optional[WordTimeline]:
+        """Get a session's timeline, live or persisted"""
+        timeline = self._live.get(session_id)
+        return timeline if timeline is not None else await asyncio.to_thread(self._load, session_id)
+
+
+# Shared by the speech WebSocket, which records timings, and the transcript
+# router, which serves them; kept next to the transcript files
+word_timelines = WordTimelineStore(os.environ.get("TRANSCRIPT_DIR", "transcripts"))
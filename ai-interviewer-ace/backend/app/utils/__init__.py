@@ -11,5 +11,6 @@ from .errors import (
     AIServiceError,
     DatabaseError,
     ValidationError,
+    CapacityError,
     http_error_handler
 )
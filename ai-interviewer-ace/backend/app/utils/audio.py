@@ -0,0 +1,434 @@
+"""
+Audio ingestion utilities: WAV/RIFF parsing, downmixing and resampling
+"""
+import os
+import mmap
+import struct
+import logging
+import numpy as np
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from app.utils.dsp import ALAW_TABLE, MULAW_TABLE, DCBlocker, GainNormalizer, ScratchBuffer, float_to_int16
+from app.utils.errors import ValidationError
+
+# Set up logging
+logger = logging.getLogger("hiregage.audio")
+
+# WAVE format tags
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_ALAW = 0x0006
+WAVE_FORMAT_MULAW = 0x0007
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Sample dtypes for the supported (format, bits) pairs; 24-bit PCM is unpacked by hand
+_SAMPLE_DTYPES = {
+    (WAVE_FORMAT_PCM, 8): np.dtype(np.uint8),
+    (WAVE_FORMAT_PCM, 16): np.dtype("<i2"),
+    (WAVE_FORMAT_PCM, 24): np.dtype(np.uint8),
+    (WAVE_FORMAT_PCM, 32): np.dtype("<i4"),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype("<f4"),
+    (WAVE_FORMAT_IEEE_FLOAT, 64): np.dtype("<f8"),
+    (WAVE_FORMAT_ALAW, 8): np.dtype(np.uint8),
+    (WAVE_FORMAT_MULAW, 8): np.dtype(np.uint8),
+}
+
+# Expansion tables for G.711 companded formats
+_COMPANDING_TABLES = {
+    WAVE_FORMAT_ALAW: ALAW_TABLE,
+    WAVE_FORMAT_MULAW: MULAW_TABLE,
+}
+
+
+@dataclass(frozen=True)
+class WavInfo:
+    """Layout of the PCM payload in a WAV file"""
+    audio_format: int
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    block_align: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frames(self) -> int:
+        """Number of sample frames in the payload"""
+        return self.data_size // self.block_align
+
+    @property
+    def duration(self) -> float:
+        """Payload duration in seconds"""
+        return self.frames / float(self.sample_rate)
+
+
+def parse_wav_header(buffer, file_size: Optional[int] = None) -> WavInfo:
+    """
+    Parse the RIFF/WAVE header and locate the PCM payload
+
+    Args:
+        buffer: Bytes-like object holding (at least) the file header
+        file_size: Total file size, used to clamp truncated or streamed data chunks
+
+    Returns:
+        WavInfo: Format and payload location
+
+    Raises:
+        ValidationError: If the header is malformed or the encoding is unsupported
+    """
+    file_size = len(buffer) if file_size is None else file_size
+    if file_size < 12 or buffer[0:4] != b"RIFF" or buffer[8:12] != b"WAVE":
+        raise ValidationError("Not a RIFF/WAVE file")
+
+    # Chunk headers and the fmt chunk must lie within the buffer as well as the file
+    end = min(file_size, len(buffer))
+    fmt = None
+    offset = 12
+    while offset + 8 <= end:
+        chunk_id = bytes(buffer[offset:offset + 4])
+        chunk_size, = struct.unpack_from("<I", buffer, offset + 4)
+        body = offset + 8
+
+        if chunk_id == b"fmt ":
+            if chunk_size < 16 or body + 16 > end:
+                raise ValidationError("Truncated fmt chunk")
+            fmt = struct.unpack_from("<HHIIHH", buffer, body)
+            audio_format = fmt[0]
+            if audio_format == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                if body + 40 > end:
+                    raise ValidationError("Truncated fmt chunk")
+                # The real format tag is the first two bytes of the SubFormat GUID
+                audio_format, = struct.unpack_from("<H", buffer, body + 24)
+            fmt = (audio_format,) + fmt[1:]
+
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValidationError("WAV data chunk precedes fmt chunk")
+            audio_format, channels, sample_rate, _, block_align, bits = fmt
+            if (audio_format, bits) not in _SAMPLE_DTYPES:
+                raise ValidationError(
+                    f"Unsupported WAV encoding (format {audio_format:#06x}, {bits}-bit)"
+                )
+            if channels < 1 or sample_rate < 1 or block_align != channels * bits // 8:
+                raise ValidationError("Inconsistent WAV fmt chunk")
+            # Streaming writers leave the size unset; clamp to what is on disk
+            data_size = min(chunk_size, file_size - body)
+            return WavInfo(audio_format, channels, sample_rate, bits, block_align, body, data_size)
+
+        offset = body + chunk_size + (chunk_size & 1)
+
+    raise ValidationError("WAV file has no data chunk")
+
+
+class Resampler:
+    """
+    Streaming sample-rate converter for mono float32 audio
+
+    Uses linear interpolation, preceded by a windowed-sinc low-pass
+    filter when downsampling to avoid aliasing. State is carried across
+    calls so blocks can be processed independently of their size, and
+    intermediate arrays are reused so steady-state calls do not allocate.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int, num_taps: int = 63):
+        """
+        Initialize the resampler
+
+        Args:
+            source_rate: Input sample rate in Hz
+            target_rate: Output sample rate in Hz
+            num_taps: Length of the anti-aliasing filter when downsampling
+        """
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self.step = source_rate / float(target_rate)
+        self._position = 0.0
+        self._last: Optional[float] = None
+        self._taps: Optional[np.ndarray] = None
+        self._history: Optional[np.ndarray] = None
+
+        if target_rate < source_rate:
+            cutoff = 0.9 * target_rate / source_rate
+            n = np.arange(num_taps) - (num_taps - 1) / 2.0
+            taps = cutoff * np.sinc(cutoff * n) * np.hamming(num_taps)
+            # Reversed so tap k weights the k-th oldest sample in the window
+            self._taps = (taps / taps.sum()).astype(np.float32)[::-1].copy()
+            self._history = np.zeros(num_taps - 1, dtype=np.float32)
+
+        self._padded = ScratchBuffer(np.float32)
+        self._input = ScratchBuffer(np.float32)
+        self._positions = ScratchBuffer(np.float64)
+        self._index = ScratchBuffer(np.intp)
+        self._frac = ScratchBuffer(np.float32)
+        self._left = ScratchBuffer(np.float32)
+        self._right = ScratchBuffer(np.float32)
+        self._ramp = np.arange(0, dtype=np.float64)
+
+    def _filter(self, samples: np.ndarray, out: np.ndarray) -> None:
+        # FIR as a sum of shifted views of one padded buffer: one in-place pass per tap
+        history = len(self._history)
+        count = len(samples)
+        padded = self._padded.get(history + count)
+        padded[:history] = self._history
+        padded[history:] = samples
+        self._history[:] = padded[count:]
+
+        scaled = self._right.get(count)
+        np.multiply(padded[:count], self._taps[0], out=out)
+        for k in range(1, len(self._taps)):
+            np.multiply(padded[k:k + count], self._taps[k], out=scaled)
+            out += scaled
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Resample one block of mono float32 audio
+
+        Args:
+            samples: Input samples at source_rate
+
+        Returns:
+            np.ndarray: Output samples at target_rate. The array is reused
+            by the next call, so consume it before processing more audio.
+        """
+        if self.source_rate == self.target_rate:
+            return samples
+        if not len(samples):
+            return samples[:0]
+
+        # Slot 0 carries the previous block's last sample so interpolation spans the boundary
+        head = 0 if self._last is None else 1
+        buffer = self._input.get(head + len(samples))
+        if head:
+            buffer[0] = self._last
+        if self._taps is not None:
+            self._filter(samples, buffer[head:])
+        else:
+            buffer[head:] = samples
+
+        last_index = len(buffer) - 1
+        count = max(0, int(np.ceil((last_index - self._position) / self.step)))
+        if count > len(self._ramp):
+            self._ramp = np.arange(max(count, 2 * len(self._ramp)), dtype=np.float64)
+
+        positions = self._positions.get(count)
+        np.multiply(self._ramp[:count], self.step, out=positions)
+        positions += self._position
+        index = self._index.get(count)
+        np.copyto(index, positions, casting="unsafe")
+        frac = self._frac.get(count)
+        np.subtract(positions, index, out=frac, casting="same_kind")
+
+        left = self._left.get(count)
+        right = self._right.get(count)
+        np.take(buffer, index, out=left)
+        np.take(buffer[1:], index, out=right)
+        right -= left
+        right *= frac
+        left += right
+
+        self._position += self.step * count - last_index
+        self._last = float(buffer[last_index])
+        return left
+
+
+def pcm_to_float_mono(block: np.ndarray, info: WavInfo, out: np.ndarray, work: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Decode a block of interleaved WAV samples to mono float32 in [-1, 1]
+
+    Channels are summed in float32 and scaled once, so downmixing and
+    normalization cost a single pass over the block.
+
+    Args:
+        block: Sample view shaped (frames, channels), or (frames, channels, 3) for 24-bit PCM
+        info: Format of the block
+        out: Preallocated float32 array with one element per frame
+        work: Preallocated integer array with one element per sample; required for
+            24-bit PCM (int32) and A-law/mu-law (int16) payloads
+
+    Returns:
+        np.ndarray: `out`
+    """
+    frames, channels = block.shape[0], info.channels
+    bits = info.bits_per_sample
+
+    if info.audio_format == WAVE_FORMAT_IEEE_FLOAT:
+        scale, offset = 1.0, 0.0
+    elif info.audio_format in _COMPANDING_TABLES:
+        scale, offset = 1.0 / 32768, 0.0
+        expanded = work.reshape(frames, channels)
+        np.take(_COMPANDING_TABLES[info.audio_format], block, out=expanded)
+        block = expanded
+    elif bits == 8:
+        scale, offset = 1.0 / 128, -128.0
+    else:
+        scale, offset = 1.0 / (1 << (bits - 1)), 0.0
+
+    if bits == 24 and info.audio_format == WAVE_FORMAT_PCM:
+        # Assemble little-endian 24-bit samples in the top of an int32, then shift to sign-extend
+        wide = work.reshape(frames, channels)
+        np.copyto(wide, block[..., 2])
+        wide <<= 8
+        wide |= block[..., 1]
+        wide <<= 8
+        wide |= block[..., 0]
+        wide <<= 8
+        wide >>= 8
+        block = wide
+
+    if channels == 1:
+        np.copyto(out, block[:, 0], casting="unsafe")
+    else:
+        np.sum(block, axis=1, dtype=np.float32, out=out)
+
+    if offset:
+        out += offset * channels
+    out *= np.float32(scale / channels)
+    return out
+
+
+def _work_dtype(info: WavInfo) -> Optional[np.dtype]:
+    """Integer dtype pcm_to_float_mono needs as a work buffer, if any"""
+    if info.audio_format in _COMPANDING_TABLES:
+        return np.dtype(np.int16)
+    if info.audio_format == WAVE_FORMAT_PCM and info.bits_per_sample == 24:
+        return np.dtype(np.int32)
+    return None
+
+
+class WavReader:
+    """
+    Memory-mapped WAV file reader
+
+    The PCM payload is exposed as NumPy views over the mapping, so blocks
+    are decoded straight from the page cache without intermediate copies.
+    Files without a RIFF header are treated as raw 16-bit mono PCM.
+    """
+
+    def __init__(self, path: str, raw_sample_rate: int = 16000):
+        """
+        Open and map a WAV file
+
+        Args:
+            path: Path to the audio file
+            raw_sample_rate: Sample rate assumed for headerless raw PCM files
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._map: Optional[mmap.mmap] = None
+
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            if self._map is not None and self._map[:4] == b"RIFF":
+                self.info = parse_wav_header(self._map, size)
+            else:
+                self.info = WavInfo(WAVE_FORMAT_PCM, 1, raw_sample_rate, 16, 2, 0, size - (size & 1))
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self) -> "WavReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap and close the file"""
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # A caller still holds a view; the mapping is released with it
+                pass
+            self._map = None
+        self._file.close()
+
+    def samples(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Get a zero-copy view of sample frames [start, stop)
+
+        Returns:
+            np.ndarray: View shaped (frames, channels), or (frames, channels, 3) for 24-bit PCM
+        """
+        info = self.info
+        stop = info.frames if stop is None else min(stop, info.frames)
+        start = min(start, stop)
+        if self._map is None or start == stop:
+            return np.empty((0, info.channels), dtype=_SAMPLE_DTYPES[(info.audio_format, info.bits_per_sample)])
+
+        dtype = _SAMPLE_DTYPES[(info.audio_format, info.bits_per_sample)]
+        view = np.frombuffer(
+            self._map,
+            dtype=dtype,
+            count=(stop - start) * info.block_align // dtype.itemsize,
+            offset=info.data_offset + start * info.block_align
+        )
+        if info.bits_per_sample == 24 and info.audio_format == WAVE_FORMAT_PCM:
+            return view.reshape(-1, info.channels, 3)
+        return view.reshape(-1, info.channels)
+
+    def iter_pcm16(
+        self,
+        sample_rate: int = 16000,
+        block_seconds: float = 1.0,
+        remove_dc: bool = False,
+        normalize: bool = False
+    ) -> Iterator[memoryview]:
+        """
+        Stream the payload as mono 16-bit PCM at the given sample rate
+
+        Blocks are decoded into buffers that are reused for every block, so
+        each yielded view is only valid until the next one is requested.
+
+        Args:
+            sample_rate: Output sample rate in Hz
+            block_seconds: Amount of source audio converted per block
+            remove_dc: Whether to remove DC offset before resampling
+            normalize: Whether to normalize gain toward -20 dBFS
+
+        Yields:
+            memoryview: Little-endian 16-bit mono PCM blocks
+        """
+        info = self.info
+        block_frames = max(1, int(info.sample_rate * block_seconds))
+        passthrough = (
+            info.audio_format == WAVE_FORMAT_PCM and info.bits_per_sample == 16
+            and info.channels == 1 and info.sample_rate == sample_rate
+            and not remove_dc and not normalize
+        )
+        if passthrough:
+            # Already in the recognizer's format: hand over views of the mapping
+            if not info.frames:
+                return
+            payload = memoryview(self._map)[info.data_offset:info.data_offset + info.frames * 2]
+            for start in range(0, len(payload), block_frames * 2):
+                yield payload[start:start + block_frames * 2]
+            return
+
+        resampler = Resampler(info.sample_rate, sample_rate)
+        work_dtype = _work_dtype(info)
+        work = np.empty(block_frames * info.channels, dtype=work_dtype) if work_dtype else None
+        mono = np.empty(block_frames, dtype=np.float32)
+        pcm = ScratchBuffer(np.int16, int(block_frames * sample_rate / info.sample_rate) + 2)
+        dc = DCBlocker() if remove_dc else None
+        gain = GainNormalizer() if normalize else None
+
+        for start in range(0, info.frames, block_frames):
+            stop = min(start + block_frames, info.frames)
+            count = stop - start
+            samples = pcm_to_float_mono(
+                self.samples(start, stop), info, mono[:count],
+                work[:count * info.channels] if work is not None else None
+            )
+            if dc is not None:
+                dc.process(samples)
+            if gain is not None:
+                gain.process(samples)
+
+            out = resampler.process(samples)
+            if len(out):
+                yield memoryview(float_to_int16(out, pcm.get(len(out)))).cast("B")
@@ -0,0 +1,81 @@
+"""
+Concurrency limits for async work
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.utils.errors import CapacityError
+from app.utils.metrics import Histogram
+
+
+class ConcurrencyLimiter:
+    """
+    Async semaphore that records its queue depth and wait times
+
+    At most `limit` callers hold a slot at once; the rest wait in FIFO
+    order. A caller that waits longer than `timeout` seconds gets a
+    CapacityError instead of queuing forever; with a timeout of 0 a caller
+    only gets a slot that is free right away.
+    """
+
+    def __init__(self, limit: int, timeout: Optional[float] = None, resource: str = "slots"):
+        """
+        Initialize the limiter
+
+        Args:
+            limit: Slots held at once
+            timeout: Seconds to wait for a slot (None waits forever)
+            resource: Name reported in CapacityError and stats
+        """
+        self.limit = limit
+        self.timeout = timeout
+        self.resource = resource
+        self.active = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.timeouts = 0
+        self.wait_ms = Histogram()
+        self._semaphore = asyncio.Semaphore(limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of the block
+
+        Raises:
+            CapacityError: If no slot frees up within the timeout
+        """
+        started = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            # Acquire in this task: unlike wait_for on Python 3.11, a timeout
+            # racing a release cannot leave the slot taken but unused
+            async with asyncio.timeout(self.timeout):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            self.timeouts += 1
+            raise CapacityError(f"All {self.limit} {self.resource} are in use", resource=self.resource)
+        finally:
+            self.waiting -= 1
+        self.wait_ms.observe((time.perf_counter() - started) * 1000)
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the limit, slots in use, queue depth, timeouts and wait histogram (ms)"""
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "timeouts": self.timeouts,
+            "wait_ms": self.wait_ms.snapshot(),
+        }
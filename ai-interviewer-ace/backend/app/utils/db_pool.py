@@ -0,0 +1,102 @@
+"""
+Instrumented connection pool for the async SQLAlchemy engine
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.utils.metrics import Histogram
+
+# Set while a checkout is being measured; QueuePool._do_get retries by recursing
+_measuring: ContextVar[bool] = ContextVar("hiregage_pool_measuring", default=False)
+
+
+class PoolMetrics:
+    """Counters and checkout-wait histogram shared by a pool and its replacements"""
+
+    def __init__(self):
+        self.checkout_wait_ms = Histogram()
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, wait_ms: float, overflowed: bool) -> None:
+        self.checkout_wait_ms.observe(wait_ms)
+        with self._lock:
+            self.checkouts += 1
+            if overflowed:
+                self.overflow_events += 1
+
+    def record_timeout(self, wait_ms: float) -> None:
+        self.checkout_wait_ms.observe(wait_ms)
+        with self._lock:
+            self.timeouts += 1
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records how long checkouts wait
+
+    Every checkout's wait (including ones that time out) goes into a
+    histogram, and checkouts that had to open a connection beyond
+    pool_size are counted as overflow events. Pass it as `poolclass` to
+    create_async_engine; the metrics survive engine.dispose(), which
+    replaces the pool.
+    """
+
+    def __init__(self, *args: Any, **kw: Any):
+        super().__init__(*args, **kw)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        if _measuring.get():
+            return super()._do_get()
+        overflow = self._overflow
+        start = time.perf_counter()
+        token = _measuring.set(True)
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout((time.perf_counter() - start) * 1000)
+            raise
+        finally:
+            _measuring.reset(token)
+        # _overflow counts up from -pool_size as connections are opened
+        self.metrics.record_checkout(
+            (time.perf_counter() - start) * 1000,
+            overflowed=self._overflow > overflow and self._overflow > 0
+        )
+        return record
+
+    def recreate(self) -> "InstrumentedAsyncPool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool occupancy, limits and checkout metrics"""
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout_seconds": self._timeout,
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.metrics.checkouts,
+            "overflow_events": self.metrics.overflow_events,
+            "timeouts": self.metrics.timeouts,
+            "checkout_wait_ms": self.metrics.checkout_wait_ms.snapshot(),
+        }
+
+
+def pool_stats(engine) -> Optional[Dict[str, Any]]:
+    """Get an engine's pool stats, or None if it has no instrumented pool"""
+    if engine is None:
+        return None
+    pool = engine.pool
+    return pool.stats() if isinstance(pool, InstrumentedAsyncPool) else None
@@ -0,0 +1,177 @@
+"""
+Vectorized audio DSP helpers operating in place on NumPy views
+"""
+import numpy as np
+from typing import Optional
+
+
+def _mulaw_table() -> np.ndarray:
+    # G.711 mu-law expansion; codes are stored bit-inverted
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(codes & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+def _alaw_table() -> np.ndarray:
+    # G.711 A-law expansion; even bits are inverted and a set sign bit means positive
+    codes = np.arange(256, dtype=np.int32) ^ 0x55
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = np.where(
+        exponent == 0,
+        (mantissa << 4) + 8,
+        ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0)
+    )
+    return np.where(codes & 0x80, magnitude, -magnitude).astype(np.int16)
+
+
+MULAW_TABLE = _mulaw_table()
+ALAW_TABLE = _alaw_table()
+
+INT16_SCALE = 1.0 / 32768.0
+
+
+class ScratchBuffer:
+    """
+    Grow-only work buffer
+
+    Returns views of a single backing array so steady-state processing of
+    similarly sized blocks performs no allocations.
+    """
+
+    def __init__(self, dtype, size: int = 0):
+        self.dtype = np.dtype(dtype)
+        self._array = np.empty(size, dtype=self.dtype)
+
+    def get(self, size: int) -> np.ndarray:
+        """Get a view of at least `size` elements (contents are undefined)"""
+        if size > len(self._array):
+            self._array = np.empty(max(size, 2 * len(self._array)), dtype=self.dtype)
+        return self._array[:size]
+
+
+def float_to_int16(samples: np.ndarray, out: np.ndarray, scratch: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Scale float samples in [-1, 1] to int16 with clipping
+
+    Out-of-range input saturates instead of wrapping around.
+
+    Args:
+        samples: Float samples
+        out: Preallocated int16 array of the same length
+        scratch: Optional float32 work array of the same length; when omitted
+            `samples` itself is scaled in place
+
+    Returns:
+        np.ndarray: `out`
+    """
+    work = samples if scratch is None else scratch
+    np.multiply(samples, 32767.0, out=work)
+    np.clip(work, -32768.0, 32767.0, out=work)
+    np.copyto(out, work, casting="unsafe")
+    return out
+
+
+def int16_to_float(samples: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """Scale int16 samples to float32 in [-1, 1) into `out`"""
+    np.multiply(samples, np.float32(INT16_SCALE), out=out, casting="unsafe")
+    return out
+
+
+def decode_int16(data, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Decode little-endian 16-bit PCM
+
+    Without `out` this is a zero-copy view over `data`.
+    """
+    view = np.frombuffer(data, dtype="<i2", count=len(data) // 2)
+    if out is None:
+        return view
+    return int16_to_float(view, out)
+
+
+def decode_float32(data, out: np.ndarray, scratch: np.ndarray) -> np.ndarray:
+    """
+    Decode little-endian float32 samples into int16 `out` with clipping
+
+    Args:
+        data: Raw float32 bytes
+        out: Preallocated int16 array
+        scratch: Preallocated float32 work array
+    """
+    view = np.frombuffer(data, dtype="<f4", count=len(data) // 4)
+    count = len(view)
+    return float_to_int16(view, out[:count], scratch[:count])
+
+
+def decode_mulaw(data, out: np.ndarray) -> np.ndarray:
+    """Expand G.711 mu-law bytes into int16 `out`"""
+    codes = np.frombuffer(data, dtype=np.uint8)
+    return np.take(MULAW_TABLE, codes, out=out[:len(codes)])
+
+
+def decode_alaw(data, out: np.ndarray) -> np.ndarray:
+    """Expand G.711 A-law bytes into int16 `out`"""
+    codes = np.frombuffer(data, dtype=np.uint8)
+    return np.take(ALAW_TABLE, codes, out=out[:len(codes)])
+
+
+def rms_dbfs(samples: np.ndarray) -> float:
+    """Get the RMS level of float samples in dBFS"""
+    if not len(samples):
+        return -120.0
+    power = float(np.dot(samples, samples)) / len(samples)
+    return 10.0 * np.log10(power + 1e-12)
+
+
+class DCBlocker:
+    """
+    Streaming DC offset removal
+
+    Subtracts a running estimate of the block mean, updated once per
+    block, so the correction is a single vectorized pass.
+    """
+
+    def __init__(self, adapt: float = 0.1):
+        self.adapt = adapt
+        self.offset: Optional[float] = None
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Remove DC from float samples in place"""
+        if not len(samples):
+            return samples
+        mean = float(samples.mean())
+        if self.offset is None:
+            self.offset = mean
+        else:
+            self.offset += self.adapt * (mean - self.offset)
+        samples -= self.offset
+        return samples
+
+
+class GainNormalizer:
+    """
+    Streaming gain normalization toward a target RMS level
+
+    The gain is smoothed across blocks and bounded, so quiet speakers are
+    lifted without pumping background noise up to full scale.
+    """
+
+    def __init__(self, target_dbfs: float = -20.0, max_gain_db: float = 20.0, silence_dbfs: float = -60.0, adapt: float = 0.2):
+        self.target_dbfs = target_dbfs
+        self.max_gain_db = max_gain_db
+        self.silence_dbfs = silence_dbfs
+        self.adapt = adapt
+        self.gain_db = 0.0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Apply gain to float samples in place"""
+        level = rms_dbfs(samples)
+        if level > self.silence_dbfs:
+            wanted = min(self.target_dbfs - level, self.max_gain_db)
+            self.gain_db += self.adapt * (wanted - self.gain_db)
+        if self.gain_db:
+            samples *= np.float32(10.0 ** (self.gain_db / 20.0))
+        return samples
@@ -33,6 +33,13 @@ class ValidationError(HireGageError):
         super().__init__(f"Validation error: {message}")
 
 
+class CapacityError(HireGageError):
+    """Exception when a bounded resource (e.g. recognizer pool) is exhausted"""
+    def __init__(self, message: str, resource: Optional[str] = None):
+        self.resource = resource
+        super().__init__(f"Capacity error: {message}")
+
+
 def http_error_handler(error: HireGageError) -> HTTPException:
     """Convert application errors to FastAPI HTTP exceptions"""
     if isinstance(error, AIServiceError):
@@ -50,6 +57,11 @@ def http_error_handler(error: HireGageError) -> HTTPException:
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail={"message": error.message, "errors": error.validation_errors, "type": "validation_error"}
         )
+    elif isinstance(error, CapacityError):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"message": error.message, "resource": error.resource, "type": "capacity_error"}
+        )
     else:
         return HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
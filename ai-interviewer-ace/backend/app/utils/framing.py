@@ -0,0 +1,310 @@
+"""
+Wire helpers for the speech WebSocket protocol
+
+Audio frames (client to server) and result frames (server to client)
+share a fixed 12-byte little-endian header:
+
+    version   uint8   protocol version (FRAME_VERSION)
+    kind      uint8   audio codec for audio frames, result kind for result frames
+    flags     uint16  bit flags (FLAG_END_OF_STREAM)
+    seq       uint32  sequence number, incremented by the sender per frame
+    timestamp uint32  milliseconds, sender-defined origin
+
+Audio frames carry the encoded samples after the header; result frames
+carry UTF-8 text. Partial result frames prefix the text with a uint32
+character offset: the client keeps the first `offset` characters of the
+previous partial and appends the text.
+"""
+import time
+import struct
+import numpy as np
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Callable, Optional, Tuple
+
+from app.utils.dsp import ScratchBuffer, decode_alaw, decode_float32, decode_mulaw
+from app.utils.errors import ValidationError
+from app.utils.opus import OpusStreamDecoder
+
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("<BBHII")
+PARTIAL_OFFSET = struct.Struct("<I")
+
+# Frame flags
+FLAG_END_OF_STREAM = 0x0001
+
+# Sequence numbers are compared modulo 2**32 so long sessions can wrap
+_SEQ_MODULUS = 1 << 32
+
+
+class Codec(IntEnum):
+    """
+    Audio encodings accepted in audio frames
+
+    PCM codecs are mono at the service sample rate. Opus is either one raw
+    packet per frame or a chunk of an Ogg/WebM stream (MediaRecorder output).
+    """
+    PCM16 = 0
+    MULAW = 1
+    ALAW = 2
+    FLOAT32 = 3
+    OPUS = 4
+    OGG_OPUS = 5
+    WEBM_OPUS = 6
+
+
+# Container handled by OpusStreamDecoder for each Opus codec
+_OPUS_CONTAINERS = {
+    Codec.OPUS: "raw",
+    Codec.OGG_OPUS: "ogg",
+    Codec.WEBM_OPUS: "webm",
+}
+
+
+class ResultKind(IntEnum):
+    """Kinds of result frames"""
+    PARTIAL = 0
+    FINAL = 1
+    ERROR = 2
+
+
+@dataclass(frozen=True)
+class AudioFrame:
+    """A parsed client audio frame"""
+    codec: Codec
+    flags: int
+    seq: int
+    timestamp_ms: int
+    payload: memoryview
+
+    @property
+    def end_of_stream(self) -> bool:
+        """Whether the client will send no more audio after this frame"""
+        return bool(self.flags & FLAG_END_OF_STREAM)
+
+
+def parse_audio_frame(data: bytes) -> AudioFrame:
+    """
+    Parse a binary audio frame
+
+    Args:
+        data: Raw WebSocket message
+
+    Returns:
+        AudioFrame: Header fields and a zero-copy view of the payload
+
+    Raises:
+        ValidationError: If the header is truncated or names an unknown version or codec
+    """
+    if len(data) < FRAME_HEADER.size:
+        raise ValidationError("Truncated audio frame header")
+    version, codec, flags, seq, timestamp_ms = FRAME_HEADER.unpack_from(data)
+    if version != FRAME_VERSION:
+        raise ValidationError(f"Unsupported frame version {version}")
+    try:
+        codec = Codec(codec)
+    except ValueError:
+        raise ValidationError(f"Unsupported audio codec {codec}")
+    return AudioFrame(codec, flags, seq, timestamp_ms, memoryview(data)[FRAME_HEADER.size:])
+
+
+def encode_audio_frame(payload: bytes, seq: int, timestamp_ms: int = 0,
+                       codec: Codec = Codec.PCM16, flags: int = 0) -> bytes:
+    """Build a binary audio frame (the client side of the protocol)"""
+    return FRAME_HEADER.pack(FRAME_VERSION, codec, flags, seq % _SEQ_MODULUS, timestamp_ms % _SEQ_MODULUS) + payload
+
+
+def encode_result_frame(kind: ResultKind, seq: int, timestamp_ms: int, text: str, offset: int = 0) -> bytes:
+    """
+    Build a binary result frame
+
+    Args:
+        kind: Partial, final or error
+        seq: Result sequence number
+        timestamp_ms: Timestamp of the latest audio frame received
+        text: Transcribed text, partial suffix or error message
+        offset: For partial results, characters kept from the previous partial
+
+    Returns:
+        bytes: Header followed by UTF-8 text
+    """
+    header = FRAME_HEADER.pack(FRAME_VERSION, kind, 0, seq % _SEQ_MODULUS, timestamp_ms % _SEQ_MODULUS)
+    if kind == ResultKind.PARTIAL:
+        header += PARTIAL_OFFSET.pack(offset)
+    return header + text.encode("utf-8")
+
+
+def parse_result_frame(data: bytes) -> Tuple[ResultKind, int, int, int, str]:
+    """Parse a binary result frame into (kind, seq, timestamp_ms, offset, text)"""
+    if len(data) < FRAME_HEADER.size:
+        raise ValidationError("Truncated result frame header")
+    version, kind, _, seq, timestamp_ms = FRAME_HEADER.unpack_from(data)
+    if version != FRAME_VERSION:
+        raise ValidationError(f"Unsupported frame version {version}")
+    kind, body, offset = ResultKind(kind), FRAME_HEADER.size, 0
+    if kind == ResultKind.PARTIAL:
+        offset, = PARTIAL_OFFSET.unpack_from(data, body)
+        body += PARTIAL_OFFSET.size
+    return kind, seq, timestamp_ms, offset, bytes(data[body:]).decode("utf-8")
+
+
+class FrameDecoder:
+    """
+    Orders audio frames and decodes their payloads to 16-bit PCM
+
+    Duplicate and stale frames (sequence numbers at or behind the last
+    accepted one) are dropped; forward gaps are counted but accepted,
+    since waiting for lost audio would stall the recognizer.
+    """
+
+    def __init__(self, sample_rate: int = 16000):
+        self.sample_rate = sample_rate
+        self.last_seq: int = -1
+        self.last_timestamp_ms = 0
+        self.frames = 0
+        self.dropped = 0
+        self.gaps = 0
+        self._scratch = ScratchBuffer(np.float32)
+        self._opus: Optional[OpusStreamDecoder] = None
+
+    def accept(self, frame: AudioFrame) -> bool:
+        """Record a frame's sequence number; False if it should be discarded"""
+        if self.last_seq >= 0:
+            ahead = (frame.seq - self.last_seq) % _SEQ_MODULUS
+            if ahead == 0 or ahead >= _SEQ_MODULUS // 2:
+                self.dropped += 1
+                return False
+            if ahead > 1:
+                self.gaps += 1
+        self.last_seq = frame.seq
+        self.last_timestamp_ms = frame.timestamp_ms
+        self.frames += 1
+        return True
+
+    def decode(self, frame: AudioFrame):
+        """
+        Get the frame's audio as little-endian 16-bit PCM
+
+        PCM16 payloads are returned as views of the frame; other codecs are
+        expanded into a new array, since decoding continues after the next
+        frame arrives. Opus frames may yield no audio until a packet completes.
+        """
+        payload = frame.payload
+        if frame.codec == Codec.PCM16:
+            return payload
+        if frame.codec in _OPUS_CONTAINERS:
+            if self._opus is None:
+                self._opus = OpusStreamDecoder(self.sample_rate, _OPUS_CONTAINERS[frame.codec])
+            return self._opus.feed(payload)
+        if frame.codec == Codec.FLOAT32:
+            count = len(payload) // 4
+            out = np.empty(count, dtype=np.int16)
+            return memoryview(decode_float32(payload, out, self._scratch.get(count))).cast("B")
+        out = np.empty(len(payload), dtype=np.int16)
+        decode = decode_mulaw if frame.codec == Codec.MULAW else decode_alaw
+        return memoryview(decode(payload, out)).cast("B")
+
+    def flush(self) -> bytes:
+        """Drain audio still buffered by a stream decoder at the end of the stream"""
+        return self._opus.flush() if self._opus is not None else b""
+
+    def stats(self) -> dict:
+        """Get frame counters for the stream"""
+        return {"frames": self.frames, "dropped": self.dropped, "gaps": self.gaps}
+
+
+@dataclass(frozen=True)
+class PartialUpdate:
+    """Change to apply to the client's current partial result"""
+    offset: int
+    text: str
+
+    def apply(self, previous: str) -> str:
+        """Reconstruct the full partial from the previous one"""
+        return previous[:self.offset] + self.text
+
+
+class PartialEmitter:
+    """
+    Coalesces partial results for one session
+
+    Unchanged partials are suppressed and changed ones are reduced to the
+    suffix that differs from the last partial sent. Partials arriving
+    faster than max_rate_hz are held back; since each partial carries the
+    whole hypothesis so far, only the latest is kept, and the caller sends
+    it with flush() once pending_delay() has passed, so a pause in speech
+    does not leave the client showing an out-of-date partial. Finals are
+    never throttled: the caller sends them directly and calls reset() so
+    the next utterance starts from an empty partial.
+    """
+
+    def __init__(self, max_rate_hz: float = 10.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the emitter
+
+        Args:
+            max_rate_hz: Maximum partial updates per second (0 for no limit)
+            clock: Monotonic time source in seconds
+        """
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self._clock = clock
+        self._sent = ""
+        self._sent_at: Optional[float] = None
+        self._pending: Optional[str] = None
+        self.received = 0
+        self.emitted = 0
+
+    def update(self, text: str) -> Optional[PartialUpdate]:
+        """
+        Offer the latest partial hypothesis
+
+        Returns:
+            PartialUpdate to send, or None if nothing should be sent now
+        """
+        self.received += 1
+        if text == self._sent:
+            self._pending = None
+            return None
+        now = self._clock()
+        if self._sent_at is not None and now - self._sent_at < self.min_interval:
+            self._pending = text
+            return None
+        return self._emit(text, now)
+
+    def pending_delay(self) -> Optional[float]:
+        """Seconds until the held-back partial may be sent (None if none is held back)"""
+        if self._pending is None:
+            return None
+        return max(0.0, self._sent_at + self.min_interval - self._clock())
+
+    def flush(self) -> Optional[PartialUpdate]:
+        """
+        Release the held-back partial, if any
+
+        Returns:
+            PartialUpdate to send, or None if nothing is held back
+        """
+        text, self._pending = self._pending, None
+        if text is None:
+            return None
+        return self._emit(text, self._clock())
+
+    def _emit(self, text: str, now: float) -> PartialUpdate:
+        self._pending = None
+        offset = 0
+        limit = min(len(text), len(self._sent))
+        while offset < limit and text[offset] == self._sent[offset]:
+            offset += 1
+        self._sent, self._sent_at = text, now
+        self.emitted += 1
+        return PartialUpdate(offset, text[offset:])
+
+    def reset(self) -> None:
+        """Start a new utterance after a final result; its first partial is sent immediately"""
+        self._sent = ""
+        self._sent_at = None
+        self._pending = None
+
+    def stats(self) -> dict:
+        """Get partial counters for the session"""
+        return {"received": self.received, "emitted": self.emitted}
@@ -0,0 +1,63 @@
+"""
+Lightweight in-process metrics
+"""
+import bisect
+import threading
+from typing import Any, Dict, Sequence
+
+# Default latency buckets in milliseconds
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Default LLM token count buckets
+TOKEN_BUCKETS = (128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of observed values
+
+    Buckets are cumulative upper bounds, as in Prometheus: a value is
+    counted in the first bucket it does not exceed, and values above the
+    last bound go to "+Inf". Safe to update from several threads.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        """
+        Initialize the histogram
+
+        Args:
+            buckets: Increasing upper bounds (default: LATENCY_BUCKETS_MS)
+        """
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record a value"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the count, sum, max and cumulative bucket counts"""
+        with self._lock:
+            counts = list(self._counts)
+            total, peak = self._sum, self._max
+        cumulative, buckets = 0, {}
+        for bound, count in zip(list(self.buckets) + ["+Inf"], counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": cumulative,
+            "sum": round(total, 3),
+            "max": round(peak, 3),
+            "buckets": buckets,
+        }
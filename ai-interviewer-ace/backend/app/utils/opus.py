@@ -0,0 +1,331 @@
+"""
+Streaming Opus decoding for browser-captured audio
+
+Browsers record Opus inside WebM (Chrome, Edge) or Ogg (Firefox) through
+MediaRecorder. The demuxers here pull Opus packets out of either container
+incrementally, as chunks arrive, and OpusStreamDecoder decodes them to
+mono 16-bit PCM at the recognizer's sample rate. Decoding uses PyAV, an
+optional dependency (`pip install av`).
+"""
+import struct
+import logging
+from typing import List, Optional
+
+from app.utils.errors import ValidationError
+
+try:
+    import av
+except ImportError:  # pragma: no cover - optional dependency
+    av = None
+
+# Set up logging
+logger = logging.getLogger("hiregage.audio.opus")
+
+# Opus always decodes at 48 kHz
+OPUS_SAMPLE_RATE = 48000
+
+# Supported containers
+CONTAINERS = ("ogg", "webm", "raw")
+
+_OGG_CAPTURE = b"OggS"
+_OGG_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+
+_EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+_EBML_UNKNOWN_SIZE = object()
+
+# Matroska element IDs. Master elements on the path to audio blocks are
+# entered rather than skipped; everything else we do not need is skipped.
+_SEGMENT = 0x18538067
+_CLUSTER = 0x1F43B675
+_TRACKS = 0x1654AE6B
+_TRACK_ENTRY = 0xAE
+_BLOCK_GROUP = 0xA0
+_TRACK_NUMBER = 0xD7
+_CODEC_ID = 0x86
+_CODEC_PRIVATE = 0x63A2
+_SIMPLE_BLOCK = 0xA3
+_BLOCK = 0xA1
+
+_MASTER_IDS = {_SEGMENT, _CLUSTER, _TRACKS, _TRACK_ENTRY, _BLOCK_GROUP}
+_LEAF_IDS = {_TRACK_NUMBER, _CODEC_ID, _CODEC_PRIVATE, _SIMPLE_BLOCK, _BLOCK}
+
+
+def detect_container(data: bytes) -> Optional[str]:
+    """Identify the container from the first bytes of a stream, if possible"""
+    if data[:4] == _OGG_CAPTURE:
+        return "ogg"
+    if data[:4] == _EBML_MAGIC:
+        return "webm"
+    return None
+
+
+class OggOpusDemuxer:
+    """
+    Incremental Ogg demuxer for the first logical Opus stream
+
+    Pages are parsed as soon as they are complete, and packets spanning
+    pages are reassembled. The OpusHead packet is kept as decoder
+    configuration and OpusTags is discarded.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._packet = bytearray()
+        self._serial: Optional[int] = None
+        self._headers_seen = 0
+        self.opus_head: Optional[bytes] = None
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Add stream bytes and get the Opus packets they complete
+
+        Raises:
+            ValidationError: If the data is not an Ogg stream
+        """
+        self._buffer += data
+        packets: List[bytes] = []
+        offset = 0
+        buffer = self._buffer
+
+        while len(buffer) - offset >= _OGG_PAGE_HEADER.size:
+            capture, _, _, _, serial, _, _, segment_count = _OGG_PAGE_HEADER.unpack_from(buffer, offset)
+            if capture != _OGG_CAPTURE:
+                raise ValidationError("Corrupt Ogg stream (bad capture pattern)")
+            table_start = offset + _OGG_PAGE_HEADER.size
+            if len(buffer) < table_start + segment_count:
+                break
+            lacing = buffer[table_start:table_start + segment_count]
+            body = table_start + segment_count
+            if len(buffer) < body + sum(lacing):
+                break
+
+            if self._serial is None:
+                self._serial = serial
+            if serial == self._serial:
+                for size in lacing:
+                    self._packet += buffer[body:body + size]
+                    body += size
+                    # A lacing value below 255 terminates the packet
+                    if size < 255:
+                        self._emit(bytes(self._packet), packets)
+                        self._packet.clear()
+            else:
+                body += sum(lacing)
+            offset = body
+
+        del buffer[:offset]
+        return packets
+
+    def _emit(self, packet: bytes, packets: List[bytes]) -> None:
+        if self._headers_seen < 2:
+            self._headers_seen += 1
+            if packet.startswith(b"OpusHead"):
+                self.opus_head = packet
+            elif not packet.startswith(b"OpusTags"):
+                raise ValidationError("Ogg stream does not carry Opus audio")
+            return
+        packets.append(packet)
+
+
+def _read_vint(buffer, offset: int, keep_marker: bool):
+    """Read an EBML variable-length integer; returns (value, length) or None if incomplete"""
+    if offset >= len(buffer):
+        return None
+    first = buffer[offset]
+    if not first:
+        raise ValidationError("Corrupt WebM stream (invalid EBML length)")
+    length = 8 - first.bit_length() + 1
+    if offset + length > len(buffer):
+        return None
+    value = first if keep_marker else first & (0xFF >> length)
+    all_ones = value == (0xFF >> length)
+    for byte in buffer[offset + 1:offset + length]:
+        value = (value << 8) | byte
+        all_ones = all_ones and byte == 0xFF
+    if all_ones and not keep_marker:
+        return _EBML_UNKNOWN_SIZE, length
+    return value, length
+
+
+class WebMOpusDemuxer:
+    """
+    Incremental WebM/Matroska demuxer for the Opus audio track
+
+    MediaRecorder writes live WebM with unknown-size Segment and Cluster
+    elements, so master elements are entered without tracking their
+    extent; the elements we need have IDs that are unique to their parent.
+    Blocks are parsed as soon as they are complete and everything else
+    (cues, metadata, video) is skipped without being buffered.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._skip = 0
+        self._entry: dict = {}
+        self.track: Optional[int] = None
+        self.opus_head: Optional[bytes] = None
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Add stream bytes and get the Opus packets they complete
+
+        Raises:
+            ValidationError: If the stream is malformed or uses unsupported block lacing
+        """
+        self._buffer += data
+        packets: List[bytes] = []
+        buffer = self._buffer
+        offset = 0
+
+        while True:
+            if self._skip:
+                skipped = min(self._skip, len(buffer) - offset)
+                self._skip -= skipped
+                offset += skipped
+                if self._skip:
+                    break
+
+            element_id = _read_vint(buffer, offset, keep_marker=True)
+            if element_id is None:
+                break
+            size = _read_vint(buffer, offset + element_id[1], keep_marker=False)
+            if size is None:
+                break
+            element_id, size, body = element_id[0], size[0], offset + element_id[1] + size[1]
+
+            if element_id in _MASTER_IDS:
+                if element_id == _TRACK_ENTRY:
+                    self._entry = {}
+                offset = body
+                continue
+            if size is _EBML_UNKNOWN_SIZE:
+                raise ValidationError("Corrupt WebM stream (unknown-size leaf element)")
+            if element_id not in _LEAF_IDS:
+                offset = body
+                self._skip = size
+                continue
+            if len(buffer) < body + size:
+                break
+
+            self._handle(element_id, bytes(buffer[body:body + size]), packets)
+            offset = body + size
+
+        del buffer[:offset]
+        return packets
+
+    def _handle(self, element_id: int, payload: bytes, packets: List[bytes]) -> None:
+        if element_id in (_SIMPLE_BLOCK, _BLOCK):
+            track, length = _read_vint(payload, 0, keep_marker=False)
+            if track != self.track:
+                return
+            flags = payload[length + 2]
+            if flags & 0x06:
+                raise ValidationError("Laced WebM blocks are not supported")
+            packets.append(payload[length + 3:])
+            return
+
+        if element_id == _TRACK_NUMBER:
+            self._entry["number"] = int.from_bytes(payload, "big")
+        elif element_id == _CODEC_ID:
+            self._entry["codec"] = payload.rstrip(b"\x00").decode("ascii", "replace")
+        elif element_id == _CODEC_PRIVATE:
+            self._entry["private"] = payload
+
+        if self.track is None and self._entry.get("codec") == "A_OPUS" and "number" in self._entry:
+            self.track = self._entry["number"]
+        if self._entry.get("number") == self.track and "private" in self._entry:
+            self.opus_head = self._entry["private"]
+
+
+class OpusStreamDecoder:
+    """
+    Decodes a stream of Opus audio to mono 16-bit PCM incrementally
+
+    Accepts either container bytes in arbitrary chunks (MediaRecorder
+    timeslices) or raw Opus packets, one per feed() call. Output is
+    resampled to sample_rate for the recognizer.
+    """
+
+    def __init__(self, sample_rate: int = 16000, container: Optional[str] = None):
+        """
+        Initialize the decoder
+
+        Args:
+            sample_rate: Output sample rate in Hz (default: 16000)
+            container: "ogg", "webm" or "raw" packets; detected from the first
+                chunk when omitted
+
+        Raises:
+            ValidationError: If PyAV is not installed or the container is unknown
+        """
+        if av is None:
+            raise ValidationError("Opus decoding requires PyAV (pip install av)")
+        if container is not None and container not in CONTAINERS:
+            raise ValidationError(f"Unsupported audio container: {container}")
+
+        self.sample_rate = sample_rate
+        self.container = container
+        self._demuxer = None
+        self._codec = None
+        self._resampler = av.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+        self.packets = 0
+
+    def _open_demuxer(self, data: bytes) -> None:
+        if self.container is None:
+            self.container = detect_container(data)
+            if self.container is None:
+                raise ValidationError("Unrecognized audio stream (expected Ogg or WebM)")
+        if self.container == "ogg":
+            self._demuxer = OggOpusDemuxer()
+        elif self.container == "webm":
+            self._demuxer = WebMOpusDemuxer()
+
+    def _open_codec(self) -> None:
+        self._codec = av.CodecContext.create("opus", "r")
+        self._codec.sample_rate = OPUS_SAMPLE_RATE
+        head = self._demuxer.opus_head if self._demuxer is not None else None
+        if head:
+            # OpusHead carries the channel count and pre-skip
+            self._codec.extradata = head
+            self._codec.layout = "stereo" if head[9] == 2 else "mono"
+        else:
+            self._codec.layout = "mono"
+
+    def feed(self, data: bytes) -> bytes:
+        """
+        Decode the next chunk of the stream
+
+        Args:
+            data: Container bytes, or one raw Opus packet
+
+        Returns:
+            bytes: Little-endian 16-bit mono PCM at sample_rate (may be empty)
+        """
+        if not data:
+            return b""
+        if self._demuxer is None and self.container != "raw":
+            self._open_demuxer(data)
+        packets = self._demuxer.feed(data) if self._demuxer is not None else [bytes(data)]
+        return self._decode(packets)
+
+    def flush(self) -> bytes:
+        """Drain audio buffered in the resampler at the end of the stream"""
+        return b"".join(frame.to_ndarray().tobytes() for frame in self._resampler.resample(None))
+
+    def _decode(self, packets: List[bytes]) -> bytes:
+        if not packets:
+            return b""
+        if self._codec is None:
+            self._open_codec()
+
+        pcm = []
+        for packet in packets:
+            self.packets += 1
+            try:
+                frames = self._codec.decode(av.Packet(packet))
+            except av.AVError as e:
+                raise ValidationError(f"Invalid Opus packet: {e}")
+            for frame in frames:
+                for resampled in self._resampler.resample(frame):
+                    pcm.append(resampled.to_ndarray().tobytes())
+        return b"".join(pcm)
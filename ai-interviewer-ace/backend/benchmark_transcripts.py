@@ -0,0 +1,156 @@
+"""
+Benchmark for concurrent transcript saves.
+Runs many interview sessions saving at once and reports save latency
+percentiles and how long the event loop was blocked.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services.transcript_log import TranscriptLog
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("hiregage-benchmark")
+
+
+class LegacyStorage:
+    """The original save path: read, append and rewrite the session's JSON file on the loop"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    async def append(self, session_id, entry):
+        path = self.directory / f"{session_id}.json"
+        data = []
+        if path.exists():
+            with open(path, "r") as f:
+                data = json.load(f)
+        data.append(entry)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    async def close(self):
+        pass
+
+
+async def probe_loop(stop: asyncio.Event, interval: float, lags: list):
+    """Record how late the loop wakes a coroutine sleeping for interval seconds"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run_session(storage, session_id: str, saves: int, pause: float, latencies: list):
+    """Save one answer after another, as a live interview does"""
+    for i in range(saves):
+        entry = {
+            "text": f"Answer {i} " + "lorem ipsum " * 20,
+            "speaker": "candidate" if i % 2 else "AI",
+            "timestamp": f"2025-05-01T10:{i // 60:02d}:{i % 60:02d}",
+        }
+        start = time.perf_counter()
+        await storage.append(session_id, entry)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(pause)
+
+
+async def benchmark(args, directory: str):
+    if args.storage == "log":
+        storage = TranscriptLog(directory, fsync_interval=args.fsync_interval)
+    else:
+        storage = LegacyStorage(directory)
+
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop(stop, 0.001, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(storage, f"session-{n}", args.saves, args.pause, latencies)
+        for n in range(args.sessions)
+    ))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    await storage.close()
+    return np.array(latencies) * 1000, np.array(lags) * 1000, elapsed
+
+
+def main():
+    """Run the benchmark and print the results"""
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description="Measure transcript save latency under concurrency")
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=50,
+        help="Number of concurrent sessions (default: 50)",
+    )
+    parser.add_argument(
+        "--saves",
+        type=int,
+        default=200,
+        help="Saves per session (default: 200)",
+    )
+    parser.add_argument(
+        "--pause",
+        type=float,
+        default=0.0,
+        help="Seconds each session waits between saves (default: 0)",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=["log", "legacy"],
+        default="log",
+        help="Storage to benchmark: the async transcript log or the legacy JSON rewrite (default: log)",
+    )
+    parser.add_argument(
+        "--fsync-interval",
+        type=float,
+        default=0.05,
+        help="Seconds the log collects appends into one fsync (default: 0.05)",
+    )
+    parser.add_argument(
+        "--dir",
+        type=str,
+        default=None,
+        help="Directory to write transcripts to (default: a temporary directory)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        latencies, lags, elapsed = asyncio.run(benchmark(args, args.dir or tmp))
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(json.dumps({
+        "storage": args.storage,
+        "sessions": args.sessions,
+        "saves": len(latencies),
+        "saves_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2),
+            "p99": round(float(p99), 2),
+            "max": round(float(latencies.max()), 2),
+        },
+        "loop_lag_ms": {
+            "p99": round(float(np.percentile(lags, 99)), 2) if len(lags) else None,
+            "max": round(float(lags.max()), 2) if len(lags) else None,
+        },
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Analytics export job.
+Writes interviews, messages and evaluation scores from the database to
+Parquet (or Arrow IPC) files for dashboards to scan.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from app.config import get_settings
+from app.models.database import SessionLocal, engine
+from app.services.analytics_export import FORMATS, AnalyticsExporter
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("hiregage-export")
+
+
+async def run(args) -> dict:
+    exporter = AnalyticsExporter(SessionLocal, batch_rows=args.batch_rows)
+    try:
+        return await exporter.export_to(args.output, args.format)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    """Export the analytics tables"""
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description="Export interview analytics to columnar files")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="analytics_export",
+        help="Directory to write the files to (default: analytics_export)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(FORMATS),
+        default="parquet",
+        help="Output format (default: parquet)",
+    )
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=get_settings().ANALYTICS_EXPORT_BATCH_ROWS,
+        help="Rows read and written per batch",
+    )
+    args = parser.parse_args()
+
+    if SessionLocal is None:
+        logger.error("DATABASE_URL is not configured")
+        return 1
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -46,6 +46,8 @@ def main():
     reload_enabled = args.env == "dev"
     workers = 1 if args.env == "dev" else (os.cpu_count() or 1) * 2 + 1
     log_level = "info" if args.env == "prod" else "debug"
+    # Workers read this to report pool sizing on /system/metrics
+    os.environ["HIREGAGE_WORKERS"] = str(workers)
     
     # Log configuration
     logger.info(f"Starting HireGage API server in {args.env} mode")
@@ -53,6 +55,9 @@ def main():
     logger.info(f"Port: {args.port}")
     logger.info(f"Workers: {workers}")
     logger.info(f"Reload enabled: {reload_enabled}")
+    if os.getenv("DATABASE_URL"):
+        per_worker = int(os.getenv("DATABASE_POOL_SIZE", 5)) + int(os.getenv("DATABASE_MAX_OVERFLOW", 10))
+        logger.info(f"Database connections: up to {workers * per_worker} ({workers} workers x {per_worker})")
     
     # Run the server
     uvicorn.run(
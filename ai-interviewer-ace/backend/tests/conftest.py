@@ -0,0 +1,26 @@
+"""
+Shared fixtures for the backend tests
+"""
+import asyncio
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import get_settings
+from app.models.database import init_db
+
+
+@pytest.fixture(autouse=True)
+def agent_checkpoints(tmp_path, monkeypatch):
+    # Keep agent checkpoints, if a test opens them, out of the working directory
+    monkeypatch.setattr(get_settings(), "AGENT_CHECKPOINT_PATH", str(tmp_path / "checkpoints.sqlite"))
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    pytest.importorskip("aiosqlite")
+    # No pooling: each test step runs on its own event loop
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'sessions.db'}", poolclass=NullPool)
+    asyncio.run(init_db(engine))
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
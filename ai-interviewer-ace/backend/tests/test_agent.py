@@ -0,0 +1,297 @@
+"""
+Test cases for the interview agent graph (with a stand-in LLM)
+"""
+import asyncio
+import json
+import pytest
+
+pytest.importorskip("langgraph.checkpoint.sqlite")
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from app.Agent import index
+from app.Agent.checkpointer import EvictingSqliteSaver
+from app.routers import interviews
+from app.schemas import CandidateResponse
+from app.services.session_store import DatabaseSessionStore, MemorySessionStore
+from app.utils.concurrency import ConcurrencyLimiter
+from app.utils.errors import CapacityError
+from app.utils.metrics import TOKEN_BUCKETS, Histogram
+
+
+class CountingLLM:
+    """Replies with the number of messages it was sent and reports usage"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def ainvoke(self, messages):
+        self.calls.append(messages)
+        return AIMessage(
+            content=f"seen {len(messages)}",
+            usage_metadata={"input_tokens": 10 * len(messages), "output_tokens": 5, "total_tokens": 10 * len(messages) + 5}
+        )
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    llm = CountingLLM()
+    monkeypatch.setattr(index, "llm_with_tools", llm)
+    monkeypatch.setattr(index, "prompt_tokens", Histogram(buckets=TOKEN_BUCKETS))
+    monkeypatch.setattr(index, "completion_tokens", Histogram(buckets=TOKEN_BUCKETS))
+    saver = EvictingSqliteSaver.from_path(str(tmp_path / "agent.sqlite"))
+    monkeypatch.setattr(index, "graph", index.graph_builder.compile(checkpointer=saver))
+    return llm
+
+
+def test_graph_opens_its_checkpoints_on_first_use(tmp_path, monkeypatch):
+    """Importing the agent opens nothing; the first use opens AGENT_CHECKPOINT_PATH"""
+    path = tmp_path / "threads.sqlite"
+    monkeypatch.setattr(index.settings, "AGENT_CHECKPOINT_PATH", str(path))
+    monkeypatch.setattr(index, "graph", None)
+    assert not path.exists()
+
+    graph = index.get_graph()
+    assert path.exists()
+    assert index.get_graph() is graph
+
+
+def test_prompt_is_seeded_once_per_thread(agent):
+    """Only the first turn carries the system prompt and job context"""
+    asyncio.run(index.stream_graph_updates("s1", job_title="Data Engineer", job_description="Pipelines"))
+    asyncio.run(index.stream_graph_updates("s1", "I build pipelines"))
+    reply = asyncio.run(index.stream_graph_updates("s1", "Mostly Spark"))
+
+    # system + job context + AI, then one user and one AI message per turn
+    assert reply == "seen 6"
+    history = agent.calls[-1]
+    assert [m.type for m in history].count("system") == 1
+    assert "Job Title: Data Engineer" in history[1].content
+
+    asyncio.run(index.stream_graph_updates("s2"))
+    assert agent.calls[-1][1].content == index.DEFAULT_JOB_CONTEXT
+
+
+def test_prompt_tokens_are_recorded_per_call(agent):
+    """Usage from each LLM call feeds the token histograms"""
+    asyncio.run(index.stream_graph_updates("s1"))
+    asyncio.run(index.stream_graph_updates("s1", "hello"))
+
+    usage = index.agent_metrics()
+    assert usage["prompt_tokens"]["count"] == 2
+    assert usage["prompt_tokens"]["sum"] == 20 + 40
+    assert usage["completion_tokens"]["sum"] == 10
+
+
+REPLY = "Welcome to the interview. Tell me about yourself?"
+
+
+@pytest.fixture
+def streaming_agent(tmp_path, monkeypatch):
+    # A real chat model that streams its canned reply word by word
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content=REPLY)] * 3))
+    monkeypatch.setattr(index, "llm_with_tools", llm)
+    monkeypatch.setattr(index, "first_token_latency", Histogram())
+    saver = EvictingSqliteSaver.from_path(str(tmp_path / "agent.sqlite"))
+    monkeypatch.setattr(index, "graph", index.graph_builder.compile(checkpointer=saver))
+
+
+def test_reply_streams_token_by_token(streaming_agent):
+    """Tokens arrive separately and add up to the reply"""
+    async def collect(text=""):
+        return [token async for token in index.astream_tokens("s1", text)]
+
+    tokens = asyncio.run(collect())
+    assert len(tokens) > 1
+    assert "".join(tokens) == REPLY
+    assert index.agent_metrics()["first_token_ms"]["count"] == 1
+    assert "".join(asyncio.run(collect("I am a developer"))) == REPLY
+
+
+def test_llm_calls_share_a_bounded_pool_of_slots(agent, monkeypatch):
+    """Concurrent turns queue for the LLM without blocking the event loop"""
+    monkeypatch.setattr(index, "llm_slots", ConcurrencyLimiter(1))
+    overlap = {"active": 0, "peak": 0}
+
+    async def slow_ainvoke(messages):
+        overlap["active"] += 1
+        overlap["peak"] = max(overlap["peak"], overlap["active"])
+        await asyncio.sleep(0.05)
+        overlap["active"] -= 1
+        return AIMessage(content="ok")
+
+    monkeypatch.setattr(agent, "ainvoke", slow_ainvoke)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        clock = asyncio.create_task(ticker())
+        replies = await asyncio.gather(*(index.stream_graph_updates(f"s{i}") for i in range(3)))
+        clock.cancel()
+        return replies, ticks
+
+    replies, ticks = asyncio.run(run())
+    assert replies == ["ok"] * 3
+    assert overlap["peak"] == 1
+    assert ticks >= 5
+    stats = index.agent_metrics()["llm_slots"]
+    assert stats["peak_waiting"] == 2 and stats["wait_ms"]["count"] == 3
+
+
+def test_respond_streams_server_sent_events(streaming_agent, monkeypatch):
+    """The respond endpoint streams tokens as SSE and records the reply"""
+    store = MemorySessionStore()
+    monkeypatch.setattr(interviews, "interview_sessions", store)
+    asyncio.run(store.set("s1", {"job_title": "Engineer", "transcript": []}))
+    app = FastAPI()
+    app.include_router(interviews.router)
+
+    response = TestClient(app).post(
+        "/interview/s1/respond",
+        json={"text": "Hello", "is_final": True},
+        headers={"Accept": "text/event-stream"}
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+        for block in response.text.strip().split("\n\n")
+    ]
+    assert [name for name, _ in events[:-1]] == ["token"] * (len(events) - 1)
+    assert "".join(data["text"] for _, data in events[:-1]) == REPLY
+    assert events[-1] == ("done", {"text": REPLY})
+    transcript = asyncio.run(store.get("s1"))["transcript"]
+    assert [(m["role"], m["content"]) for m in transcript] == [("candidate", "Hello"), ("agent", REPLY)]
+
+
+def test_streamed_reply_keeps_the_answer_and_concurrent_updates(streaming_agent, session_factory, monkeypatch):
+    """The answer is saved before streaming, and the reply does not overwrite later updates"""
+    store = DatabaseSessionStore(session_factory)
+    monkeypatch.setattr(interviews, "interview_sessions", store)
+    sse = Request({"type": "http", "headers": [(b"accept", b"text/event-stream")]})
+
+    async def run():
+        for session_id in ("left", "stayed"):
+            await store.set(session_id, {"job_title": "Engineer", "transcript": []})
+
+        # The client goes away after the first token
+        response = await interviews.process_candidate_response("left", CandidateResponse(text="Hi", is_final=True), sse)
+        await response.body_iterator.__anext__()
+        await response.body_iterator.aclose()
+
+        # Another worker saves an interim update while the reply streams
+        response = await interviews.process_candidate_response("stayed", CandidateResponse(text="Hi", is_final=True), sse)
+        await response.body_iterator.__anext__()
+        await interviews.process_candidate_response("stayed", CandidateResponse(text="More"), sse)
+        async for _ in response.body_iterator:
+            pass
+
+        return [[m["content"] for m in (await store.get(sid))["transcript"]] for sid in ("left", "stayed")]
+
+    left, stayed = asyncio.run(run())
+    assert left == ["Hi"]
+    assert stayed == ["Hi", "More", REPLY]
+
+
+def receive_turn(ws):
+    # Collect text messages up to the end of a turn, skipping synthesized audio
+    messages = []
+    while not messages or messages[-1]["type"] == "token":
+        message = ws.receive()
+        if message.get("text") is not None:
+            messages.append(json.loads(message["text"]))
+    return messages
+
+
+@pytest.fixture
+def interview_socket(monkeypatch):
+    store = MemorySessionStore()
+    monkeypatch.setattr(interviews, "interview_sessions", store)
+    monkeypatch.setattr(interviews, "text_to_opus_google", lambda text: b"OggS")
+    asyncio.run(store.set("s1", {"job_title": "Engineer", "transcript": []}))
+    app = FastAPI()
+    app.include_router(interviews.router)
+    return TestClient(app), store
+
+
+def test_interview_socket_records_both_sides(streaming_agent, interview_socket):
+    """Replies and answers over the socket are appended to the session transcript"""
+    client, store = interview_socket
+    with client.websocket_connect("/interview/ws/s1") as ws:
+        opening = receive_turn(ws)
+        ws.send_text("I am a developer")
+        reply = receive_turn(ws)
+
+    assert opening[-1] == reply[-1] == {"type": "done", "text": REPLY}
+    transcript = asyncio.run(store.get("s1"))["transcript"]
+    assert [(m["role"], m["content"]) for m in transcript] == [
+        ("agent", REPLY), ("candidate", "I am a developer"), ("agent", REPLY)
+    ]
+
+
+def test_interview_socket_reports_failed_turns(interview_socket, monkeypatch):
+    """A turn the agent cannot serve is sent as an error and the socket stays open"""
+    client, store = interview_socket
+
+    async def busy(session_id, text, **kwargs):
+        raise CapacityError("All 1 LLM slots are in use")
+        yield
+
+    monkeypatch.setattr(interviews, "astream_tokens", busy)
+    with client.websocket_connect("/interview/ws/s1") as ws:
+        first = receive_turn(ws)
+        ws.send_text("Hello?")
+        second = receive_turn(ws)
+
+    assert first == second == [{"type": "error", "message": "Failed to process response: Capacity error: All 1 LLM slots are in use"}]
+    transcript = asyncio.run(store.get("s1"))["transcript"]
+    assert [(m["role"], m["content"]) for m in transcript] == [("candidate", "Hello?")]
+
+
+def test_complete_sentences_keeps_unfinished_text():
+    """Only sentences followed by whitespace are complete"""
+    assert interviews._complete_sentences("Hi there. How are") == (["Hi there."], "How are")
+    assert interviews._complete_sentences("Done?") == ([], "Done?")
+
+
+class FakeSummarizer:
+    """Summarizes by counting the conversation lines it was asked to fold"""
+
+    def __init__(self):
+        self.requests = []
+
+    async def ainvoke(self, messages):
+        self.requests.append(messages)
+        return AIMessage(content=f"summary {len(self.requests)}")
+
+
+def test_old_turns_are_folded_into_a_summary(agent, monkeypatch):
+    """Long threads keep the prompt, a summary and only the recent turns"""
+    summarizer = FakeSummarizer()
+    monkeypatch.setattr(index, "llm", summarizer)
+    monkeypatch.setattr(index.settings, "AGENT_CONTEXT_KEEP_TURNS", 2)
+
+    for turn in range(10):
+        asyncio.run(index.stream_graph_updates("s1", f"answer {turn}" if turn else ""))
+
+    state = asyncio.run(index.graph.aget_state(index.thread_config("s1"))).values
+    assert state["summary"] == f"summary {len(summarizer.requests)}"
+    assert len(summarizer.requests) == 4
+    # The prompt, then the last two turns of candidate answer and reply
+    assert [m.id for m in state["messages"][:2]] == ["seed-system", "seed-job"]
+    assert [m.content for m in state["messages"][2:] if m.type == "human"] == ["answer 8", "answer 9"]
+    # The LLM saw the prompt, the summary and the recent turns, not the whole interview
+    prompt = agent.calls[-1]
+    assert prompt[2].content.endswith(state["summary"])
+    # The summary message was added to it, and the reply followed it
+    assert len(prompt) == len(state["messages"])
+    assert index.agent_metrics()["context"]["summaries"] >= 4
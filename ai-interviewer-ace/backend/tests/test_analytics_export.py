@@ -0,0 +1,110 @@
+"""
+Test cases for the columnar analytics export
+"""
+import asyncio
+import datetime
+import io
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.models.database import init_db
+from app.routers import analytics
+from app.services.analytics_export import AnalyticsExporter, flatten_scores
+from app.services.interview_repository import InterviewRepository
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'analytics.db'}", poolclass=NullPool)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    repository = InterviewRepository(factory)
+
+    async def seed():
+        await init_db(engine)
+        for n in range(5):
+            await repository.create_interview(f"i{n}", "Engineer", company_name="Acme")
+            await repository.add_messages(f"i{n}", [
+                {"role": "agent", "content": f"Q{n}", "timestamp": datetime.datetime(2025, 5, 1, 10, n)},
+                {"role": "candidate", "content": f"A{n}", "timestamp": datetime.datetime(2025, 5, 1, 10, n, 30)},
+            ])
+            if n % 2 == 0:
+                await repository.save_evaluation(
+                    f"i{n}", summary={"strengths": ["APIs"]}, scores={"overall": n, "skills": {"python": 4, "note": "ok"}}
+                )
+
+    asyncio.run(seed())
+    yield factory
+    asyncio.run(engine.dispose())
+
+
+def collect(stream):
+    async def run():
+        return [chunk async for chunk in stream]
+    return asyncio.run(run())
+
+
+def test_flatten_scores_uses_dotted_metrics():
+    """Nested scores become dotted metrics; non-numbers keep their JSON text"""
+    assert list(flatten_scores({"overall": 7, "skills": {"python": 4.5, "notes": ["a"]}, "pass": True})) == [
+        ("overall", 7.0, None), ("skills.python", 4.5, None), ("skills.notes", None, '["a"]'), ("pass", None, "true")
+    ]
+
+
+def test_parquet_export_streams_in_batches(session_factory):
+    """Tables are written a batch at a time and read back intact"""
+    exporter = AnalyticsExporter(session_factory, batch_rows=3)
+
+    chunks = collect(exporter.stream("messages"))
+    messages = pq.read_table(io.BytesIO(b"".join(chunks)))
+    assert len(chunks) > 2
+    assert messages.num_rows == 10
+    assert pq.ParquetFile(io.BytesIO(b"".join(chunks))).num_row_groups == 4
+    assert messages.column("content").to_pylist()[:2] == ["Q0", "A0"]
+
+    interviews = pq.read_table(io.BytesIO(b"".join(collect(exporter.stream("interviews"))))).to_pylist()
+    assert [row["id"] for row in interviews] == ["i0", "i1", "i2", "i3", "i4"]
+    assert interviews[0]["summary_json"] == '{"strengths": ["APIs"]}' and interviews[0]["completed"]
+    assert interviews[1]["summary_json"] is None and interviews[1]["evaluated_at"] is None
+
+
+def test_arrow_export_flattens_scores(session_factory):
+    """Scores export as a long table in the Arrow IPC stream format"""
+    exporter = AnalyticsExporter(session_factory, batch_rows=2)
+    table = pa.ipc.open_stream(b"".join(collect(exporter.stream("scores", "arrow")))).read_all()
+
+    rows = {(r["interview_id"], r["metric"]): (r["score"], r["value"]) for r in table.to_pylist()}
+    assert len(rows) == 9
+    assert rows[("i4", "overall")] == (4.0, None)
+    assert rows[("i2", "skills.note")] == (None, "ok")
+
+
+def test_export_job_writes_every_table(session_factory, tmp_path):
+    """export_to writes one file per table"""
+    results = asyncio.run(AnalyticsExporter(session_factory).export_to(str(tmp_path / "out")))
+
+    assert set(results) == {"interviews", "messages", "scores"}
+    assert pq.read_table(results["scores"]["path"]).num_rows == 9
+
+
+def test_export_endpoint(session_factory, monkeypatch):
+    """The endpoint streams a file and rejects unknown tables"""
+    monkeypatch.setattr(analytics, "SessionLocal", session_factory)
+    app = FastAPI()
+    app.include_router(analytics.router)
+    client = TestClient(app)
+
+    response = client.get("/analytics/export/interviews")
+    assert response.status_code == 200
+    assert 'filename="interviews.parquet"' in response.headers["content-disposition"]
+    assert pq.read_table(io.BytesIO(response.content)).num_rows == 5
+    assert client.get("/analytics/export/secrets").status_code == 404
+
+    monkeypatch.setattr(analytics, "SessionLocal", None)
+    assert client.get("/analytics/export/interviews").status_code == 503
@@ -0,0 +1,132 @@
+"""
+Test cases for WAV ingestion and resampling
+"""
+import struct
+import numpy as np
+import pytest
+
+from app.utils.audio import (
+    WAVE_FORMAT_EXTENSIBLE,
+    WAVE_FORMAT_IEEE_FLOAT,
+    WAVE_FORMAT_MULAW,
+    WAVE_FORMAT_PCM,
+    Resampler,
+    WavReader,
+    parse_wav_header,
+)
+from app.utils.dsp import MULAW_TABLE
+from app.utils.errors import ValidationError
+
+
+def build_wav(payload, sample_rate, channels, bits, audio_format=WAVE_FORMAT_PCM, extra_chunk=b""):
+    """Assemble a WAV file around an already-encoded payload"""
+    block_align = channels * bits // 8
+    fmt = struct.pack("<HHIIHH", audio_format, channels, sample_rate,
+                      sample_rate * block_align, block_align, bits)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + extra_chunk
+    body += b"data" + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def tone(frequency, seconds, sample_rate):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def dominant_frequency(pcm_bytes, sample_rate):
+    samples = np.frombuffer(pcm_bytes, dtype="<i2").astype(np.float32)
+    spectrum = np.abs(np.fft.rfft(samples))
+    return np.argmax(spectrum) * sample_rate / len(samples)
+
+
+def read_all(path, sample_rate=16000):
+    with WavReader(str(path)) as reader:
+        return b"".join(reader.iter_pcm16(sample_rate, block_seconds=0.25))
+
+
+def test_passthrough_skips_header(tmp_path):
+    """16 kHz mono int16 payloads are passed through without the RIFF header"""
+    pcm = (tone(440, 0.5, 16000) * 32767).astype("<i2").tobytes()
+    path = tmp_path / "mono.wav"
+    path.write_bytes(build_wav(pcm, 16000, 1, 16, extra_chunk=b"LIST\x03\x00\x00\x00abc\x00"))
+
+    assert read_all(path) == pcm
+
+
+def test_stereo_float_48k_is_downmixed_and_resampled(tmp_path):
+    """48 kHz stereo float input becomes 16 kHz mono with the tone preserved"""
+    left = tone(440, 1.0, 48000)
+    stereo = np.stack([left, left], axis=1).astype("<f4")
+    path = tmp_path / "stereo.wav"
+    path.write_bytes(build_wav(stereo.tobytes(), 48000, 2, 32, WAVE_FORMAT_IEEE_FLOAT))
+
+    pcm = read_all(path)
+    assert abs(len(pcm) // 2 - 16000) <= 2
+    assert dominant_frequency(pcm, 16000) == pytest.approx(440, abs=2)
+
+
+def test_telephony_8k_is_upsampled(tmp_path):
+    """8 kHz telephony audio is upsampled to the recognizer rate"""
+    pcm = (tone(300, 1.0, 8000) * 32767).astype("<i2").tobytes()
+    path = tmp_path / "phone.wav"
+    path.write_bytes(build_wav(pcm, 8000, 1, 16))
+
+    out = read_all(path)
+    assert abs(len(out) // 2 - 16000) <= 2
+    assert dominant_frequency(out, 16000) == pytest.approx(300, abs=2)
+
+
+def test_24bit_and_extensible_headers(tmp_path):
+    """WAVE_FORMAT_EXTENSIBLE 24-bit files decode to the same samples"""
+    samples = np.array([0, 4194304, -4194304, 8388607], dtype=np.int32)
+    payload = b"".join(int(s).to_bytes(3, "little", signed=True) for s in samples)
+    fmt = struct.pack("<HHIIHHHHI", WAVE_FORMAT_EXTENSIBLE, 1, 16000, 48000, 3, 24, 22, 24, 4)
+    fmt += struct.pack("<H", WAVE_FORMAT_PCM) + b"\x00" * 14
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    body += b"data" + struct.pack("<I", len(payload)) + payload
+    path = tmp_path / "hires.wav"
+    path.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+
+    with WavReader(str(path)) as reader:
+        assert reader.info.audio_format == WAVE_FORMAT_PCM
+        assert reader.info.bits_per_sample == 24
+        out = b"".join(reader.iter_pcm16(16000))
+    np.testing.assert_allclose(np.frombuffer(out, dtype="<i2"), [0, 16383, -16383, 32767], atol=1)
+
+
+def test_mulaw_telephony_is_expanded(tmp_path):
+    """G.711 mu-law WAV files are expanded through the lookup table"""
+    pcm = (tone(300, 1.0, 8000) * 32767).astype(np.int16)
+    codes = np.abs(MULAW_TABLE[None, :].astype(np.int32) - pcm[:, None]).argmin(axis=1).astype(np.uint8)
+    path = tmp_path / "ulaw.wav"
+    path.write_bytes(build_wav(codes.tobytes(), 8000, 1, 8, WAVE_FORMAT_MULAW))
+
+    out = read_all(path)
+    assert abs(len(out) // 2 - 16000) <= 2
+    assert dominant_frequency(out, 16000) == pytest.approx(300, abs=2)
+
+
+def test_invalid_headers_are_rejected():
+    """Malformed or unsupported files raise a validation error"""
+    with pytest.raises(ValidationError):
+        parse_wav_header(b"RIFF\x00\x00\x00\x00AVI ")
+    with pytest.raises(ValidationError):
+        parse_wav_header(build_wav(b"\x00" * 4, 16000, 1, 12))
+    # Headers cut off inside a chunk header or the fmt chunk
+    header = build_wav(b"\x00" * 4, 16000, 1, 16)
+    for cut in (14, 20, 30):
+        with pytest.raises(ValidationError):
+            parse_wav_header(header[:cut])
+    with pytest.raises(ValidationError):
+        parse_wav_header(header[:30], file_size=len(header))
+
+
+def test_resampler_is_block_size_independent():
+    """Streaming in small blocks yields the same output as one large block"""
+    signal = tone(1000, 0.5, 44100)
+    whole = Resampler(44100, 16000).process(signal)
+    chunked = Resampler(44100, 16000)
+    pieces = np.concatenate([chunked.process(block).copy() for block in np.array_split(signal, 37)])
+
+    assert len(pieces) == len(whole)
+    np.testing.assert_allclose(pieces, whole, atol=1e-5)
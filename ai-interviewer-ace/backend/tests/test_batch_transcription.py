@@ -0,0 +1,135 @@
+"""
+Test cases for batch transcription helpers
+"""
+import asyncio
+import json
+import wave
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import speech
+from app.services.batch_transcription import BatchSummary, audio_duration, collect_wav_files
+from app.utils.concurrency import ConcurrencyLimiter
+
+
+def write_wav(path, seconds, sample_rate=16000):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b"\x00\x00" * int(seconds * sample_rate))
+
+
+def test_collect_wav_files(tmp_path):
+    """Directories expand to their WAV files, optionally recursively"""
+    write_wav(tmp_path / "a.wav", 0.1)
+    (tmp_path / "nested").mkdir()
+    write_wav(tmp_path / "nested" / "b.wav", 0.1)
+    (tmp_path / "notes.txt").write_text("not audio")
+
+    assert collect_wav_files([str(tmp_path)]) == [tmp_path / "a.wav"]
+    assert collect_wav_files([str(tmp_path)], recursive=True) == [
+        tmp_path / "a.wav",
+        tmp_path / "nested" / "b.wav",
+    ]
+    with pytest.raises(FileNotFoundError):
+        collect_wav_files([str(tmp_path / "missing.wav")])
+
+
+def test_audio_duration(tmp_path):
+    """Duration comes from the WAV header, or raw PCM size without one"""
+    write_wav(tmp_path / "a.wav", 1.5, sample_rate=8000)
+    (tmp_path / "raw.pcm").write_bytes(b"\x00\x00" * 16000)
+
+    assert audio_duration(str(tmp_path / "a.wav")) == pytest.approx(1.5)
+    assert audio_duration(str(tmp_path / "raw.pcm")) == pytest.approx(1.0)
+
+
+def test_batch_summary_reports_real_time_factor():
+    """Summary aggregates audio and decode time into real-time factors"""
+    summary = BatchSummary(workers=2)
+    summary.add({"type": "result", "audio_seconds": 10.0, "decode_seconds": 2.0})
+    summary.add({"type": "result", "audio_seconds": 30.0, "decode_seconds": 4.0})
+    summary.add({"type": "error", "file": "broken.wav", "error": "boom"})
+    record = summary.to_dict()
+
+    assert record["files"] == 2
+    assert record["failed"] == 1
+    assert record["audio_seconds"] == 40.0
+    assert record["worker_rtf"] == 0.15
+    assert record["rtf"] < 1
+
+
+class FakeTranscriber:
+    """Records the workers it was given and yields one record per file"""
+    created = []
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        FakeTranscriber.created.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    async def run_async(self, paths):
+        for path in paths:
+            yield {"type": "result", "file": str(path)}
+
+
+@pytest.fixture
+def batch_client(tmp_path, monkeypatch):
+    write_wav(tmp_path / "a.wav", 0.1)
+    FakeTranscriber.created = []
+    monkeypatch.setattr(speech, "BatchTranscriber", FakeTranscriber)
+    monkeypatch.setattr(speech, "batch_jobs", ConcurrencyLimiter(1, timeout=0))
+    monkeypatch.setattr(speech.settings, "TRANSCRIPTION_BATCH_ROOT", str(tmp_path))
+    monkeypatch.setattr(speech.settings, "VOSK_BATCH_WORKERS", 2)
+    app = FastAPI()
+    app.include_router(speech.router)
+    return TestClient(app)
+
+
+def test_batch_workers_are_capped(batch_client):
+    """A request cannot start more processes than VOSK_BATCH_WORKERS"""
+    client = batch_client
+
+    response = client.post("/speech/batch", json={"paths": ["a.wav"], "workers": 64})
+
+    assert response.status_code == 200
+    assert [t.workers for t in FakeTranscriber.created] == [2]
+    # The slot is released once the results have been streamed
+    assert speech.batch_jobs.active == 0
+
+
+def test_batch_jobs_beyond_the_limit_are_refused(batch_client):
+    """While a job holds the only slot, another request gets a 503"""
+    client = batch_client
+
+    async def hold():
+        async with speech.batch_jobs.slot():
+            return client.post("/speech/batch", json={"paths": ["a.wav"]})
+
+    assert asyncio.run(hold()).status_code == 503
+    assert FakeTranscriber.created == []
+
+
+def test_batch_slot_is_only_held_while_streaming(tmp_path, monkeypatch):
+    """A response whose body is never read does not keep a job slot"""
+    write_wav(tmp_path / "a.wav", 0.1)
+    monkeypatch.setattr(speech, "BatchTranscriber", FakeTranscriber)
+    monkeypatch.setattr(speech, "batch_jobs", ConcurrencyLimiter(1, timeout=0))
+    monkeypatch.setattr(speech.settings, "TRANSCRIPTION_BATCH_ROOT", str(tmp_path))
+
+    async def run():
+        await speech.batch_transcribe(speech.BatchTranscriptionRequest(paths=["a.wav"]))
+        assert speech.batch_jobs.active == 0
+        response = await speech.batch_transcribe(speech.BatchTranscriptionRequest(paths=["a.wav"]))
+        return [line async for line in response.body_iterator]
+
+    lines = asyncio.run(run())
+    assert [json.loads(line)["type"] for line in lines] == ["result"]
+    assert speech.batch_jobs.active == 0
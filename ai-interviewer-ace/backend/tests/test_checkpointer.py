@@ -0,0 +1,87 @@
+"""
+Test cases for the agent's bounded SQLite checkpointer
+"""
+from typing import Annotated, TypedDict
+
+import pytest
+
+pytest.importorskip("langgraph.checkpoint.sqlite")
+
+from langgraph.graph import START, StateGraph
+from langgraph.graph.message import add_messages
+
+from app.Agent.checkpointer import EvictingSqliteSaver
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def echo_graph(checkpointer):
+    # Stands in for the LLM: replies with the number of messages it has seen
+    builder = StateGraph(State)
+    builder.add_node("echo", lambda state: {"messages": [("ai", str(len(state["messages"])))]})
+    builder.add_edge(START, "echo")
+    return builder.compile(checkpointer=checkpointer)
+
+
+def say(graph, thread_id, text):
+    config = {"configurable": {"thread_id": thread_id}}
+    return graph.invoke({"messages": [("user", text)]}, config)["messages"][-1].content
+
+
+def test_threads_keep_separate_histories(tmp_path):
+    """Each session's thread sees only its own messages"""
+    graph = echo_graph(EvictingSqliteSaver.from_path(str(tmp_path / "agent.sqlite")))
+
+    assert say(graph, "s1", "hello") == "1"
+    assert say(graph, "s1", "again") == "3"
+    assert say(graph, "s2", "hello") == "1"
+
+
+def test_least_recently_used_thread_is_evicted(tmp_path):
+    """Beyond max_threads the coldest thread's checkpoints are deleted"""
+    saver = EvictingSqliteSaver.from_path(str(tmp_path / "agent.sqlite"), max_threads=2)
+    graph = echo_graph(saver)
+
+    say(graph, "a", "hi")
+    say(graph, "b", "hi")
+    say(graph, "a", "hi")
+    say(graph, "c", "hi")
+
+    assert saver.thread_count() == 2
+    assert saver.evicted == 1
+    assert say(graph, "a", "hi") == "5"
+    # "b" was evicted, so its conversation starts over
+    assert say(graph, "b", "hi") == "1"
+
+
+def test_recency_survives_reopening(tmp_path):
+    """A reopened database keeps the bound and the last-used order"""
+    path = str(tmp_path / "agent.sqlite")
+    graph = echo_graph(EvictingSqliteSaver.from_path(path, max_threads=2))
+    say(graph, "a", "hi")
+    say(graph, "b", "hi")
+    say(graph, "a", "hi")
+
+    saver = EvictingSqliteSaver.from_path(path, max_threads=2)
+    graph = echo_graph(saver)
+    say(graph, "c", "hi")
+
+    assert say(graph, "a", "hi") == "5"
+    assert say(graph, "b", "hi") == "1"
+
+
+def test_workers_sharing_the_database_agree_on_recency(tmp_path):
+    """A thread kept busy by another worker is not the one evicted"""
+    path = str(tmp_path / "agent.sqlite")
+    first = echo_graph(EvictingSqliteSaver.from_path(path, max_threads=2))
+    second = echo_graph(EvictingSqliteSaver.from_path(path, max_threads=2))
+    say(first, "a", "hi")
+    say(first, "b", "hi")
+    say(second, "a", "hi")
+
+    say(first, "c", "hi")
+
+    assert say(second, "a", "hi") == "5"
+    assert say(first, "b", "hi") == "1"
@@ -0,0 +1,91 @@
+"""
+Test cases for the async concurrency limiter
+"""
+import asyncio
+import pytest
+
+from app.utils.concurrency import ConcurrencyLimiter
+from app.utils.errors import CapacityError
+
+
+def test_limiter_bounds_concurrency_and_records_queueing():
+    """No more than limit holders at once; the rest are counted as waiting"""
+    limiter = ConcurrencyLimiter(2)
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.active)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(work() for _ in range(5)))
+
+    asyncio.run(run())
+    stats = limiter.stats()
+    assert peak == 2
+    assert stats["active"] == stats["waiting"] == 0
+    assert stats["peak_waiting"] == 3
+    assert stats["wait_ms"]["count"] == 5
+
+
+def test_limiter_times_out_waiters():
+    """A caller that cannot get a slot in time gets a CapacityError"""
+    limiter = ConcurrencyLimiter(1, timeout=0.01, resource="LLM call slots")
+
+    async def run():
+        async with limiter.slot():
+            with pytest.raises(CapacityError):
+                async with limiter.slot():
+                    pass
+        # The slot is still usable after the timeout
+        async with limiter.slot():
+            return limiter.stats()
+
+    stats = asyncio.run(run())
+    assert stats["timeouts"] == 1
+    assert stats["waiting"] == 0
+
+
+def test_limiter_zero_timeout_takes_only_free_slots():
+    """With no wait allowed a free slot is granted and a busy one refused"""
+    limiter = ConcurrencyLimiter(1, timeout=0)
+
+    async def run():
+        async with limiter.slot():
+            with pytest.raises(CapacityError):
+                async with limiter.slot():
+                    pass
+        async with limiter.slot():
+            pass
+
+    asyncio.run(run())
+    assert limiter.timeouts == 1
+
+
+def test_limiter_timeouts_racing_releases_keep_every_slot():
+    """A timeout that fires as a slot is released never loses the slot"""
+    limiter = ConcurrencyLimiter(2, timeout=0.001)
+
+    async def hold():
+        async with limiter.slot():
+            await asyncio.sleep(0.001)
+
+    async def try_hold():
+        try:
+            async with limiter.slot():
+                pass
+        except CapacityError:
+            pass
+
+    async def run():
+        for _ in range(100):
+            await asyncio.gather(hold(), hold(), try_hold(), try_hold())
+        # Both slots can still be held at once
+        async with limiter.slot():
+            async with limiter.slot():
+                return limiter.stats()
+
+    stats = asyncio.run(run())
+    assert stats["active"] == 2 and stats["waiting"] == 0
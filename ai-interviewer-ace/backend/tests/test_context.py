@@ -0,0 +1,62 @@
+"""
+Test cases for interview thread context management
+"""
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from app.Agent.context import plan_fold, render_transcript, seed_length, split_turns, with_summary
+
+
+def thread(turns, words=1):
+    messages = [SystemMessage(content="prompt", id="seed-system"), AIMessage(content="job", id="seed-job")]
+    messages.append(AIMessage(content="Welcome"))
+    for i in range(turns):
+        messages.append(HumanMessage(content=" ".join([f"answer{i}"] * words)))
+        messages.append(AIMessage(content=f"question {i}"))
+    return messages
+
+
+def test_turns_start_at_candidate_messages():
+    """Tool calls stay in the turn of the message that prompted them"""
+    call = AIMessage(content="", tool_calls=[{"name": "create_an_mcq", "args": {"question": "q"}, "id": "c1"}])
+    messages = [AIMessage(content="Hi"), HumanMessage(content="a"), call, ToolMessage(content="B", tool_call_id="c1"), AIMessage(content="ok")]
+
+    turns = split_turns(messages)
+
+    assert [len(turn) for turn in turns] == [1, 4]
+    assert "Interviewer used create_an_mcq" in render_transcript(turns[1])
+
+
+def test_nothing_is_folded_until_twice_the_kept_turns():
+    """Folding waits for 2N turns, then keeps the last N"""
+    assert plan_fold(thread(4), "", keep_turns=3, max_tokens=10000) == []
+
+    messages = thread(6)
+    folded = plan_fold(messages, "", keep_turns=3, max_tokens=10000)
+
+    # The greeting turn and three answered turns go; the seed is never folded
+    assert folded == messages[2:9]
+    assert seed_length(messages) == 2
+
+
+def test_token_cap_folds_below_the_kept_turns():
+    """Long turns are folded early to stay under the token cap, keeping the latest"""
+    messages = thread(3, words=200)
+
+    folded = plan_fold(messages, "", keep_turns=3, max_tokens=400)
+
+    assert folded == messages[2:7]
+
+
+def test_summary_follows_the_opening_prompt():
+    """The summary is shown to the LLM after the prompt and before the turns"""
+    messages = thread(1)
+
+    prompt = with_summary(messages, "- likes Python")
+
+    assert prompt[2].content.endswith("- likes Python")
+    assert prompt[:2] == messages[:2] and prompt[3:] == messages[2:]
+    assert with_summary(messages, "") == messages
@@ -0,0 +1,80 @@
+"""
+Test cases for connection pool instrumentation
+"""
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.routers import system
+from app.utils.db_pool import InstrumentedAsyncPool, pool_stats
+from app.utils.metrics import Histogram
+
+pytest.importorskip("aiosqlite")
+
+
+def test_histogram_buckets_are_cumulative():
+    """Values land in the first bucket they do not exceed"""
+    histogram = Histogram(buckets=(1, 10))
+    for value in (0.5, 1, 3, 50):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"1": 2, "10": 3, "+Inf": 4}
+    assert (snapshot["count"], snapshot["sum"], snapshot["max"]) == (4, 54.5, 50)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncPool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.1
+    )
+    yield engine
+
+
+def test_pool_counts_waits_overflow_and_timeouts(engine):
+    """Checkouts beyond the pool size are overflow; beyond the overflow they time out"""
+    async def run():
+        first = await engine.connect()
+        second = await engine.connect()
+        busy = pool_stats(engine)
+        with pytest.raises(exc.TimeoutError):
+            await engine.connect()
+        await first.close()
+        await second.close()
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        stats = pool_stats(engine)
+        await engine.dispose()
+        return busy, stats
+
+    busy, stats = asyncio.run(run())
+    assert (busy["checked_out"], busy["overflow"]) == (2, 1)
+    assert (stats["checkouts"], stats["overflow_events"], stats["timeouts"]) == (3, 1, 1)
+    # The timed-out checkout waited for the full pool timeout
+    assert stats["checkout_wait_ms"]["count"] == 4
+    assert stats["checkout_wait_ms"]["max"] >= 100
+    # Metrics survive the pool being replaced by dispose()
+    assert pool_stats(engine)["checkouts"] == 3
+
+
+def test_metrics_endpoint_reports_pool(engine, monkeypatch):
+    """The metrics endpoint includes pool stats and worker sizing"""
+    monkeypatch.setattr(system, "engine", engine)
+    monkeypatch.setenv("HIREGAGE_WORKERS", "3")
+    app = FastAPI()
+    app.include_router(system.router)
+
+    body = TestClient(app).get("/system/metrics").json()
+    assert body["workers"] == 3
+    assert body["database"]["pool_size"] == 1
+    assert body["database_max_connections"] == 3 * (system.get_settings().DATABASE_POOL_SIZE + system.get_settings().DATABASE_MAX_OVERFLOW)
+
+    monkeypatch.setattr(system, "engine", None)
+    assert TestClient(app).get("/system/metrics").json()["database"] is None
@@ -0,0 +1,79 @@
+"""
+Test cases for the vectorized DSP helpers
+"""
+import warnings
+import numpy as np
+import pytest
+
+from app.services.transcription import convert_to_pcm
+from app.utils.dsp import (
+    ALAW_TABLE,
+    MULAW_TABLE,
+    DCBlocker,
+    GainNormalizer,
+    ScratchBuffer,
+    decode_float32,
+    decode_mulaw,
+    float_to_int16,
+    rms_dbfs,
+)
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    audioop = pytest.importorskip("audioop")
+
+
+def test_g711_tables_match_reference():
+    """Expansion tables agree with the standard library codecs"""
+    codes = bytes(range(256))
+    expected_ulaw = np.frombuffer(audioop.ulaw2lin(codes, 2), dtype="<i2")
+    expected_alaw = np.frombuffer(audioop.alaw2lin(codes, 2), dtype="<i2")
+
+    np.testing.assert_array_equal(MULAW_TABLE, expected_ulaw)
+    np.testing.assert_array_equal(ALAW_TABLE, expected_alaw)
+
+
+def test_decoders_write_into_preallocated_buffers():
+    """Decoding reuses the caller's output buffer"""
+    out = np.empty(8, dtype=np.int16)
+    scratch = np.empty(8, dtype=np.float32)
+
+    decoded = decode_mulaw(bytes([0xFF, 0x7F]), out)
+    assert np.shares_memory(decoded, out)
+    np.testing.assert_array_equal(decoded, [0, 0])
+
+    decoded = decode_float32(np.array([0.5, -0.5], dtype="<f4").tobytes(), out, scratch)
+    assert np.shares_memory(decoded, out)
+    np.testing.assert_array_equal(decoded, [16383, -16383])
+
+
+def test_float_to_int16_saturates():
+    """Out-of-range samples clip instead of wrapping around"""
+    samples = np.array([1.5, -1.5, 1.0, -1.0, 0.0], dtype=np.float32)
+    out = float_to_int16(samples.copy(), np.empty(5, dtype=np.int16))
+
+    np.testing.assert_array_equal(out, [32767, -32768, 32767, -32767, 0])
+    assert np.frombuffer(convert_to_pcm(samples), dtype=np.int16)[0] == 32767
+
+
+def test_scratch_buffer_reuses_storage():
+    """Requests up to the current capacity return views of the same array"""
+    scratch = ScratchBuffer(np.float32, 16)
+    first = scratch.get(16)
+    assert np.shares_memory(scratch.get(8), first)
+    assert len(scratch.get(64)) == 64
+
+
+def test_dc_blocker_and_gain_normalizer():
+    """DC offset is removed and quiet audio is lifted toward the target level"""
+    t = np.arange(16000) / 16000.0
+    quiet = (0.01 * np.sin(2 * np.pi * 200 * t)).astype(np.float32)
+
+    offset = quiet + np.float32(0.2)
+    DCBlocker().process(offset)
+    assert abs(float(offset.mean())) < 1e-4
+
+    normalizer = GainNormalizer(target_dbfs=-20.0, adapt=1.0)
+    level = rms_dbfs(quiet)
+    normalizer.process(quiet)
+    assert rms_dbfs(quiet) == pytest.approx(min(-20.0, level + 20.0), abs=0.1)
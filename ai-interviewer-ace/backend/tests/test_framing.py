@@ -0,0 +1,164 @@
+"""
+Test cases for the binary speech WebSocket protocol
+"""
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import speech
+from app.utils.dsp import MULAW_TABLE
+from app.utils.errors import ValidationError
+from app.utils.framing import (
+    FLAG_END_OF_STREAM,
+    Codec,
+    FrameDecoder,
+    PartialEmitter,
+    PartialUpdate,
+    ResultKind,
+    encode_audio_frame,
+    encode_result_frame,
+    parse_audio_frame,
+    parse_result_frame,
+)
+from tests.test_transcription import make_service
+
+
+def test_frames_round_trip():
+    """Header fields and payload survive encoding and parsing"""
+    frame = parse_audio_frame(encode_audio_frame(b"\x01\x02", seq=7, timestamp_ms=1500, flags=FLAG_END_OF_STREAM))
+    assert (frame.codec, frame.seq, frame.timestamp_ms, frame.end_of_stream) == (Codec.PCM16, 7, 1500, True)
+    assert bytes(frame.payload) == b"\x01\x02"
+
+    assert parse_result_frame(encode_result_frame(ResultKind.FINAL, 3, 1500, "héllo")) == (ResultKind.FINAL, 3, 1500, 0, "héllo")
+    assert parse_result_frame(encode_result_frame(ResultKind.PARTIAL, 4, 0, "lo", offset=3)) == (ResultKind.PARTIAL, 4, 0, 3, "lo")
+
+
+def test_malformed_frames_are_rejected():
+    """Truncated headers and unknown codecs raise a validation error"""
+    with pytest.raises(ValidationError):
+        parse_audio_frame(b"\x01\x00")
+    with pytest.raises(ValidationError):
+        parse_audio_frame(encode_audio_frame(b"", seq=0, codec=9))
+
+
+def test_decoder_drops_duplicates_and_counts_gaps():
+    """Stale frames are discarded and skipped sequence numbers are counted"""
+    decoder = FrameDecoder()
+    accepted = [decoder.accept(parse_audio_frame(encode_audio_frame(b"", seq))) for seq in (0, 1, 1, 0, 4, 5)]
+
+    assert accepted == [True, True, False, False, True, True]
+    assert decoder.stats() == {"frames": 4, "dropped": 2, "gaps": 1}
+
+
+def test_decoder_handles_sequence_wrap():
+    """Sequence numbers wrap around at 2**32"""
+    decoder = FrameDecoder()
+    assert decoder.accept(parse_audio_frame(encode_audio_frame(b"", 2 ** 32 - 1)))
+    assert decoder.accept(parse_audio_frame(encode_audio_frame(b"", 2 ** 32)))
+    assert decoder.gaps == 0
+
+
+def test_decoder_expands_companded_audio():
+    """mu-law payloads decode to 16-bit PCM bytes"""
+    frame = parse_audio_frame(encode_audio_frame(bytes([0x00, 0x80, 0xFF]), 0, codec=Codec.MULAW))
+    pcm = FrameDecoder().decode(frame)
+
+    assert len(pcm) == 6
+    np.testing.assert_array_equal(np.frombuffer(pcm, dtype="<i2"), MULAW_TABLE[[0x00, 0x80, 0xFF]])
+
+
+def test_partial_emitter_sends_changed_suffixes():
+    """Unchanged partials are suppressed and changes are sent as suffixes"""
+    emitter = PartialEmitter(max_rate_hz=0)
+    client = ""
+    sent = []
+    for text in ["the", "the", "the cat", "the cap", "the cap sat"]:
+        update = emitter.update(text)
+        if update is not None:
+            sent.append((update.offset, update.text))
+            client = update.apply(client)
+        assert client == text
+
+    assert sent == [(0, "the"), (3, " cat"), (6, "p"), (7, " sat")]
+
+
+def test_partial_emitter_rate_limits_until_reset():
+    """Partials inside the minimum interval are dropped; a new utterance is not throttled"""
+    now = [0.0]
+    emitter = PartialEmitter(max_rate_hz=5, clock=lambda: now[0])
+
+    assert emitter.update("a") is not None
+    now[0] = 0.1
+    assert emitter.update("a b") is None
+    now[0] = 0.25
+    assert emitter.update("a b c") == PartialUpdate(1, " b c")
+
+    emitter.reset()
+    assert emitter.update("next") == PartialUpdate(0, "next")
+    assert emitter.stats() == {"received": 4, "emitted": 3}
+
+
+def test_partial_emitter_flushes_the_latest_held_back_partial():
+    """A partial dropped by the rate limit is sent once the window ends"""
+    now = [0.0]
+    emitter = PartialEmitter(max_rate_hz=5, clock=lambda: now[0])
+
+    emitter.update("a")
+    assert emitter.pending_delay() is None
+    now[0] = 0.05
+    assert emitter.update("a b") is None
+    assert emitter.update("a b c") is None
+    assert emitter.pending_delay() == pytest.approx(0.15)
+
+    now[0] = 0.2
+    assert emitter.flush() == PartialUpdate(1, " b c")
+    assert emitter.pending_delay() is None and emitter.flush() is None
+
+    # A final ends the utterance, so nothing held back is sent after it
+    now[0] = 0.25
+    emitter.update("a b c d")
+    emitter.reset()
+    assert emitter.flush() is None
+
+
+@pytest.fixture
+def speech_client(monkeypatch):
+    service, _ = make_service()
+    monkeypatch.setattr(speech, "transcription_service", service)
+    app = FastAPI()
+    app.include_router(speech.router)
+    yield TestClient(app)
+    service.shutdown()
+
+
+def test_binary_protocol_sends_deduplicated_result_frames(speech_client):
+    """Binary sessions get result frames, with repeated partials suppressed"""
+    chunks = [b"hello", b" ", b".", b"world"]
+    with speech_client.websocket_connect("/speech/ws/s1?protocol=binary") as ws:
+        for seq, chunk in enumerate(chunks):
+            ws.send_bytes(encode_audio_frame(chunk, seq, timestamp_ms=seq * 100))
+        # A replayed frame is ignored
+        ws.send_bytes(encode_audio_frame(b"again", 1))
+        ws.send_bytes(encode_audio_frame(b"", len(chunks), flags=FLAG_END_OF_STREAM))
+
+        results = []
+        while True:
+            kind, seq, _, _, text = parse_result_frame(ws.receive_bytes())
+            results.append((kind, seq, text))
+            if kind == ResultKind.FINAL and text == "world":
+                break
+
+    assert results == [
+        (ResultKind.PARTIAL, 0, "hello"),
+        (ResultKind.FINAL, 1, "hello"),
+        (ResultKind.PARTIAL, 2, "world"),
+        (ResultKind.FINAL, 3, "world"),
+    ]
+
+
+def test_unknown_protocol_is_refused(speech_client):
+    """Only the json and binary protocols are accepted"""
+    with pytest.raises(Exception):
+        with speech_client.websocket_connect("/speech/ws/s1?protocol=xml"):
+            pass
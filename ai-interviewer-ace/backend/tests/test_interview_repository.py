@@ -0,0 +1,144 @@
+"""
+Test cases for the database repository and transcript storage (SQLite)
+"""
+import asyncio
+import datetime
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.models.database import init_db
+from app.routers import transcripts
+from app.services.interview_repository import DatabaseTranscriptStorage, InterviewRepository
+from app.services.transcript_view import ConsolidatedTranscriptCache
+from app.utils.errors import ValidationError
+
+pytest.importorskip("aiosqlite")
+
+
+def entry(i, speaker="candidate"):
+    return {"text": f"answer {i}", "speaker": speaker, "timestamp": f"2025-05-01T10:00:{i:02d}"}
+
+
+@pytest.fixture
+def database(tmp_path):
+    # No pooling: each test step runs on its own event loop
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+    asyncio.run(init_db(engine))
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    yield InterviewRepository(async_sessionmaker(engine, expire_on_commit=False)), statements
+    asyncio.run(engine.dispose())
+
+
+def test_storage_round_trips_entries_with_cursors(database):
+    """Entries come back in save order and cursors page by message id"""
+    repository, _ = database
+    storage = DatabaseTranscriptStorage(repository)
+
+    async def run():
+        await storage.append_many("s1", [entry(0, "AI"), entry(1), entry(2)])
+        await storage.append("s1", entry(3))
+        await storage.append("s2", entry(9))
+        first, cursor = await storage.read_range("s1", limit=2)
+        rest, end = await storage.read_range("s1", cursor)
+        streamed = [e async for e in storage.iter_entries("s1", cursor)]
+        return first, rest, end, streamed, await storage.read("s1"), await repository.get_interview("s1")
+
+    first, rest, end, streamed, everything, interview = asyncio.run(run())
+    assert first == [entry(0, "AI"), entry(1)]
+    assert rest == streamed == [entry(2), entry(3)]
+    assert everything == [entry(0, "AI"), entry(1), entry(2), entry(3)]
+    assert asyncio.run(storage.read_range("s1", end)) == ([], end)
+    assert interview.job_title == "" and len(interview.messages) == 4
+
+
+def test_ensure_interview_tolerates_a_concurrent_insert(database, monkeypatch):
+    """A placeholder created between the lookup and the insert is not an error"""
+    repository = database[0]
+    asyncio.run(repository.ensure_interview("s1"))
+    # Every lookup misses, as if another worker inserted the row just after it
+    monkeypatch.setattr(AsyncSession, "get", lambda self, *args, **kwargs: asyncio.sleep(0))
+
+    asyncio.run(repository.ensure_interview("s1"))
+    asyncio.run(repository.add_messages("s1", [{"role": "AI", "content": "hi"}]))
+    monkeypatch.undo()
+    assert len(asyncio.run(repository.get_interview("s1")).messages) == 1
+
+
+def test_storage_rejects_non_iso_timestamps(database):
+    """Timestamps must parse to a datetime"""
+    storage = DatabaseTranscriptStorage(database[0])
+    with pytest.raises(ValidationError):
+        asyncio.run(storage.append("s1", {"text": "hi", "speaker": "AI", "timestamp": "yesterday"}))
+
+
+def test_interviews_load_relations_without_n_plus_one(database):
+    """Listing interviews costs the same number of queries however many there are"""
+    repository, statements = database
+
+    async def seed():
+        for n in range(5):
+            await repository.create_interview(f"i{n}", "Engineer")
+            await repository.add_messages(f"i{n}", [
+                {"role": "agent", "content": "Q", "timestamp": datetime.datetime(2025, 5, 1, 10, 0, 1)},
+                {"role": "candidate", "content": "A", "timestamp": datetime.datetime(2025, 5, 1, 10, 0, 0)},
+            ])
+            await repository.save_evaluation(f"i{n}", scores={"overall": n})
+
+    asyncio.run(seed())
+    statements.clear()
+    interviews = asyncio.run(repository.list_interviews())
+
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 3
+    assert sorted(i.evaluation.scores["overall"] for i in interviews) == list(range(5))
+    # Messages come back in timestamp order
+    assert all([m.content for m in i.messages] == ["A", "Q"] for i in interviews)
+    assert all(i.completed for i in interviews)
+
+
+def test_message_time_range_uses_the_index(database):
+    """Time-range lookups search the (interview_id, timestamp) index"""
+    repository, statements = database
+    start = datetime.datetime(2025, 5, 1, 10, 0, 0)
+
+    async def run():
+        await repository.create_interview("i1", "Engineer")
+        await repository.add_messages("i1", [
+            {"role": "candidate", "content": str(n), "timestamp": start + datetime.timedelta(seconds=n)}
+            for n in range(10)
+        ])
+        messages = await repository.get_messages("i1", start + datetime.timedelta(seconds=3), start + datetime.timedelta(seconds=6))
+        async with repository.session_factory() as session:
+            plan = (await session.execute(text(
+                "EXPLAIN QUERY PLAN SELECT * FROM messages WHERE interview_id = 'i1' AND timestamp >= '2025' ORDER BY timestamp"
+            ))).all()
+        return messages, plan
+
+    statements.clear()
+    messages, plan = asyncio.run(run())
+    assert [m.content for m in messages] == ["3", "4", "5"]
+    assert any("ix_messages_interview_id_timestamp" in str(row) for row in plan)
+    assert len([s for s in statements if s.lstrip().upper().startswith("INSERT INTO MESSAGES")]) == 1
+
+
+def test_transcript_endpoints_on_database_storage(database, monkeypatch):
+    """The transcript router works unchanged on the database storage"""
+    storage = DatabaseTranscriptStorage(database[0])
+    monkeypatch.setattr(transcripts, "transcript_storage", storage)
+    monkeypatch.setattr(transcripts, "consolidated_views", ConsolidatedTranscriptCache(storage.read))
+    app = FastAPI()
+    app.include_router(transcripts.router)
+    client = TestClient(app)
+
+    batch = [entry(0, "AI"), entry(1), entry(2)]
+    assert client.post("/transcript/s1/save/batch", json=batch).status_code == 201
+    page = client.get("/transcript/s1", params={"limit": 2})
+    assert page.json() == batch[:2]
+    assert client.get("/transcript/s1", params={"since": page.headers["X-Next-Cursor"]}).json() == batch[2:]
+    consolidated = client.get("/transcript/s1/consolidated").json()
+    assert consolidated["answers_by_question"] == [{"question": "answer 0", "answer": "answer 1 answer 2"}]
+    assert asyncio.run(storage.count("s1")) == 3
@@ -0,0 +1,79 @@
+"""
+Test cases for streaming Opus decoding
+
+The fixtures are one second of a 440 Hz tone encoded as 24 kbit/s mono Opus
+with libopus (20 ms frames), muxed into WebM and Ogg.
+"""
+from pathlib import Path
+import numpy as np
+import pytest
+
+from app.utils.errors import ValidationError
+from app.utils.framing import Codec, FrameDecoder, encode_audio_frame, parse_audio_frame
+from app.utils.opus import OggOpusDemuxer, OpusStreamDecoder, WebMOpusDemuxer, detect_container
+
+pytest.importorskip("av")
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def dominant_frequency(pcm, sample_rate=16000):
+    samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32)
+    spectrum = np.abs(np.fft.rfft(samples))
+    return np.argmax(spectrum) * sample_rate / len(samples)
+
+
+def decode_in_chunks(data, chunk_size, **kwargs):
+    decoder = OpusStreamDecoder(**kwargs)
+    pcm = b"".join(decoder.feed(data[i:i + chunk_size]) for i in range(0, len(data), chunk_size))
+    return pcm + decoder.flush(), decoder
+
+
+@pytest.mark.parametrize("name", ["tone_440hz.webm", "tone_440hz.ogg"])
+def test_containers_decode_incrementally(name):
+    """Small arbitrary chunks decode to 16 kHz PCM with the tone preserved"""
+    data = (FIXTURES / name).read_bytes()
+    pcm, decoder = decode_in_chunks(data, 37)
+
+    assert decoder.packets == 51
+    assert abs(len(pcm) // 2 - 16000) < 400
+    assert dominant_frequency(pcm) == pytest.approx(440, abs=2)
+
+
+def test_webm_with_unknown_sizes():
+    """Live MediaRecorder streams use unknown-size Segment elements"""
+    data = bytearray((FIXTURES / "tone_440hz.webm").read_bytes())
+    segment = data.index(b"\x18\x53\x80\x67") + 4
+    data[segment:segment + 8] = b"\x01" + b"\xff" * 7
+
+    demuxer = WebMOpusDemuxer()
+    packets = [p for i in range(0, len(data), 100) for p in demuxer.feed(bytes(data[i:i + 100]))]
+    assert demuxer.track == 1
+    assert demuxer.opus_head.startswith(b"OpusHead")
+    assert len(packets) == 51
+
+
+def test_raw_packets_and_frames():
+    """Raw Opus packets decode one per call, including through binary frames"""
+    demuxer = OggOpusDemuxer()
+    packets = demuxer.feed((FIXTURES / "tone_440hz.ogg").read_bytes())
+
+    raw = OpusStreamDecoder(container="raw")
+    pcm = b"".join(raw.feed(packet) for packet in packets) + raw.flush()
+    assert dominant_frequency(pcm) == pytest.approx(440, abs=2)
+
+    frames = FrameDecoder()
+    framed = b"".join(
+        bytes(frames.decode(parse_audio_frame(encode_audio_frame(packet, seq, codec=Codec.OPUS))))
+        for seq, packet in enumerate(packets)
+    )
+    assert framed == pcm[:len(framed)]
+
+
+def test_unrecognized_streams_are_rejected():
+    """Streams that are neither Ogg nor WebM raise a validation error"""
+    assert detect_container(b"RIFF") is None
+    with pytest.raises(ValidationError):
+        OpusStreamDecoder().feed(b"RIFF\x00\x00\x00\x00WAVE")
+    with pytest.raises(ValidationError):
+        OpusStreamDecoder(container="mp3")
@@ -0,0 +1,331 @@
+"""
+Test cases for the interview session stores
+"""
+import asyncio
+import json
+import pytest
+
+from app.services import session_store
+from app.services.session_reaper import SessionArchive, SessionReaper
+from app.services.session_store import (
+    DatabaseSessionStore,
+    MemorySessionStore,
+    _footprint,
+    create_session_store,
+)
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_store_expires_idle_sessions():
+    """Sessions expire ttl_seconds after they were last used"""
+    clock = FakeClock()
+    store = MemorySessionStore(ttl_seconds=10, clock=clock)
+
+    async def run():
+        await store.set("a", {"n": 1})
+        await store.set("b", {"n": 2})
+        clock.now += 8
+        assert await store.get("a") == {"n": 1}
+        clock.now += 8
+        # "a" was read 8 seconds ago, "b" has been idle for 16
+        return await store.get("a"), await store.get("b"), await store.count()
+
+    assert asyncio.run(run()) == ({"n": 1}, None, 1)
+
+
+def test_memory_store_evicts_least_recently_used():
+    """The least recently used session goes when the store is full"""
+    store = MemorySessionStore(max_sessions=2)
+
+    async def run():
+        await store.set("a", {})
+        await store.set("b", {})
+        await store.get("a")
+        await store.set("c", {})
+        return [await store.get(sid) for sid in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [{}, None, {}]
+
+
+def test_memory_store_persists_sessions_evicted_for_capacity():
+    """A session pushed out of a full store is persisted, even if that fails for another"""
+    saved = {}
+
+    async def persist(session_id, data):
+        if session_id == "broken":
+            raise OSError("disk full")
+        saved[session_id] = data
+
+    store = MemorySessionStore(max_sessions=1, persist=persist)
+
+    async def run():
+        await store.set("a", {"n": 1})
+        await store.set("broken", {"n": 2})
+        await store.set("c", {"n": 3})
+        return await store.count()
+
+    assert asyncio.run(run()) == 1
+    assert saved == {"a": {"n": 1}}
+
+
+def test_memory_store_reports_session_sizes():
+    """Stats track the memory held by sessions as they grow and go"""
+    store = MemorySessionStore()
+
+    async def run():
+        await store.set("a", {"transcript": []})
+        small = await store.stats()
+        await store.set("a", {"transcript": ["word " * 1000]})
+        await store.set("b", {"transcript": []})
+        large = await store.stats()
+        await store.delete("a")
+        return small, large, await store.stats()
+
+    small, large, after = asyncio.run(run())
+    assert small["sessions"] == 1
+    assert large["sessions"] == 2
+    assert large["max_session_bytes"] > 5000 > small["bytes"]
+    assert after == small
+
+
+def test_reaper_archives_idle_and_ended_sessions(tmp_path):
+    """Ended sessions go after the shorter retention, idle ones after the idle limit"""
+    clock = FakeClock()
+    store = MemorySessionStore(ttl_seconds=1000, clock=clock)
+    archive = SessionArchive(str(tmp_path / "sessions"))
+    reaper = SessionReaper(store, archive.save, idle_seconds=100, ended_seconds=10)
+
+    async def run():
+        await store.set("active", {"transcript": ["a"]})
+        await store.set("ended", {"transcript": ["b"], "ended_at": clock.now})
+        clock.now += 20
+        first = await reaper.reap()
+        clock.now += 100
+        second = await reaper.reap()
+        return first, second, await store.count()
+
+    assert asyncio.run(run()) == (1, 1, 0)
+    assert json.loads((tmp_path / "sessions" / "ended.json").read_text())["ended_at"]
+    assert json.loads((tmp_path / "sessions" / "active.json").read_text())["transcript"] == ["a"]
+    assert reaper.stats()["reaped"] == 2
+
+
+def test_reaper_keeps_sessions_it_cannot_persist_or_that_are_used():
+    """A failed persist or a session used during the persist leaves it in place"""
+    clock = FakeClock()
+    store = MemorySessionStore(clock=clock)
+    saved = []
+
+    async def persist(session_id, data):
+        if session_id == "broken":
+            raise OSError("disk full")
+        await store.get(session_id)
+        saved.append(session_id)
+
+    reaper = SessionReaper(store, persist, idle_seconds=10)
+
+    async def run():
+        await store.set("broken", {})
+        await store.set("busy", {})
+        clock.now += 20
+        return await reaper.reap(), await store.count()
+
+    assert asyncio.run(run()) == (0, 2)
+    assert saved == ["busy"]
+    assert reaper.stats()["persist_failures"] == 1
+
+
+def test_reaper_stop_persists_memory_sessions():
+    """Sessions in a non-persistent store are saved at shutdown"""
+    store = MemorySessionStore()
+    saved = {}
+
+    async def persist(session_id, data):
+        saved[session_id] = data
+
+    async def run():
+        reaper = SessionReaper(store, persist, interval=3600)
+        await store.set("a", {"n": 1})
+        reaper.start()
+        await reaper.stop()
+
+    asyncio.run(run())
+    assert saved == {"a": {"n": 1}}
+
+
+def test_memory_store_appends_in_place():
+    """Appends change the live session and its measured size"""
+    store = MemorySessionStore()
+
+    async def run():
+        await store.set("a", {"transcript": []})
+        before = (await store.stats())["bytes"]
+        data = await store.append("a", "transcript", {"content": "x" * 1000})
+        return data, before, await store.stats(), await store.append("missing", "transcript", {})
+
+    data, before, stats, missing = asyncio.run(run())
+    assert len(data["transcript"]) == 1
+    assert stats["bytes"] >= before + 1000
+    assert missing is None
+
+
+def test_memory_store_measures_only_the_appended_item(monkeypatch):
+    """Appends add the item's size without measuring the whole session again"""
+    store = MemorySessionStore()
+    measured = []
+    monkeypatch.setattr(session_store, "_footprint", lambda value: measured.append(value) or _footprint(value))
+
+    async def run():
+        await store.set("a", {"transcript": [{"content": "x" * 100}] * 50})
+        measured.clear()
+        for n in range(20):
+            data = await store.append("a", "transcript", {"content": str(n)})
+        return data, await store.stats(), [id(value) for value in measured]
+
+    data, stats, measured_ids = asyncio.run(run())
+    assert id(data) not in measured_ids and id(data["transcript"]) not in measured_ids
+    assert stats["bytes"] == _footprint(data)
+
+
+def test_create_session_store_validates_backend():
+    """Unknown backends and a database store without a database are rejected"""
+    assert isinstance(create_session_store("memory", 60, 10), MemorySessionStore)
+    with pytest.raises(ValueError):
+        create_session_store("database", 60, 10)
+    with pytest.raises(ValueError):
+        create_session_store("redis", 60, 10)
+
+
+def test_database_store_is_shared_between_workers(session_factory):
+    """A session written by one worker's store is served by another's"""
+    first = DatabaseSessionStore(session_factory)
+    second = DatabaseSessionStore(session_factory)
+    session = {"job_title": "Engineer", "transcript": [{"role": "candidate", "content": "hi"}]}
+
+    async def run():
+        await first.set("s1", session)
+        seen = await second.get("s1")
+        seen["transcript"].append({"role": "agent", "content": "hello"})
+        await second.set("s1", seen)
+        updated = await first.get("s1")
+        await first.delete("s1")
+        return seen, updated, await second.get("s1")
+
+    seen, updated, deleted = asyncio.run(run())
+    assert seen["job_title"] == "Engineer"
+    assert len(updated["transcript"]) == 2
+    assert deleted is None
+
+
+def test_database_store_expires_and_bounds_sessions(session_factory):
+    """Reads extend expiry; purges drop expired sessions and the oldest beyond the limit"""
+    clock = FakeClock()
+    store = DatabaseSessionStore(session_factory, ttl_seconds=10, max_sessions=2, purge_interval=0, clock=clock)
+
+    async def run():
+        await store.set("a", {})
+        await store.set("b", {})
+        clock.now += 8
+        await store.get("a")
+        clock.now += 8
+        expired = await store.get("b")
+        await store.set("c", {})
+        await store.set("d", {})
+        return expired, [await store.get(sid) for sid in ("a", "c", "d")], await store.count()
+
+    expired, live, count = asyncio.run(run())
+    assert expired is None
+    # "a" was used least recently, so it has the earliest expiry and is evicted
+    assert live == [None, {}, {}]
+    assert count == 2
+
+
+def test_database_store_persists_sessions_evicted_for_capacity(session_factory):
+    """Purged sessions beyond the limit are persisted first; failed ones stay"""
+    clock = FakeClock()
+    saved = {}
+    failing = {"a"}
+
+    async def persist(session_id, data):
+        if session_id in failing:
+            raise OSError("disk full")
+        saved[session_id] = data
+
+    store = DatabaseSessionStore(session_factory, max_sessions=1, purge_interval=0, clock=clock, persist=persist)
+
+    async def run():
+        for n, session_id in enumerate(("a", "b")):
+            await store.set(session_id, {"n": n})
+            clock.now += 1
+        kept = await store.count()
+        failing.clear()
+        await store.purge()
+        return kept, await store.count(), await store.get("b")
+
+    kept, count, live = asyncio.run(run())
+    assert kept == 2 and count == 1
+    assert saved == {"a": {"n": 0}} and live == {"n": 1}
+
+
+def test_archive_saves_of_one_session_do_not_collide(tmp_path):
+    """Concurrent saves of a session each write their own temporary file"""
+    archive = SessionArchive(str(tmp_path))
+
+    async def run():
+        await asyncio.gather(*(archive.save("s1", {"transcript": ["x" * 100_000] * 20, "n": n}) for n in range(20)))
+
+    asyncio.run(run())
+    assert json.loads((tmp_path / "s1.json").read_text())["n"] in range(20)
+    assert [path.name for path in tmp_path.iterdir()] == ["s1.json"]
+
+
+def test_database_store_reaping_and_stats(session_factory):
+    """Idle listing, guarded eviction and size stats on the shared store"""
+    clock = FakeClock()
+    store = DatabaseSessionStore(session_factory, ttl_seconds=1000, clock=clock)
+
+    async def run():
+        await store.set("old", {"transcript": ["x" * 500]})
+        clock.now += 50
+        await store.set("new", {"transcript": []})
+        idle = await store.idle(30)
+        stats = await store.stats()
+        refused = await store.evict("new", 30)
+        evicted = await store.evict("old", 30)
+        return idle, stats, refused, evicted, await store.count()
+
+    idle, stats, refused, evicted, count = asyncio.run(run())
+    assert [(sid, round(seconds)) for sid, _, seconds in idle] == [("old", 50)]
+    assert stats["sessions"] == 2 and stats["max_session_bytes"] > 500
+    assert (refused, evicted, count) == (False, True, 1)
+
+
+def test_database_store_concurrent_appends_are_all_kept(session_factory):
+    """Workers appending to the same session at once retry instead of overwriting"""
+    first = DatabaseSessionStore(session_factory)
+    second = DatabaseSessionStore(session_factory)
+    changes = []
+
+    def add(turn):
+        def change(data):
+            changes.append(turn)
+            data["transcript"].append(turn)
+        return change
+
+    async def run():
+        await first.set("s1", {"transcript": []})
+        await asyncio.gather(*(store.modify("s1", add(turn)) for turn in range(10) for store in (first, second)))
+        return await first.get("s1"), await second.modify("missing", add(0))
+
+    session, missing = asyncio.run(run())
+    assert sorted(session["transcript"]) == sorted(list(range(10)) * 2)
+    # Some writes lost the race and were applied again to fresh data
+    assert len(changes) > 20
+    assert missing is None
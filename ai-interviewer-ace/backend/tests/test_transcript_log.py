@@ -0,0 +1,293 @@
+"""
+Test cases for the append-only transcript log
+"""
+import asyncio
+import json
+import os
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import transcripts
+from app.services.transcript_log import TranscriptLog
+from app.services.transcript_view import ConsolidatedTranscriptCache
+
+
+def entry(i, speaker="candidate"):
+    return {"text": f"answer {i}", "speaker": speaker, "timestamp": f"2025-05-01T10:00:{i:02d}"}
+
+
+def test_concurrent_appends_share_fsyncs(tmp_path, monkeypatch):
+    """Overlapping saves all land intact and are made durable in batches"""
+    fsyncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: fsyncs.append(fd) or real_fsync(fd))
+    log = TranscriptLog(str(tmp_path), fsync_interval=0.01)
+
+    async def run():
+        await asyncio.gather(*(log.append("s1", entry(i)) for i in range(50)))
+
+    asyncio.run(run())
+    lines = (tmp_path / "s1.jsonl").read_text().splitlines()
+
+    assert sorted(json.loads(line)["text"] for line in lines) == sorted(f"answer {i}" for i in range(50))
+    assert 1 <= len(fsyncs) < 5
+    assert asyncio.run(log.read("s1")) == [entry(i) for i in range(50)]
+    asyncio.run(log.close())
+
+
+def test_saves_do_not_block_the_event_loop(tmp_path, monkeypatch):
+    """Slow disk writes run off the loop, and each session's entries stay in order"""
+    real_write = os.write
+
+    def slow_write(fd, data):
+        time.sleep(0.02)
+        return real_write(fd, data)
+
+    monkeypatch.setattr(os, "write", slow_write)
+    log = TranscriptLog(str(tmp_path), fsync_interval=0)
+    ticks = []
+
+    async def probe(stop):
+        while not stop.is_set():
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.005)
+
+    async def session(sid):
+        for i in range(5):
+            await log.append(sid, entry(i))
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(stop))
+        await asyncio.gather(session("s1"), session("s2"))
+        stop.set()
+        await task
+        await log.close()
+
+    asyncio.run(run())
+
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.015
+    for sid in ("s1", "s2"):
+        assert asyncio.run(log.read(sid)) == [entry(i) for i in range(5)]
+
+
+def test_reads_legacy_json_and_skip_torn_lines(tmp_path):
+    """Legacy transcripts come first, and a partially written line is ignored"""
+    (tmp_path / "s1.json").write_text(json.dumps([entry(0, "AI")], indent=2))
+    (tmp_path / "s1.jsonl").write_text(json.dumps(entry(1)) + "\n" + '{"text": "ans')
+
+    log = TranscriptLog(str(tmp_path))
+    assert asyncio.run(log.read("s1")) == [entry(0, "AI"), entry(1)]
+    assert asyncio.run(log.read("missing")) == []
+
+
+def test_tail_serves_fresh_logs_from_memory(tmp_path, monkeypatch):
+    """Small new logs are read from memory; larger ones fall back to the file"""
+    log = TranscriptLog(str(tmp_path), fsync_interval=0, tail_size=2)
+
+    async def run(count):
+        for i in range(count):
+            await log.append("s1", entry(i))
+
+    asyncio.run(run(2))
+    with monkeypatch.context() as m:
+        # The read must not parse the file
+        m.setattr(log, "_read_files", lambda session_id: pytest.fail("read the file"))
+        assert asyncio.run(log.read("s1")) == [entry(0), entry(1)]
+
+    # Five entries outgrow the tail, so the file is read
+    asyncio.run(run(3))
+    assert log.tail("s1") == [entry(1), entry(2)]
+    assert asyncio.run(log.read("s1")) == [entry(0), entry(1), entry(0), entry(1), entry(2)]
+    asyncio.run(log.close())
+
+
+def test_logs_shared_between_workers_are_read_from_the_file(tmp_path):
+    """A tail never stands in for a file another worker has appended to"""
+    first = TranscriptLog(str(tmp_path), fsync_interval=0)
+    second = TranscriptLog(str(tmp_path), fsync_interval=0)
+
+    async def run():
+        await first.append("s1", entry(0, "AI"))
+        await second.append("s1", entry(1))
+        await first.append("s1", entry(2, "AI"))
+        result = (
+            await first.read("s1"),
+            await second.read("s1"),
+            await first.read_range("s1", 1),
+            await second.read_range("s1", 2),
+        )
+        await first.close()
+        await second.close()
+        return result
+
+    first_read, second_read, first_range, second_range = asyncio.run(run())
+    expected = [entry(0, "AI"), entry(1), entry(2, "AI")]
+    assert first_read == second_read == expected
+    assert first_range == (expected[1:], 3)
+    assert second_range == (expected[2:], 3)
+
+
+def test_consolidated_view_sees_saves_from_other_workers(tmp_path):
+    """A cached view is rebuilt once another worker appends to the session"""
+    first = TranscriptLog(str(tmp_path), fsync_interval=0, tail_size=2)
+    second = TranscriptLog(str(tmp_path), fsync_interval=0, tail_size=2)
+    views = ConsolidatedTranscriptCache(first.read, count=first.count)
+
+    async def run():
+        await first.append("s1", entry(0, "AI"))
+        before = await views.get("s1")
+        await second.append("s1", entry(1))
+        counts = [await first.count("s1"), await second.count("s1")]
+        after = await views.get("s1")
+        await first.close()
+        await second.close()
+        return before, counts, after
+
+    before, counts, after = asyncio.run(run())
+    assert before["answers_by_question"] == []
+    assert counts == [2, 2]
+    assert after["answers_by_question"] == [{"question": "answer 0", "answer": "answer 1"}]
+
+
+def test_endpoints_use_the_log(tmp_path, monkeypatch):
+    """Save, list and consolidate go through the log"""
+    log = TranscriptLog(str(tmp_path), fsync_interval=0)
+    monkeypatch.setattr(transcripts, "transcript_storage", log)
+    monkeypatch.setattr(transcripts, "consolidated_views", ConsolidatedTranscriptCache(log.read))
+    app = FastAPI()
+    app.include_router(transcripts.router)
+    client = TestClient(app)
+
+    (tmp_path / "s1.json").write_text(json.dumps([{"text": "Tell me about you", "speaker": "AI", "timestamp": "2025-05-01T10:00:01"}]))
+    response = client.post("/transcript/s1/save", json={"text": "I build APIs", "speaker": "candidate", "timestamp": "2025-05-01T10:00:02"})
+    assert response.status_code == 201
+    assert client.post("/transcript/s1/save", json={"text": "no speaker"}).status_code == 400
+
+    assert [e["text"] for e in client.get("/transcript/s1").json()] == ["Tell me about you", "I build APIs"]
+    consolidated = client.get("/transcript/s1/consolidated").json()
+    assert consolidated["answers_by_question"] == [{"question": "Tell me about you", "answer": "I build APIs"}]
+    asyncio.run(log.close())
+
+
+def test_append_many_commits_with_one_write(tmp_path, monkeypatch):
+    """A batch is one write and one fsync, and keeps its order"""
+    calls = []
+    real_write, real_fsync = os.write, os.fsync
+    monkeypatch.setattr(os, "write", lambda fd, data: calls.append("write") or real_write(fd, data))
+    monkeypatch.setattr(os, "fsync", lambda fd: calls.append("fsync") or real_fsync(fd))
+    log = TranscriptLog(str(tmp_path), fsync_interval=0)
+
+    asyncio.run(log.append_many("s1", [entry(i) for i in range(20)]))
+
+    assert calls == ["write", "fsync"]
+    assert asyncio.run(log.read("s1")) == [entry(i) for i in range(20)]
+    asyncio.run(log.close())
+
+
+@pytest.fixture
+def transcript_client(tmp_path, monkeypatch):
+    log = TranscriptLog(str(tmp_path), fsync_interval=0)
+    monkeypatch.setattr(transcripts, "transcript_storage", log)
+    monkeypatch.setattr(transcripts, "consolidated_views", ConsolidatedTranscriptCache(log.read))
+    app = FastAPI()
+    app.include_router(transcripts.router)
+    yield TestClient(app)
+    asyncio.run(log.close())
+
+
+def test_batch_save_is_all_or_nothing(transcript_client):
+    """A batch with an invalid entry saves nothing; a valid one saves everything"""
+    batch = [{"text": "Tell me about you", "speaker": "AI", "timestamp": "2025-05-01T10:00:01"},
+             {"text": "I build APIs", "speaker": "candidate", "timestamp": "2025-05-01T10:00:02"}]
+
+    response = transcript_client.post("/transcript/s1/save/batch", json=batch + [{"text": "no speaker"}])
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Entry 2:")
+    response = transcript_client.post("/transcript/s1/save/batch", json=[{"text": "A", "speaker": "candidate", "timestamp": 2}])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Entry 0: timestamp must be a string"
+    assert transcript_client.get("/transcript/s1").json() == []
+    assert transcript_client.post("/transcript/s1/save/batch", json=[]).status_code == 400
+
+    response = transcript_client.post("/transcript/s1/save/batch", json=batch)
+    assert response.status_code == 201
+    assert response.json()["count"] == 2
+    assert transcript_client.get("/transcript/s1").json() == batch
+    consolidated = transcript_client.get("/transcript/s1/consolidated").json()
+    assert consolidated["answers_by_question"] == [{"question": "Tell me about you", "answer": "I build APIs"}]
+
+
+def test_websocket_saves_and_acknowledges(transcript_client):
+    """Each message is acknowledged once saved; invalid ones are rejected alone"""
+    with transcript_client.websocket_connect("/transcript/ws/s1") as ws:
+        ws.send_json({"id": 1, "entries": [{"text": "Q", "speaker": "AI", "timestamp": "2025-05-01T10:00:01"}]})
+        ws.send_json({"id": 2, "entries": [{"text": "", "speaker": "candidate"}]})
+        ws.send_json({"id": 3, "text": "A", "speaker": "candidate", "timestamp": "yesterday"})
+        ws.send_json({"text": "A", "speaker": "candidate", "timestamp": "2025-05-01T11:00:02+01:00"})
+        acks = [ws.receive_json() for _ in range(4)]
+
+    assert acks == [
+        {"type": "saved", "id": 1, "count": 1},
+        {"type": "error", "id": 2, "message": "Missing required fields: text and speaker"},
+        {"type": "error", "id": 3, "message": "timestamp is not ISO 8601: 'yesterday'"},
+        {"type": "saved", "id": None, "count": 1},
+    ]
+    # Timestamps are stored as naive UTC
+    saved = transcript_client.get("/transcript/s1").json()
+    assert [(e["text"], e["timestamp"]) for e in saved] == [("Q", "2025-05-01T10:00:01"), ("A", "2025-05-01T10:00:02")]
+
+
+def test_read_range_pages_across_legacy_log_and_tail(tmp_path):
+    """Cursors continue from legacy entries into the log and its in-memory tail"""
+    (tmp_path / "s1.json").write_text(json.dumps([entry(0, "AI"), entry(1)]))
+    (tmp_path / "s1.jsonl").write_text("".join(json.dumps(entry(i)) + "\n" for i in range(2, 6)))
+    log = TranscriptLog(str(tmp_path), fsync_interval=0, tail_size=2)
+
+    async def run():
+        pages, cursor = [], 0
+        while True:
+            page, cursor = await log.read_range("s1", cursor, limit=3)
+            if not page:
+                break
+            pages.append([e["text"] for e in page])
+        await log.append("s1", entry(6))
+        new, cursor = await log.read_range("s1", cursor)
+        streamed = [e async for e in log.iter_entries("s1", 1)]
+        await log.close()
+        return pages, new, cursor, streamed
+
+    pages, new, cursor, streamed = asyncio.run(run())
+    assert pages == [["answer 0", "answer 1", "answer 2"], ["answer 3", "answer 4", "answer 5"]]
+    assert new == [entry(6)] and cursor == 7
+    assert streamed == [entry(i, "candidate") for i in range(1, 7)]
+
+
+def test_read_range_stops_at_a_partial_line(tmp_path):
+    """A line still being written is not returned or counted by the cursor"""
+    (tmp_path / "s1.jsonl").write_text(json.dumps(entry(0)) + "\n" + '{"text": "ans')
+    log = TranscriptLog(str(tmp_path))
+
+    assert asyncio.run(log.read_range("s1")) == ([entry(0)], 1)
+    with open(tmp_path / "s1.jsonl", "a") as f:
+        f.write('wer 1"}\n')
+    assert asyncio.run(log.read_range("s1", 1)) == ([{"text": "answer 1"}], 2)
+
+
+def test_transcripts_endpoint_pages_and_streams(transcript_client):
+    """since/limit page through the transcript; ndjson streams it"""
+    batch = [entry(i) for i in range(5)]
+    transcript_client.post("/transcript/s1/save/batch", json=batch)
+
+    response = transcript_client.get("/transcript/s1", params={"limit": 2})
+    assert response.json() == batch[:2]
+    response = transcript_client.get("/transcript/s1", params={"since": response.headers["X-Next-Cursor"]})
+    assert response.json() == batch[2:]
+    assert response.headers["X-Next-Cursor"] == "5"
+
+    response = transcript_client.get("/transcript/s1", params={"format": "ndjson", "since": 1, "limit": 3})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == batch[1:4]
+    assert transcript_client.get("/transcript/s1", params={"format": "xml"}).status_code == 422
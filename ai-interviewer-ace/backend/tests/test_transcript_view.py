@@ -0,0 +1,141 @@
+"""
+Test cases for incrementally maintained consolidated transcripts
+"""
+import asyncio
+import random
+
+from app.services.transcript_view import ConsolidatedTranscript, ConsolidatedTranscriptCache
+
+
+def consolidate(transcript_data):
+    """The per-request consolidation the view replaces"""
+    if not transcript_data:
+        return {"final_answer": "", "raw_segments": [], "answers_by_question": []}
+    user_segments = [e for e in transcript_data if e.get("speaker", "").lower() != "ai" and e.get("text")]
+    answers_by_question = []
+    current_question, current_answers = None, []
+    for entry in sorted(transcript_data, key=lambda x: x.get("timestamp", "")):
+        text = entry.get("text", "")
+        if not text:
+            continue
+        if entry.get("speaker", "").lower() == "ai":
+            if current_question and current_answers:
+                answers_by_question.append({"question": current_question, "answer": " ".join(current_answers)})
+            current_question, current_answers = text, []
+        elif current_question:
+            current_answers.append(text)
+    if current_question and current_answers:
+        answers_by_question.append({"question": current_question, "answer": " ".join(current_answers)})
+    return {
+        "final_answer": user_segments[-1]["text"] if user_segments else "",
+        "raw_segments": user_segments,
+        "complete_transcript": " ".join(s["text"] for s in user_segments),
+        "answers_by_question": answers_by_question,
+    }
+
+
+def entry(text, speaker, ts):
+    return {"text": text, "speaker": speaker, "timestamp": f"2025-05-01T10:{ts // 60:02d}:{ts % 60:02d}"}
+
+
+def test_incremental_view_matches_full_consolidation():
+    """Folding entries in one at a time gives the same result as recomputing"""
+    rng = random.Random(7)
+    entries = [
+        entry(rng.choice(["", f"text {i}"]) if i % 5 == 0 else f"text {i}", rng.choice(["AI", "candidate", "Candidate"]), i)
+        for i in range(60)
+    ]
+    view = ConsolidatedTranscript()
+    assert view.to_dict() == consolidate([])
+    for i, e in enumerate(entries):
+        assert view.add(e)
+        assert view.to_dict() == consolidate(entries[:i + 1])
+
+
+def test_view_built_from_unordered_entries():
+    """Existing transcripts are paired in timestamp order, segments in save order"""
+    entries = [entry("answer", "candidate", 2), entry("question", "AI", 1), entry("late", "candidate", 0)]
+    assert ConsolidatedTranscript(entries).to_dict() == consolidate(entries)
+
+
+def test_out_of_order_entry_drops_cached_view():
+    """An entry older than the newest one forces a rebuild from storage"""
+    saved = [entry("Q1", "AI", 0), entry("A1", "candidate", 1)]
+    loads = []
+
+    async def load(session_id):
+        loads.append(session_id)
+        return list(saved)
+
+    cache = ConsolidatedTranscriptCache(load)
+
+    async def run():
+        first = await cache.get("s1")
+        saved.append(entry("A2", "candidate", 2))
+        cache.add("s1", saved[-1])
+        second = await cache.get("s1")
+        saved.append(entry("Q0", "AI", 0))
+        cache.add("s1", saved[-1])
+        third = await cache.get("s1")
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert second["answers_by_question"] == [{"question": "Q1", "answer": "A1 A2"}]
+    assert third == consolidate(saved)
+    assert loads == ["s1", "s1"]
+
+
+def test_concurrent_requests_share_a_build():
+    """Polls racing a cold cache load once; a save during the load is not lost"""
+    saved = [entry("Q1", "AI", 0)]
+    loads = []
+
+    async def load(session_id):
+        loads.append(session_id)
+        snapshot = list(saved)
+        await asyncio.sleep(0.01)
+        return snapshot
+
+    cache = ConsolidatedTranscriptCache(load)
+
+    async def run():
+        polls = asyncio.gather(cache.get("s1"), cache.get("s1"))
+        await asyncio.sleep(0)
+        saved.append(entry("A1", "candidate", 1))
+        cache.add("s1", saved[-1])
+        await polls
+        return await cache.get("s1")
+
+    assert asyncio.run(run())["answers_by_question"] == [{"question": "Q1", "answer": "A1"}]
+    assert loads == ["s1", "s1"]
+
+
+def test_build_during_a_save_does_not_apply_its_entry_twice():
+    """A cold read while a save waits on the disk sees the entry once"""
+    saved = [entry("Q1", "AI", 0)]
+
+    async def load(session_id):
+        return list(saved)
+
+    cache = ConsolidatedTranscriptCache(load)
+
+    async def save(item, synced):
+        with cache.saving("s1"):
+            # The log holds the entry before its fsync completes
+            saved.append(item)
+            await synced.wait()
+            cache.add("s1", item)
+
+    async def run():
+        synced = asyncio.Event()
+        pending = asyncio.create_task(save(entry("my answer", "candidate", 1), synced))
+        await asyncio.sleep(0)
+        during = await cache.get("s1")
+        synced.set()
+        await pending
+        return during, await cache.get("s1")
+
+    during, after = asyncio.run(run())
+    assert during["answers_by_question"] == [{"question": "Q1", "answer": "my answer"}]
+    assert after == consolidate(saved)
+    assert after["complete_transcript"] == "my answer"
@@ -0,0 +1,227 @@
+"""
+Test cases for the Vosk transcription service helpers
+"""
+import asyncio
+import json
+import numpy as np
+import pytest
+from vosk.vosk_cffi import ffi
+
+from app.services.transcription import DecodeExecutor, EnergyVAD, RecognizerPool, VoskTranscriptionService
+from app.utils.errors import CapacityError
+
+
+class FakeRecognizer:
+    """Stand-in for KaldiRecognizer that echoes the words it is fed"""
+
+    def __init__(self):
+        self.resets = 0
+        self.words = []
+
+    def Reset(self):
+        self.resets += 1
+        self.words = []
+
+    def AcceptWaveform(self, data):
+        if not isinstance(data, bytes):
+            data = ffi.buffer(data)[:]
+        # A "." chunk ends the current utterance
+        if data == b".":
+            return True
+        # Whitespace-only chunks leave the partial result unchanged
+        if data.strip():
+            self.words.append(data.decode())
+        return False
+
+    def Result(self):
+        text, self.words = " ".join(self.words), []
+        return json.dumps({"text": text})
+
+    def PartialResult(self):
+        return json.dumps({"partial": " ".join(self.words)})
+
+    def FinalResult(self):
+        return self.Result()
+
+
+def make_pool(max_size=2):
+    return RecognizerPool(None, max_size=max_size, factory=FakeRecognizer)
+
+
+def test_pool_reuses_released_recognizers():
+    """Released recognizers are reset and handed to the next session"""
+    pool = make_pool()
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+
+    assert second is first
+    assert second.resets == 1
+    assert pool.stats()["created"] == 1
+
+
+def test_pool_leases_distinct_recognizers():
+    """Concurrent sessions never share a recognizer"""
+    pool = make_pool()
+    with pool.lease() as a, pool.lease() as b:
+        assert a is not b
+        assert pool.stats()["leased"] == 2
+    assert pool.stats() == {"max_size": 2, "created": 2, "idle": 2, "leased": 0}
+
+
+def test_pool_is_bounded():
+    """Leasing beyond max_size raises once the timeout expires"""
+    pool = make_pool(max_size=1)
+    with pool.lease():
+        with pytest.raises(CapacityError):
+            pool.acquire(timeout=0)
+    # Slot is available again after release
+    with pool.lease():
+        pass
+
+
+def make_service(max_size=2):
+    pool = make_pool(max_size)
+    executor = DecodeExecutor(pool=pool, workers=2)
+    return VoskTranscriptionService(executor=executor, max_pending_chunks=2, vad_enabled=False), pool
+
+
+async def audio(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(service, stream):
+    return [result async for result in service.transcribe_stream(stream)]
+
+
+def test_transcribe_stream_decodes_in_order():
+    """Chunks of one stream are decoded in order on the executor"""
+    service, pool = make_service()
+    results = asyncio.run(collect(service, audio(b"hello", b"there", b".", b"bye")))
+    service.shutdown()
+
+    assert results == [
+        {"partial": "hello"},
+        {"partial": "hello there"},
+        {"text": "hello there"},
+        {"partial": "bye"},
+        {"text": "bye"},
+    ]
+    assert pool.stats()["leased"] == 0
+
+
+def test_concurrent_streams_do_not_share_state():
+    """Interleaved sessions each keep their own decoder state"""
+    service, pool = make_service()
+
+    async def run_both():
+        return await asyncio.gather(
+            collect(service, audio(b"a1", b"a2", b"a3")),
+            collect(service, audio(b"b1", b"b2", b"b3")),
+        )
+
+    first, second = asyncio.run(run_both())
+    service.shutdown()
+
+    assert first[-1] == {"text": "a1 a2 a3"}
+    assert second[-1] == {"text": "b1 b2 b3"}
+    assert pool.stats()["created"] == 2
+
+
+def test_stream_errors_release_recognizer():
+    """A failing audio source propagates its error and frees the recognizer"""
+    service, pool = make_service()
+
+    async def broken():
+        yield b"hello"
+        raise ConnectionError("client went away")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(collect(service, broken()))
+    service.shutdown()
+
+    assert pool.stats()["leased"] == 0
+
+
+def test_process_shards_wait_up_to_the_acquire_timeout():
+    """A full process-mode executor raises CapacityError after the timeout, like thread mode"""
+    # Worker processes start on first submit, so reserving slots loads no model
+    executor = DecodeExecutor(mode="process", workers=1, pool_size=1)
+    try:
+        shard = executor._reserve_shard(0.01)
+        with pytest.raises(CapacityError):
+            executor._reserve_shard(0.01)
+
+        async def reserve_while_released():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.02, executor._release_shard, shard)
+            return await loop.run_in_executor(None, executor._reserve_shard, 1.0)
+
+        assert asyncio.run(reserve_while_released()) == shard
+    finally:
+        executor.shutdown()
+
+
+def pcm(seconds, amplitude=0.0, sample_rate=16000):
+    """Build 16-bit PCM: a 300 Hz tone at the given amplitude, or low noise"""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    rng = np.random.default_rng(0)
+    signal = amplitude * np.sin(2 * np.pi * 300 * t) + 0.001 * rng.standard_normal(len(t))
+    return (signal * 32767).astype("<i2").tobytes()
+
+
+def run_vad(vad, audio, chunk_bytes=3200):
+    segments = []
+    for i in range(0, len(audio), chunk_bytes):
+        segments.extend(vad.process(audio[i:i + chunk_bytes]))
+    return segments
+
+
+def test_vad_drops_silence_and_marks_utterances():
+    """Silence is skipped and each utterance ends with a boundary"""
+    vad = EnergyVAD(preroll_ms=100, end_silence_ms=400)
+    audio = pcm(2.0) + pcm(1.0, 0.3) + pcm(2.0) + pcm(0.5, 0.3) + pcm(1.0)
+    segments = run_vad(vad, audio)
+
+    fed = sum(len(a) for a, _ in segments) / 32000
+    boundaries = [end for _, end in segments].count(True)
+
+    assert boundaries == 2
+    # Speech (1.5s) plus pre-roll and hangover for two utterances
+    assert 1.5 <= fed <= 1.5 + 2 * 0.5 + 0.05
+    assert vad.stats()["dropped_ratio"] > 0.6
+    assert not vad.in_speech
+
+
+def test_vad_keeps_long_continuous_speech():
+    """The noise floor does not climb during speech and cut the utterance short"""
+    vad = EnergyVAD()
+    segments = run_vad(vad, pcm(1.0) + pcm(10.0, 0.3) + pcm(1.0))
+
+    fed = sum(len(a) for a, _ in segments) / 32000
+    assert [end for _, end in segments].count(True) == 1
+    assert fed >= 10.0
+    assert vad.noise_db < -50
+
+
+def test_vad_is_chunk_size_independent():
+    """Odd chunk sizes give the same audio as frame-aligned chunks"""
+    audio = pcm(1.0) + pcm(0.6, 0.3) + pcm(1.0)
+    aligned = run_vad(EnergyVAD(), audio, chunk_bytes=3200)
+    ragged = run_vad(EnergyVAD(), audio, chunk_bytes=3201)
+
+    assert b"".join(a for a, _ in aligned) == b"".join(a for a, _ in ragged)
+
+
+def test_vad_time_map_restores_dropped_silence():
+    """Recognizer timestamps are mapped back to positions in the stream"""
+    vad = EnergyVAD(preroll_ms=100, end_silence_ms=400)
+    run_vad(vad, pcm(2.0) + pcm(1.0, 0.3) + pcm(2.0) + pcm(0.5, 0.3) + pcm(1.0))
+
+    # Each utterance is fed as 0.1s pre-roll + speech + 0.4s hangover
+    assert vad.time_map.to_stream(0.1) == pytest.approx(2.0, abs=0.03)
+    assert vad.time_map.to_stream(1.6) == pytest.approx(5.0, abs=0.03)
+
+    result = vad.time_map.remap_words({"result": [{"word": "hi", "start": 0.1, "end": 0.5, "conf": 1.0}]})
+    assert result["result"][0]["start"] == pytest.approx(2.0, abs=0.03)
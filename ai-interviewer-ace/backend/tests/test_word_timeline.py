@@ -0,0 +1,60 @@
+"""
+Test cases for per-session word timings
+"""
+import asyncio
+import pytest
+
+from app.services.word_timeline import WordTimeline, WordTimelineStore
+
+
+def words(*entries):
+    return [{"word": w, "start": s, "end": e, "conf": c} for w, s, e, c in entries]
+
+
+def make_timeline():
+    timeline = WordTimeline(origin=1000.0)
+    timeline.add_utterance(words(("i", 0.0, 0.2, 1.0), ("built", 0.2, 0.6, 0.4), ("apis", 0.6, 1.0, 0.5)))
+    timeline.add_utterance(words(("mostly", 0.5, 1.0, 0.9), ("python", 1.0, 1.5, 1.0)), base=2.0)
+    return timeline
+
+
+def test_timeline_stores_parallel_columns():
+    """Words from successive utterances land in parallel arrays"""
+    timeline = make_timeline()
+    data = timeline.to_dict()
+
+    assert data["words"] == ["i", "built", "apis", "mostly", "python"]
+    assert data["start"] == [0.0, 0.2, 0.6, 2.5, 3.0]
+    assert data["utterance"] == [0, 0, 0, 1, 1]
+    assert WordTimeline.from_dict(data).to_dict() == data
+
+
+def test_timeline_metrics():
+    """Pauses, speaking rate and low-confidence spans come from the columns"""
+    timeline = make_timeline()
+    summary = timeline.summary(min_pause=1.0, low_confidence=0.6)
+
+    assert timeline.pauses(1.0) == [{"start": 1.0, "end": 2.5, "duration": 1.5}]
+    # 5 words over 3.5s of audio minus the 1.5s pause
+    assert summary["speaking_rate_wpm"] == pytest.approx(150.0)
+    assert summary["low_confidence_spans"] == [
+        {"start": 0.2, "end": 1.0, "text": "built apis", "min_conf": 0.4}
+    ]
+    assert WordTimeline().summary()["speaking_rate_wpm"] is None
+
+
+def test_store_persists_when_last_stream_closes(tmp_path):
+    """Timelines are written once no stream is using them, and reloaded"""
+    store = WordTimelineStore(str(tmp_path))
+    first = asyncio.run(store.open("s1"))
+    assert asyncio.run(store.open("s1")) is first
+    first.add_utterance(words(("hello", 0.0, 0.4, 0.9)))
+
+    asyncio.run(store.close("s1"))
+    assert not (tmp_path / "s1.words.json").exists()
+    asyncio.run(store.close("s1"))
+
+    reloaded = asyncio.run(WordTimelineStore(str(tmp_path)).get("s1"))
+    assert reloaded.words == ["hello"]
+    assert asyncio.run(store.open("s1")).utterances == 1
+    assert asyncio.run(store.get("missing")) is None
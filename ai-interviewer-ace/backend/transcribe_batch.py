@@ -0,0 +1,86 @@
+"""
+Batch transcription script for archived interview recordings.
+Fans WAV files out across worker processes and writes one JSON line per file.
+"""
+import argparse
+import json
+import logging
+import sys
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from app.services.batch_transcription import BatchTranscriber, collect_wav_files
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("hiregage-batch")
+
+
+def main():
+    """Transcribe the given WAV files and directories"""
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description="Batch-transcribe WAV recordings with Vosk")
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="WAV files and/or directories containing WAV files",
+    )
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="Search directories recursively",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--model",
+        type=str,
+        default=None,
+        help="Path to the Vosk model directory",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write JSON lines to this file instead of stdout",
+    )
+    args = parser.parse_args()
+
+    files = collect_wav_files(args.inputs, recursive=args.recursive)
+    if not files:
+        logger.error("No WAV files to transcribe")
+        return 1
+
+    transcriber = BatchTranscriber(model_path=args.model, workers=args.workers)
+    logger.info(f"Transcribing {len(files)} files with {transcriber.workers} workers")
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        with transcriber:
+            for record in transcriber.run(files):
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+                if record["type"] == "summary":
+                    logger.info(
+                        f"Transcribed {record['files']} files ({record['failed']} failed), "
+                        f"{record['audio_seconds']:.1f}s of audio in {record['wall_seconds']:.1f}s "
+                        f"(RTF {record['rtf']})"
+                    )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())